@@ -3,17 +3,27 @@ Flask API server for website taxonomy crawler
 Provides REST API endpoints to crawl websites dynamically
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
+import re
 import sys
+import json
+import threading
 
 # Import crawler functions
-from crawler_taxonomy import crawl_site, scrape_single_page, allowed_by_robots
+from crawler_taxonomy import crawl_site, iter_crawl_site, scrape_single_page, allowed_by_robots
 from urllib.parse import urljoin, urlparse
 
 # Temporarily override BASE_URL for dynamic crawling
 import crawler_taxonomy
+import http_session
+import ontology_registry
+from crawl_jobs import CrawlJobManager
+from crawl_scope import CrawlScope
+import html_extract
+from page_index import PageIndex, FACETS, DEFAULT_LIMIT, get_file_index
+from crawl_metrics import get_metrics
 
 app = Flask(__name__)
 # Enable CORS for React frontend and Cloudflare tunnels
@@ -26,10 +36,258 @@ CORS(app, resources={
     }
 })
 
+# Named crawl checkpoints live here (see "checkpoint" / "resume" in /api/crawl)
+CHECKPOINT_DIR = os.getenv('CRAWL_CHECKPOINT_DIR', 'checkpoints')
+CHECKPOINT_NAME_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def checkpoint_path(name):
+    return os.path.join(CHECKPOINT_DIR, f"{name}.sqlite")
+
+# Background crawl jobs; CRAWL_JOB_WORKERS bounds how many run at once
+job_manager = CrawlJobManager()
+
+# Crawl output searched by /api/pages (reindexed when the file changes)
+PAGES_FILE = os.getenv('CRAWL_PAGES_FILE', crawler_taxonomy.OUTPUT_FILE)
+# job id -> (PageIndex, number of job results indexed)
+_job_indexes = {}
+_job_indexes_lock = threading.Lock()
+
+def get_page_index(job_id=None):
+    """
+    PageIndex for a crawl job's results (topped up with pages crawled since
+    the last call) or, without a job id, for PAGES_FILE
+    
+    Returns:
+        (index, None), or (None, (response, status)) if there is no data
+    """
+    if not job_id:
+        index = get_file_index(PAGES_FILE).get_index()
+        if index is None:
+            return None, (jsonify({
+                "error": f"No crawl output found at {PAGES_FILE}"
+            }), 404)
+        return index, None
+    
+    job = job_manager.get(job_id)
+    with _job_indexes_lock:
+        # forget indexes of jobs the manager no longer keeps
+        for stale in [j for j in _job_indexes if job_manager.get(j) is None]:
+            del _job_indexes[stale]
+        if not job:
+            return None, (jsonify({
+                "error": f"Unknown job: {job_id}"
+            }), 404)
+        index, indexed = _job_indexes.get(job_id, (None, 0))
+        if index is None:
+            index = PageIndex()
+        results, _ = job.get_results(indexed)
+        for page in results:
+            index.add(page)
+        _job_indexes[job_id] = (index, indexed + len(results))
+    return index, None
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Crawler metrics in the Prometheus text format: per-stage latency
+    histograms (fetch, extract, classify_ontology, classify_predefined,
+    classify_llm), HTTP status counts, bytes fetched, retries, pages
+    crawled, and queue depth / pages per second of running crawls
+    """
+    return Response(get_metrics().render_prometheus(),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({"status": "ok", "message": "API is running"})
+    """Health check endpoint (includes HTTP connection-pool counters)"""
+    return jsonify({
+        "status": "ok",
+        "message": "API is running",
+        "http": http_session.get_connection_stats()
+    })
+
+def is_number(value, integer=False):
+    """True for an int (or a float unless `integer`), but not a bool"""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (not integer and isinstance(value, float))
+
+def parse_crawl_request(data):
+    """
+    Validate a crawl request body
+    
+    Returns:
+        (options, None) on success, where options holds url, max_pages, delay,
+        single_page, concurrency, per_host_rps, checkpoint, resume,
+        use_cache, dedup, scope, llm_budget and extraction_profile; or
+        (None, (response, status)) with the error response to return
+    """
+    if not isinstance(data, dict) or 'url' not in data:
+        return None, (jsonify({
+            "error": "Missing required field: url"
+        }), 400)
+    
+    if not isinstance(data['url'], str):
+        return None, (jsonify({
+            "error": "url must be a string"
+        }), 400)
+    url = data['url'].strip()
+    if not url:
+        return None, (jsonify({
+            "error": "URL cannot be empty"
+        }), 400)
+    
+    # Validate URL format
+    try:
+        parsed = urlparse(url)
+        if not parsed.scheme or not parsed.netloc:
+            return None, (jsonify({
+                "error": "Invalid URL format. Please include http:// or https://"
+            }), 400)
+    except Exception as e:
+        return None, (jsonify({
+            "error": f"Invalid URL: {str(e)}"
+        }), 400)
+    
+    max_pages = data.get('max_pages', 100)
+    delay = data.get('delay', 0.8)
+    single_page = data.get('single_page', False)
+    concurrency = data.get('concurrency', 1)
+    per_host_rps = data.get('per_host_rps')
+    checkpoint = data.get('checkpoint')
+    resume = data.get('resume')
+    use_cache = data.get('use_cache', False)
+    if isinstance(use_cache, str):
+        use_cache = use_cache.lower() in ('1', 'true', 'yes')
+    dedup = data.get('dedup', True)
+    if isinstance(dedup, str):
+        dedup = dedup.lower() in ('1', 'true', 'yes')
+    scope = data.get('scope') or {}
+    llm_budget = data.get('llm_budget')
+    extraction_profile = data.get('extraction_profile', 'full')
+    
+    # Validate parameters
+    for field, value, integer in (('max_pages', max_pages, True), ('delay', delay, False),
+                                  ('concurrency', concurrency, True),
+                                  ('per_host_rps', per_host_rps, False)):
+        if value is not None and not is_number(value, integer):
+            return None, (jsonify({
+                "error": f"{field} must be {'an integer' if integer else 'a number'}"
+            }), 400)
+    
+    if max_pages < 1 or max_pages > 1000:
+        return None, (jsonify({
+            "error": "max_pages must be between 1 and 1000"
+        }), 400)
+    
+    if delay < 0 or delay > 5:
+        return None, (jsonify({
+            "error": "delay must be between 0 and 5 seconds"
+        }), 400)
+    
+    if concurrency < 1 or concurrency > 16:
+        return None, (jsonify({
+            "error": "concurrency must be between 1 and 16"
+        }), 400)
+    
+    if per_host_rps is not None and (per_host_rps <= 0 or per_host_rps > 20):
+        return None, (jsonify({
+            "error": "per_host_rps must be greater than 0 and at most 20"
+        }), 400)
+    
+    for field, name in (('checkpoint', checkpoint), ('resume', resume)):
+        if name is not None and not CHECKPOINT_NAME_RE.match(str(name)):
+            return None, (jsonify({
+                "error": f"{field} must be 1-64 letters, digits, '-' or '_'"
+            }), 400)
+    
+    if not isinstance(scope, dict):
+        return None, (jsonify({
+            "error": "scope must be an object"
+        }), 400)
+    max_depth = scope.get('max_depth')
+    if max_depth is not None and (not is_number(max_depth, integer=True) or max_depth < 0):
+        return None, (jsonify({
+            "error": "scope.max_depth must be a non-negative integer"
+        }), 400)
+    try:
+        CrawlScope.from_options(url, scope)
+    except (ValueError, TypeError, re.error) as e:
+        return None, (jsonify({
+            "error": f"Invalid scope: {str(e)}"
+        }), 400)
+    
+    if llm_budget is not None:
+        if not isinstance(llm_budget, dict) or set(llm_budget) - {'max_requests', 'max_tokens'}:
+            return None, (jsonify({
+                "error": "llm_budget must be an object with max_requests and/or max_tokens"
+            }), 400)
+        for key, value in llm_budget.items():
+            if not is_number(value, integer=True) or value < 0:
+                return None, (jsonify({
+                    "error": f"llm_budget.{key} must be a non-negative integer"
+                }), 400)
+    
+    if not isinstance(extraction_profile, str) or extraction_profile not in html_extract.PROFILES:
+        return None, (jsonify({
+            "error": f"extraction_profile must be one of {', '.join(html_extract.PROFILES)}"
+        }), 400)
+    
+    if resume is not None and not os.path.exists(checkpoint_path(resume)):
+        return None, (jsonify({
+            "error": f"Unknown checkpoint: {resume}"
+        }), 404)
+    
+    if checkpoint is not None and resume is None and os.path.exists(checkpoint_path(checkpoint)):
+        return None, (jsonify({
+            "error": f"Checkpoint {checkpoint} already exists; use \"resume\" to continue it"
+        }), 409)
+    
+    return {
+        "url": url,
+        "max_pages": max_pages,
+        "delay": delay,
+        "single_page": single_page,
+        "concurrency": concurrency,
+        "per_host_rps": per_host_rps,
+        "checkpoint": checkpoint,
+        "resume": resume,
+        "use_cache": bool(use_cache),
+        "dedup": bool(dedup),
+        "scope": scope,
+        "llm_budget": llm_budget,
+        "extraction_profile": extraction_profile
+    }, None
+
+def crawl_site_kwargs(options):
+    """
+    Map validated request options to crawl_site keyword arguments.
+    "scope" is a fresh CrawlScope, so callers can read its stats() afterwards.
+    """
+    return {
+        "start_url": options["url"],
+        "max_pages": options["max_pages"],
+        "delay": options["delay"],
+        "concurrency": options["concurrency"],
+        "per_host_rps": options["per_host_rps"],
+        "checkpoint": checkpoint_path(options["checkpoint"]) if options["checkpoint"] else None,
+        "resume": checkpoint_path(options["resume"]) if options["resume"] else None,
+        "cache": True if options["use_cache"] else None,
+        "classify_cache": True if options["use_cache"] else None,
+        "dedup": options["dedup"],
+        "scope": CrawlScope.from_options(options["url"], options["scope"]),
+        "llm_budget": options["llm_budget"],
+        "extraction_profile": options["extraction_profile"]
+    }
+
+def cache_summary(results):
+    """Count cache_status values (hit / revalidated / miss) over page results"""
+    counts = {"hit": 0, "revalidated": 0, "miss": 0}
+    for result in results:
+        status = result.get("cache_status")
+        if status in counts:
+            counts[status] += 1
+    return counts
 
 @app.route('/api/crawl', methods=['POST'])
 def crawl_website():
@@ -41,49 +299,33 @@ def crawl_website():
         "url": "https://example.com",
         "max_pages": 100,  # optional, default 100
         "delay": 0.8,      # optional, default 0.8 seconds
-        "single_page": false  # optional, if true, only scrape the given URL
+        "single_page": false,  # optional, if true, only scrape the given URL
+        "concurrency": 1,  # optional, worker threads (1-16), 1 = sequential
+        "per_host_rps": 2,  # optional, concurrent mode request rate per host
+        "checkpoint": "name",  # optional, save progress under this name
+        "resume": "name",  # optional, continue a saved crawl without refetching
+        "use_cache": false,  # optional, HTTP + classification caches for recrawls
+        "dedup": true,  # optional, reuse classification for duplicate content
+        "scope": {  # optional, URL canonicalization and crawl-scope rules
+            "strip_params": ["utm_*", "sessionid"],  # query params to drop
+            "keep_params": ["page"],  # or: keep only these params
+            "strip_all_params": false,
+            "include": ["^/news/"],  # path regexes to allow
+            "exclude": ["/calendar/"],  # path regexes to skip
+            "blocked_extensions": [".pdf", ".jpg"],
+            "max_depth": 3  # link distance from the start URL
+        },
+        "llm_budget": {"max_requests": 50, "max_tokens": 100000},  # optional, OpenAI cap
+        "extraction_profile": "full"  # optional, "lean" skips ul_blocks and the HTML snippet
     }
+    
+    The response includes "scope": links accepted and rejections per rule.
     """
     try:
-        data = request.get_json()
-        
-        if not data or 'url' not in data:
-            return jsonify({
-                "error": "Missing required field: url"
-            }), 400
-        
-        url = data['url'].strip()
-        if not url:
-            return jsonify({
-                "error": "URL cannot be empty"
-            }), 400
-        
-        # Validate URL format
-        try:
-            parsed = urlparse(url)
-            if not parsed.scheme or not parsed.netloc:
-                return jsonify({
-                    "error": "Invalid URL format. Please include http:// or https://"
-                }), 400
-        except Exception as e:
-            return jsonify({
-                "error": f"Invalid URL: {str(e)}"
-            }), 400
-        
-        max_pages = data.get('max_pages', 100)
-        delay = data.get('delay', 0.8)
-        single_page = data.get('single_page', False)
-        
-        # Validate parameters
-        if max_pages < 1 or max_pages > 1000:
-            return jsonify({
-                "error": "max_pages must be between 1 and 1000"
-            }), 400
-        
-        if delay < 0 or delay > 5:
-            return jsonify({
-                "error": "delay must be between 0 and 5 seconds"
-            }), 400
+        options, error = parse_crawl_request(request.get_json())
+        if error:
+            return error
+        url = options["url"]
         
         # Check robots.txt (non-blocking, just warn)
         try:
@@ -94,8 +336,8 @@ def crawl_website():
             print(f"[WARN] Could not check robots.txt: {e}")
         
         # Scrape single page or crawl site
-        if single_page:
-            result = scrape_single_page(url)
+        if options["single_page"]:
+            result = scrape_single_page(url, options["extraction_profile"])
             if result:
                 return jsonify({
                     "success": True,
@@ -109,20 +351,342 @@ def crawl_website():
                 }), 500
         else:
             # Crawl multiple pages
-            results = crawl_site(start_url=url, max_pages=max_pages, delay=delay)
+            kwargs = crawl_site_kwargs(options)
+            try:
+                results = crawl_site(**kwargs)
+            except ValueError as e:
+                # e.g. resuming a checkpoint that belongs to another site
+                return jsonify({
+                    "error": str(e)
+                }), 400
             
-            return jsonify({
+            response = {
                 "success": True,
                 "data": results,
                 "total_pages": len(results),
-                "url": url
-            })
+                "url": url,
+                "scope": kwargs["scope"].stats()
+            }
+            if options["use_cache"]:
+                response["cache"] = cache_summary(results)
+            return jsonify(response)
+    
+    except Exception as e:
+        return jsonify({
+            "error": f"Server error: {str(e)}"
+        }), 500
+
+STREAM_QUERY_TYPES = {
+    "max_pages": int,
+    "delay": float,
+    "concurrency": int,
+    "per_host_rps": float,
+    "scope": json.loads,
+    "llm_budget": json.loads
+}
+
+@app.route('/api/crawl/stream', methods=['GET', 'POST'])
+def crawl_website_stream():
+    """
+    Crawl a website and stream each page record as soon as it is scraped
+    
+    POST: JSON body as for /api/crawl, plus "format": "ndjson" (default) or "sse"
+    GET:  the same fields as query parameters (for EventSource clients),
+          e.g. /api/crawl/stream?url=https://example.com&max_pages=50&format=sse
+          (scope is passed as a JSON string)
+    
+    NDJSON: one page object per line, then {"event": "done", "total_pages": N}
+    SSE:    "event: page" messages, then one "event: done" message
+    """
+    if request.method == 'GET':
+        data = {}
+        for key, value in request.args.items():
+            try:
+                data[key] = STREAM_QUERY_TYPES.get(key, str)(value)
+            except ValueError:
+                return jsonify({
+                    "error": f"Invalid value for {key}: {value}"
+                }), 400
+    else:
+        data = request.get_json(silent=True) or {}
+    
+    options, error = parse_crawl_request(data)
+    if error:
+        return error
+    
+    stream_format = data.get('format', 'ndjson')
+    if stream_format not in ('ndjson', 'sse'):
+        return jsonify({
+            "error": "format must be 'ndjson' or 'sse'"
+        }), 400
+    
+    if stream_format == 'sse':
+        def encode(event, payload):
+            return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        mimetype = 'text/event-stream'
+    else:
+        def encode(event, payload):
+            if event != 'page':
+                payload = dict(payload, event=event)
+            return json.dumps(payload, ensure_ascii=False) + "\n"
+        mimetype = 'application/x-ndjson'
+    
+    def generate():
+        total = 0
+        cache_counts = {"hit": 0, "revalidated": 0, "miss": 0}
+        kwargs = crawl_site_kwargs(options)
+        pages = iter_crawl_site(**kwargs)
+        try:
+            for result in pages:
+                total += 1
+                if result.get("cache_status") in cache_counts:
+                    cache_counts[result["cache_status"]] += 1
+                yield encode('page', result)
+            done = {"total_pages": total, "url": options["url"], "scope": kwargs["scope"].stats()}
+            if options["use_cache"]:
+                done["cache"] = cache_counts
+            yield encode('done', done)
+        except Exception as e:
+            yield encode('error', {"error": f"Server error: {str(e)}", "total_pages": total})
+        finally:
+            # client disconnects close this generator; stop the crawl with it
+            pages.close()
+    
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # disable proxy buffering
+    return response
+
+@app.route('/api/crawl/jobs', methods=['POST'])
+def submit_crawl_job():
+    """
+    Start a crawl in the background and return its job id immediately
+    
+    Request body: same as /api/crawl (single_page is ignored)
+    
+    Returns (202):
+    {
+        "success": true,
+        "job_id": "...",
+        "status": "queued"
+    }
+    """
+    try:
+        options, error = parse_crawl_request(request.get_json())
+        if error:
+            return error
+        
+        job = job_manager.submit(crawl_site_kwargs(options))
+        if job is None:
+            return jsonify({
+                "error": "Too many active crawl jobs, try again later"
+            }), 429
+        
+        return jsonify({
+            "success": True,
+            "job_id": job.id,
+            "status": job.status
+        }), 202
     
     except Exception as e:
         return jsonify({
             "error": f"Server error: {str(e)}"
         }), 500
 
+@app.route('/api/crawl/jobs', methods=['GET'])
+def list_crawl_jobs():
+    """List known crawl jobs with their progress"""
+    return jsonify({
+        "success": True,
+        "jobs": job_manager.list_jobs()
+    })
+
+@app.route('/api/crawl/jobs/<job_id>', methods=['GET'])
+def get_crawl_job(job_id):
+    """
+    Progress of a crawl job
+    
+    Returns:
+    {
+        "success": true,
+        "job": {
+            "job_id": "...", "status": "running", "pages_done": 42,
+            "queue_depth": 130, "pages_per_sec": 1.2, "eta_seconds": 48.3, ...
+        }
+    }
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            "error": f"Unknown job: {job_id}"
+        }), 404
+    return jsonify({
+        "success": True,
+        "job": job.progress()
+    })
+
+@app.route('/api/crawl/jobs/<job_id>/results', methods=['GET'])
+def get_crawl_job_results(job_id):
+    """
+    Pages crawled so far by a job (partial while it is running)
+    
+    Query parameters: offset (default 0), limit (default all)
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            "error": f"Unknown job: {job_id}"
+        }), 404
+    
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return jsonify({
+            "error": "offset and limit must be non-negative"
+        }), 400
+    
+    results, total = job.get_results(offset, limit)
+    return jsonify({
+        "success": True,
+        "status": job.status,
+        "data": results,
+        "offset": offset,
+        "total_pages": total
+    })
+
+@app.route('/api/crawl/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_crawl_job(job_id):
+    """Cancel a queued or running crawl job (results so far are kept)"""
+    job = job_manager.cancel(job_id)
+    if not job:
+        return jsonify({
+            "error": f"Unknown job: {job_id}"
+        }), 404
+    return jsonify({
+        "success": True,
+        "job": job.progress()
+    })
+
+@app.route('/api/pages', methods=['GET'])
+def query_pages():
+    """
+    Search crawled pages without downloading them all
+    
+    Query parameters:
+        q: words that must all appear (prefix match) in title, url, meta
+           description or text
+        category, document_type, work_type, theme, geo_area: facet filters;
+           repeat a parameter or separate values with commas to match any
+        sort: confidence_desc (default), confidence_asc or url
+        limit: page size (default 50, max 500)
+        cursor: next_cursor from the previous response
+        job: search a crawl job's results instead of the crawl output file
+    
+    Returns:
+    {
+        "success": true,
+        "pages": [{"id": 12, "url": "...", "title": "...", "category": "...",
+                   "confidence": 0.8, "ontology": {"document_type": "...", ...}}],
+        "total": 240,
+        "next_cursor": "..." or null
+    }
+    
+    Records are slim (no HTML, ul/li blocks or text); fetch a full page
+    with /api/pages/<id>.
+    """
+    index, error = get_page_index(request.args.get('job'))
+    if error:
+        return error
+    
+    filters = {}
+    for facet in FACETS:
+        values = [v.strip() for arg in request.args.getlist(facet) for v in arg.split(',')]
+        if any(values):
+            filters[facet] = [v for v in values if v]
+    
+    try:
+        result = index.query(
+            q=request.args.get('q', ''),
+            filters=filters,
+            sort=request.args.get('sort', 'confidence_desc'),
+            limit=request.args.get('limit', DEFAULT_LIMIT, type=int),
+            cursor=request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+    
+    return jsonify({
+        "success": True,
+        **result
+    })
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    Facet counts and confidence buckets of the crawled pages, without the
+    pages themselves
+    
+    Query parameters:
+        job: statistics of a crawl job's results instead of the crawl output file
+    
+    Returns:
+    {
+        "success": true,
+        "statistics": {
+            "total_pages": 240,
+            "categories": {...}, "document_types": {...}, "work_types": {...},
+            "themes": {...}, "areas_of_reference": {...}, "geo_areas": {...},
+            "salesian_family_groups": {...}, "sources": {...},
+            "confidence_distribution": {"high": 120, "medium": 80, "low": 40},
+            "average_confidence": 0.64,
+            "ontology_classified": 231
+        }
+    }
+    
+    Counts are maintained as pages are indexed (a recrawled or reclassified
+    page replaces its old counts). Responses carry an ETag, so polling
+    clients get a 304 until the counts change.
+    """
+    job_id = request.args.get('job')
+    index, error = get_page_index(job_id)
+    if error:
+        return error
+    
+    statistics, version = index.statistics()
+    etag = f"{job_id or 'file'}-{index.generation:x}-{version}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify({
+            "success": True,
+            "statistics": statistics
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/pages/<int:page_id>', methods=['GET'])
+def get_page(page_id):
+    """
+    Full record of one page (HTML snippet, ul/li blocks, text) by the id
+    returned from /api/pages; pass the same "job" parameter
+    """
+    index, error = get_page_index(request.args.get('job'))
+    if error:
+        return error
+    
+    page = index.get_page(page_id)
+    if page is None:
+        return jsonify({
+            "error": f"Unknown page: {page_id}"
+        }), 404
+    return jsonify({
+        "success": True,
+        "data": page
+    })
+
 @app.route('/api/scrape-single', methods=['POST'])
 def scrape_single():
     """
@@ -177,31 +741,31 @@ def get_owl_categories():
             "salesian_family_groups": {...}
         }
     }
+    
+    Served from the shared ontology registry: the JSON body is precomputed
+    when the OWL file is (re)loaded and carries an ETag, so repeated
+    requests with If-None-Match get a 304.
     """
     try:
-        from owl_parser import OntologyParser
-        
-        owl_file = "salesian_simple.owl"
-        if not os.path.exists(owl_file):
+        registry = ontology_registry.get_registry(crawler_taxonomy.OWL_FILE)
+        if not os.path.exists(registry.owl_file):
             return jsonify({
-                "error": f"OWL file {owl_file} not found"
+                "error": f"OWL file {registry.owl_file} not found"
             }), 404
         
-        parser = OntologyParser(owl_file)
-        categories = parser.get_all_categories()
+        body, etag = registry.get_categories_response()
+        if body is None:
+            return jsonify({
+                "error": "Failed to load OWL categories: ontology could not be parsed"
+            }), 500
         
-        return jsonify({
-            "success": True,
-            "categories": categories,
-            "statistics": {
-                "document_types_count": len(categories.get('document_types', {})),
-                "work_types_count": len(categories.get('work_types', {})),
-                "themes_count": len(categories.get('themes', {})),
-                "areas_of_reference_count": len(categories.get('areas_of_reference', {})),
-                "geo_areas_count": len(categories.get('geo_areas', {})),
-                "salesian_family_groups_count": len(categories.get('salesian_family_groups', {}))
-            }
-        })
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     
     except Exception as e:
         return jsonify({
@@ -0,0 +1,383 @@
+"""
+Benchmark: end-to-end crawler throughput against a local synthetic site
+
+Serves a generated site from a threaded HTTP server on 127.0.0.1 (no access
+to the real site needed) and runs, each in a fresh process:
+
+- crawl:            crawl_site, sequential (delay 0)
+- crawl-concurrent: crawl_site with --concurrency threads (and
+                    --parse-workers processes, if given)
+- single:           scrape_single_page over the first --single-pages URLs
+- classify:         extract_html_parts + classify_extracted on the page HTML
+                    (no HTTP), i.e. the classification stack alone
+
+and reports pages/sec, p50/p99 per-page latency, CPU seconds (including
+parse worker processes) and peak RSS, plus the p50/p99 of every crawl stage
+from crawl_metrics. The site is deterministic for a given --seed, and the
+OpenAI fallback is disabled, so runs are comparable across commits: save
+one with --json and pass it to --compare on the next.
+
+Site options: --pages, --fanout (child links per page, plus two random
+cross links), --page-kb, --latency-ms / --jitter-ms (per response),
+--error-rate (pages answering 404), --flaky-rate (pages answering 503 once,
+then 200; exercises the retry path) and --robots allow|missing|block.
+A scenario that returns under 90% of the pages it should reach is reported
+and makes the benchmark exit with an error.
+
+Usage:
+    python benchmarks/bench_crawl.py [--pages 300] [--concurrency 8] [--json out.json]
+    python benchmarks/bench_crawl.py --compare out.json
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import platform
+import resource
+import threading
+import subprocess
+import multiprocessing
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+SCENARIOS = ("crawl", "crawl-concurrent", "single", "classify")
+
+# parish-site vocabulary with keywords of the ontology and predefined taxonomy
+WORDS = ("school college parish youth centre oratory education students teachers admission "
+         "mass feast novena vocation formation mission missionary volunteers community "
+         "news event celebration report letter provincial council chapter retreat prayer "
+         "don bosco salesian sisters cooperators past pupils boys girls poor street children "
+         "technical institute training skills employment chennai tamil nadu india province "
+         "hostel boarding sports music drama festival social work development welfare health "
+         "the and of to in for with on at by from a is was are this that our their we").split()
+
+ROBOTS = {
+    "allow": "User-agent: *\nDisallow: /private/\n",
+    "block": "User-agent: *\nDisallow: /\n",
+}
+
+
+class SyntheticSite:
+    def __init__(self, pages=300, fanout=4, page_kb=30, error_rate=0.0, flaky_rate=0.0, seed=1):
+        self.pages = pages
+        self.fanout = fanout
+        self.page_kb = page_kb
+        rng = random.Random(seed)
+        others = list(range(1, pages))
+        self.missing = set(rng.sample(others, int(error_rate * len(others))))
+        self.flaky = set(rng.sample(others, int(flaky_rate * len(others))))
+        self.seed = seed
+
+    @staticmethod
+    def path(i):
+        return "/" if i == 0 else f"/page/{i}"
+
+    def links(self, i):
+        rng = random.Random(self.seed * 100003 + i)
+        children = range(i * self.fanout + 1, min(i * self.fanout + self.fanout, self.pages - 1) + 1)
+        return list(children) + [rng.randrange(self.pages) for _ in range(2)]
+
+    def html(self, i):
+        rng = random.Random(self.seed * 1000003 + i)
+        title = " ".join(rng.choice(WORDS) for _ in range(5)).title()
+        nav = "".join(f'<li><a href="{self.path(k)}">Section {k}</a></li>' for k in range(min(8, self.pages)))
+        links = "".join(f'<li><a href="{self.path(k)}">Related {k}</a></li>' for k in self.links(i))
+        head = (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title} - Page {i}</title>'
+                f'<meta name="description" content="{title} at the province">'
+                f'<script>var page = {i};</script></head><body>'
+                f'<header><nav><ul class="menu">{nav}</ul></nav></header>'
+                f'<main><article><h1>{title}</h1>')
+        tail = f'<ul class="related">{links}</ul></article></main><footer><p>Page {i}</p></footer></body></html>'
+        parts = [head]
+        size = len(head) + len(tail)
+        while size < self.page_kb * 1024:
+            paragraph = "<p>" + " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) + "</p>"
+            parts.append(paragraph)
+            size += len(paragraph)
+        parts.append(tail)
+        return "".join(parts)
+
+    def all_html(self):
+        return [self.html(i) for i in range(self.pages)]
+
+
+def make_handler(site, bodies, latency_ms, jitter_ms, robots):
+    index = {site.path(i): i for i in range(site.pages)}
+    flaky_seen = set()
+    lock = threading.Lock()
+
+    class SiteHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like a real server
+
+        def do_GET(self):
+            # /page/N and /page/N/ are the same page (crawl scopes may keep the slash)
+            path = self.path.split("?", 1)[0].rstrip("/") or "/"
+            # deterministic per-path latency
+            jitter = (zlib.crc32(path.encode()) % 1000) / 1000 * jitter_ms
+            time.sleep((latency_ms + jitter) / 1000)
+
+            i = index.get(path)
+            headers = {}
+            if path == "/robots.txt":
+                status, body = (200, ROBOTS[robots]) if robots in ROBOTS else (404, "")
+            elif i is None or i in site.missing:
+                status, body = 404, "<html><body>Not found</body></html>"
+            else:
+                with lock:
+                    first = i in site.flaky and path not in flaky_seen
+                    flaky_seen.add(path)
+                if first:
+                    status, body = 503, "<html><body>Busy</body></html>"
+                    headers["Retry-After"] = "0"
+                else:
+                    status, body = 200, bodies[i]
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8" if path != "/robots.txt"
+                             else "text/plain")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return SiteHandler
+
+
+def start_server(site, latency_ms, jitter_ms, robots):
+    server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                 make_handler(site, site.all_html(), latency_ms, jitter_ms, robots))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values`, or None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _rusage():
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = self_usage.ru_utime + self_usage.ru_stime + children.ru_utime + children.ru_stime
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return cpu, max(self_usage.ru_maxrss, children.ru_maxrss) / scale
+
+
+def run_scenario(scenario, base_url, options):
+    """Run one scenario in this (fresh) process and return its measurements"""
+    import crawler_taxonomy
+    from crawl_metrics import get_metrics
+    from parse_pool import get_parse_pool
+
+    crawler_taxonomy.OPENAI_API_KEY = ""  # never call OpenAI from a benchmark
+    site = SyntheticSite(options["pages"], options["fanout"], options["page_kb"],
+                         options["error_rate"], options["flaky_rate"], options["seed"])
+    metrics = get_metrics()
+    latencies = []
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        # load the ontology and scorers before timing
+        crawler_taxonomy.classify_extracted(crawler_taxonomy.extract_html_parts(site.html(0)))
+        before = metrics.snapshot()
+        cpu0, _ = _rusage()
+        t0 = time.perf_counter()
+
+        if scenario in ("crawl", "crawl-concurrent"):
+            concurrent = scenario == "crawl-concurrent"
+            workers = options["parse_workers"] if concurrent else 0
+            results = crawler_taxonomy.crawl_site(
+                base_url + "/", max_pages=options["pages"], delay=0,
+                concurrency=options["concurrency"] if concurrent else 1,
+                parse_workers=workers)
+            latencies = [sum(r["timings"].values()) for r in results if "timings" in r]
+            pages = len(results)
+            if workers:
+                get_parse_pool(workers).close()  # so RUSAGE_CHILDREN includes the workers
+        elif scenario == "single":
+            pages = 0
+            for i in range(min(options["single_pages"], site.pages)):
+                if i in site.missing:
+                    continue
+                t = time.perf_counter()
+                if crawler_taxonomy.scrape_single_page(base_url + site.path(i)):
+                    pages += 1
+                latencies.append((time.perf_counter() - t) * 1000)
+        else:
+            bodies = site.all_html()
+            t0 = time.perf_counter()  # page generation is not part of the stack
+            for html in bodies:
+                t = time.perf_counter()
+                crawler_taxonomy.classify_extracted(crawler_taxonomy.extract_html_parts(html))
+                latencies.append((time.perf_counter() - t) * 1000)
+            pages = len(bodies)
+
+        seconds = time.perf_counter() - t0
+        cpu1, peak_rss = _rusage()
+        stages = metrics.histograms_since(before)
+
+    return {
+        "scenario": scenario,
+        "pages": pages,
+        "seconds": round(seconds, 3),
+        "pages_per_s": round(pages / seconds, 2) if seconds else None,
+        "p50_ms": round(percentile(latencies, 0.5), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None,
+        "cpu_s": round(cpu1 - cpu0, 3),
+        "peak_rss_mb": round(peak_rss, 1),
+        "stages": {stage: {"n": h.count,
+                           "p50_ms": round(h.quantile(0.5) * 1000, 2),
+                           "p99_ms": round(h.quantile(0.99) * 1000, 2)}
+                   for stage, h in sorted(stages.items())},
+    }
+
+
+def _child(scenario, base_url, options, queue):
+    try:
+        queue.put(run_scenario(scenario, base_url, options))
+    except Exception as e:
+        queue.put({"scenario": scenario, "error": repr(e)})
+
+
+def run_isolated(scenario, base_url, options):
+    """run_scenario in a spawned process, so peak RSS and CPU are per scenario"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(scenario, base_url, options, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def expected_pages(site, scenario, options):
+    """Pages a scenario should return: every page that does not answer 404"""
+    if options["robots"] == "block" and scenario.startswith("crawl"):
+        return 0
+    if scenario == "single":
+        return sum(1 for i in range(min(options["single_pages"], site.pages)) if i not in site.missing)
+    if scenario == "classify":
+        return site.pages
+    # pages only reachable through missing pages are not crawled either
+    seen, stack = {0}, [0]
+    while stack:
+        for k in site.links(stack.pop()):
+            if k not in seen and k not in site.missing:
+                seen.add(k)
+                stack.append(k)
+    return len(seen)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=300)
+    ap.add_argument("--fanout", type=int, default=4)
+    ap.add_argument("--page-kb", type=int, default=30)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--error-rate", type=float, default=0.02)
+    ap.add_argument("--flaky-rate", type=float, default=0.02)
+    ap.add_argument("--robots", choices=("allow", "missing", "block"), default="allow")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--parse-workers", type=int, default=0)
+    ap.add_argument("--single-pages", type=int, default=50)
+    ap.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    ap.add_argument("--repeat", type=int, default=1, help="runs per scenario; the median is reported")
+    ap.add_argument("--json", help="write the results to this file")
+    ap.add_argument("--compare", help="results file of an earlier run to compare against")
+    args = ap.parse_args()
+
+    options = {k: getattr(args, k) for k in ("pages", "fanout", "page_kb", "latency_ms", "jitter_ms",
+                                             "error_rate", "flaky_rate", "robots", "seed",
+                                             "concurrency", "parse_workers", "single_pages")}
+    site = SyntheticSite(args.pages, args.fanout, args.page_kb, args.error_rate, args.flaky_rate,
+                         args.seed)
+    server, base_url = start_server(site, args.latency_ms, args.jitter_ms, args.robots)
+    print(f"Synthetic site at {base_url}: {args.pages} pages of ~{args.page_kb} KB, fan-out "
+          f"{args.fanout}, {args.latency_ms:g}+{args.jitter_ms:g} ms latency, "
+          f"{len(site.missing)} missing, {len(site.flaky)} flaky, robots {args.robots}\n")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        baseline = {r["scenario"]: r for r in previous["results"]}
+        if previous.get("options") != options:
+            print(f"[WARN] {args.compare} was run with different options; numbers may not be comparable\n")
+
+    results = []
+    incomplete = []
+    try:
+        print(f"{'scenario':<18}{'pages':>7}{'pages/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+              f"{'CPU s':>9}{'RSS MB':>9}" + ("   vs baseline" if baseline else ""))
+        for scenario in args.scenarios:
+            runs = [run_isolated(scenario, base_url, options) for _ in range(max(1, args.repeat))]
+            failed = [r for r in runs if "error" in r]
+            if failed:
+                print(f"{scenario:<18}failed: {failed[0]['error']}")
+                results.append(failed[0])
+                continue
+            result = sorted(runs, key=lambda r: r["seconds"])[len(runs) // 2]
+            results.append(result)
+            expected = expected_pages(site, scenario, options)
+            if result["pages"] < 0.9 * expected:
+                incomplete.append(scenario)
+                print(f"[WARN] {scenario} got {result['pages']} of {expected} expected pages; "
+                      f"the numbers do not cover the whole site")
+            change = ""
+            old = baseline.get(scenario)
+            if old and old.get("pages_per_s") and result["pages_per_s"]:
+                change = f"   {(result['pages_per_s'] / old['pages_per_s'] - 1) * 100:+.1f}% pages/s"
+            print(f"{scenario:<18}{result['pages']:>7}{fmt(result['pages_per_s'], '.1f'):>10}"
+                  f"{fmt(result['p50_ms'], '.1f'):>10}{fmt(result['p99_ms'], '.1f'):>10}"
+                  f"{result['cpu_s']:>9.2f}{result['peak_rss_mb']:>9.1f}{change}")
+            for stage, s in result["stages"].items():
+                print(f"    {stage:<22}n={s['n']:<6} p50={s['p50_ms']:.1f}ms p99={s['p99_ms']:.1f}ms")
+    finally:
+        server.shutdown()
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "options": options,
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    if incomplete:
+        sys.exit(f"Incomplete crawl in: {', '.join(incomplete)}")
+
+
+if __name__ == "__main__":
+    main()
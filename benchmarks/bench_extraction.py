@@ -0,0 +1,127 @@
+"""
+Benchmark: page extraction backends and profiles
+
+Compares the current path (BeautifulSoup + html.parser, every field
+materialized) with the lxml / selectolax backends and the lean profile
+(no ul/full-HTML serialization), and reports whether each backend's
+clean_text, title, meta_description and li_items match the reference.
+
+Pages: every *.html file in --pages-dir (e.g. pages saved from a site), the
+full_html_snippet of records in a crawl output file (--crawl-output, JSON
+array or NDJSON), or synthetic parish-site pages built from sample.txt.
+
+Usage:
+    python benchmarks/bench_extraction.py [--pages-dir DIR | --crawl-output FILE] [--repeat 3]
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import random
+import argparse
+from html import escape
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import html_extract
+from html_extract import FULL_PROFILE, LEAN_PROFILE, PageExtraction, parse_document
+
+
+def load_pages_dir(path):
+    pages = []
+    for name in sorted(glob.glob(os.path.join(path, "*.htm*"))):
+        with open(name, "r", encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    return pages
+
+
+def load_crawl_output(path):
+    from crawl_output import iter_ndjson
+    if path.endswith(".ndjson"):
+        records = iter_ndjson(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    return [r["full_html_snippet"] for r in records if r.get("full_html_snippet")]
+
+
+def synthetic_pages(n, seed=7):
+    """Pages shaped like the target sites: nav menus, scripts, text, footer lists"""
+    rng = random.Random(seed)
+    with open(os.path.join(ROOT, "sample.txt"), "r", encoding="utf-8") as f:
+        words = [escape(w) for w in f.read().split()]
+    menu = "".join(f'<li class="menu-item"><a href="/section-{i}/">Section {i}</a>'
+                   f'<ul class="sub-menu">' +
+                   "".join(f'<li><a href="/section-{i}/page-{j}/">Page {i}.{j}</a></li>' for j in range(6)) +
+                   "</ul></li>" for i in range(12))
+    pages = []
+    for p in range(n):
+        paragraphs = "".join(
+            "<p>" + " ".join(rng.choice(words) for _ in range(rng.randint(40, 120))) + "</p>"
+            for _ in range(rng.randint(8, 30)))
+        pages.append(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Page {p} - Salesian Province</title>
+<meta name="description" content="Description of page {p}">
+<style>body {{ font-family: sans-serif; }} .menu-item {{ display: inline; }}</style>
+<script>window.dataLayer = window.dataLayer || []; function gtag(){{dataLayer.push(arguments);}}</script>
+</head><body>
+<header><nav><ul class="menu">{menu}</ul></nav></header>
+<main><article><h1>Page {p}</h1>{paragraphs}
+<!-- related posts --><ul class="related">{"".join(f'<li><a href="/post-{rng.randint(1, 999)}">Post</a></li>' for _ in range(10))}</ul>
+</article></main>
+<footer><ul>{"".join(f"<li>Footer link {k}</li>" for k in range(15))}</ul>
+<script src="/wp-includes/js/jquery.js"></script></footer>
+</body></html>""")
+    return pages
+
+
+def extract_all(pages, backend, profile):
+    out = []
+    for html in pages:
+        doc = parse_document(html, backend)
+        parts = PageExtraction(doc, profile)
+        out.append({field: parts[field] for field in html_extract.FIELDS})
+        doc.hrefs()
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages-dir")
+    ap.add_argument("--crawl-output")
+    ap.add_argument("--synthetic", type=int, default=60, help="number of synthetic pages")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.pages_dir:
+        pages = load_pages_dir(args.pages_dir)
+    elif args.crawl_output:
+        pages = load_crawl_output(args.crawl_output)
+    else:
+        pages = synthetic_pages(args.synthetic)
+    total_kb = sum(len(p) for p in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb:.0f} KB of HTML; backends: {', '.join(html_extract.BACKENDS)}\n")
+
+    reference = extract_all(pages, "bs4", FULL_PROFILE)
+    print(f"{'backend':<12}{'profile':<8}{'ms/page':>10}{'speedup':>9}   matches bs4 (text/title/meta/li)")
+    base = None
+    for backend in html_extract.BACKENDS:
+        for profile in (FULL_PROFILE, LEAN_PROFILE):
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                out = extract_all(pages, backend, profile)
+                best = min(best, time.perf_counter() - t0)
+            ms = best * 1000 / len(pages)
+            base = base or ms
+            same = sum(all(o[f] == r[f] for f in ("clean_text", "title", "meta_description"))
+                       and (o["li_items"] == r["li_items"] or "li_items" not in profile.fields)
+                       for o, r in zip(out, reference))
+            print(f"{backend:<12}{profile.name:<8}{ms:>10.2f}{base / ms:>8.1f}x   {same}/{len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
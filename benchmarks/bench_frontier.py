@@ -0,0 +1,105 @@
+"""
+Benchmark: crawl frontier enqueue cost on synthetic link graphs
+
+Compares the old `deque` + linear `in` membership check with CrawlFrontier
+in exact / fingerprint / bloom modes. Each graph has N pages with a fixed
+link fan-out; the benchmark replays a BFS and times every enqueue attempt.
+
+Usage:
+    python benchmarks/bench_frontier.py [--sizes 1000 5000 20000 100000] [--fanout 30]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from crawl_frontier import CrawlFrontier
+
+# the old deque scan gets quadratic; skip it above this size
+DEQUE_LIMIT = 20000
+
+
+def build_graph(n, fanout, seed=42):
+    """Synthetic site: page i links to `fanout` random pages plus i+1"""
+    rng = random.Random(seed)
+    urls = [f"https://example.org/section-{i % 50}/page-{i}" for i in range(n)]
+    links = []
+    for i in range(n):
+        out = [urls[rng.randrange(n)] for _ in range(fanout)]
+        if i + 1 < n:
+            out.append(urls[i + 1])
+        links.append(out)
+    index = {u: i for i, u in enumerate(urls)}
+    return urls, links, index
+
+
+def run_deque(urls, links, index):
+    visited = set()
+    q = deque([urls[0]])
+    attempts = 0
+    t0 = time.perf_counter()
+    while q:
+        url = q.popleft()
+        if url in visited:
+            continue
+        visited.add(url)
+        for link in links[index[url]]:
+            attempts += 1
+            if link not in visited and link not in q:
+                q.append(link)
+    return time.perf_counter() - t0, attempts, len(visited)
+
+
+def run_frontier(urls, links, index, mode):
+    frontier = CrawlFrontier(mode, bloom_capacity=max(len(urls), 1000))
+    frontier.add(urls[0])
+    attempts = 0
+    crawled = 0
+    t0 = time.perf_counter()
+    while frontier:
+        url = frontier.pop()
+        crawled += 1
+        for link in links[index[url]]:
+            attempts += 1
+            frontier.add(link)
+    return time.perf_counter() - t0, attempts, crawled
+
+
+def seen_memory(n, mode):
+    """Bytes retained by the seen-set after inserting n freshly built URLs"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    frontier = CrawlFrontier(mode, bloom_capacity=max(n, 1000))
+    for i in range(n):
+        frontier._seen.add(f"https://example.org/section-{i % 50}/page-{i}")
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 100000])
+    ap.add_argument("--fanout", type=int, default=30)
+    args = ap.parse_args()
+
+    print(f"{'pages':>8} {'impl':>12} {'total_s':>9} {'us/enqueue':>11} {'crawled':>8} {'seen_mem_kb':>12}")
+    for n in args.sizes:
+        urls, links, index = build_graph(n, args.fanout)
+        if n <= DEQUE_LIMIT:
+            secs, attempts, crawled = run_deque(urls, links, index)
+            print(f"{n:>8} {'deque-scan':>12} {secs:>9.3f} {secs / attempts * 1e6:>11.2f} {crawled:>8} {'-':>12}")
+        for mode in ("exact", "fingerprint", "bloom"):
+            secs, attempts, crawled = run_frontier(urls, links, index, mode)
+            mem_kb = seen_memory(n, mode) / 1024
+            print(f"{n:>8} {mode:>12} {secs:>9.3f} {secs / attempts * 1e6:>11.2f} {crawled:>8} {mem_kb:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: LLM classification stage against a local stub chat-completions server
+
+Compares one blocking request per page (the old call_openai_classify
+behaviour) with batched, concurrent requests, then reruns the batched
+configuration to show the response cache. No network access is needed: the
+stub answers /chat/completions with a keyword-based category per page after
+a fixed latency.
+
+Usage:
+    python benchmarks/bench_llm_batching.py [--pages 60] [--latency 0.2]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from llm_classifier import LLMClassifier, LLMBudget, LLMResponseCache
+
+PAGE_RE = re.compile(r"^Page (\d+) \(first \d+ chars\):\n(.*?)(?=\nPage \d+ \(|\Z)", re.M | re.S)
+KEYWORDS = {"News": "news", "Events": "event", "Admissions": "admission", "Contact": "contact"}
+
+
+def make_stub_handler(latency):
+    class StubHandler(BaseHTTPRequestHandler):
+        requests_seen = 0
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][0]["content"]
+            results = []
+            for n, text in PAGE_RE.findall(prompt):
+                category = next((c for c, k in KEYWORDS.items() if k in text.lower()), "About")
+                results.append({"page": int(n), "category": category, "confidence": 70,
+                                "reason": "stub"})
+            time.sleep(latency)
+            StubHandler.requests_seen += 1
+            reply = json.dumps({
+                "choices": [{"message": {"content": json.dumps({"results": results})}}],
+                "usage": {"total_tokens": len(prompt) // 4 + 20 * len(results)}
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def make_pages(n):
+    topics = ["news bulletin", "event calendar", "admission fees", "contact address", "our history"]
+    return [f"Page {i} about {topics[i % len(topics)]} " + "lorem ipsum dolor sit amet " * 40
+            for i in range(n)]
+
+
+def run(base_url, pages, batch_size, concurrency, cache=None, threads=8):
+    budget = LLMBudget(max_requests=None, max_tokens=None)
+    clf = LLMClassifier("stub-key", categories=list(KEYWORDS), base_url=base_url,
+                        batch_size=batch_size, max_concurrency=concurrency, budget=budget, cache=cache)
+    t0 = time.perf_counter()
+    if batch_size == 1 and concurrency == 1:
+        results = [clf.classify(text) for text in pages]
+    else:
+        # crawl worker threads classify pages as they finish
+        results = [None] * len(pages)
+
+        def worker(offset):
+            for i in range(offset, len(pages), threads):
+                results[i] = clf.classify(pages[i])
+
+        workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    elapsed = time.perf_counter() - t0
+    clf.close()
+    return results, elapsed, clf.stats()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=60)
+    ap.add_argument("--latency", type=float, default=0.2, help="stub response time in seconds")
+    ap.add_argument("--batch-size", type=int, default=5)
+    ap.add_argument("--concurrency", type=int, default=2)
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_stub_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    pages = make_pages(args.pages)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(os.path.join(tmp, "llm.sqlite"))
+        configs = [
+            ("per page (old)", 1, 1, None),
+            (f"batch={args.batch_size} conc={args.concurrency}", args.batch_size, args.concurrency, cache),
+            ("same, cached", args.batch_size, args.concurrency, cache),
+        ]
+        print(f"{'mode':<24}{'seconds':>10}{'requests':>10}{'cached':>8}{'tokens':>10}")
+        baseline = None
+        for name, batch_size, concurrency, c in configs:
+            results, elapsed, stats = run(base_url, pages, batch_size, concurrency, c)
+            if baseline is None:
+                baseline = results
+            assert results == baseline, f"{name}: results differ from per-page classification"
+            print(f"{name:<24}{elapsed:>10.2f}{stats['requests']:>10}{stats['cached']:>8}"
+                  f"{stats['budget']['tokens']:>10}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Microbenchmark: OntologyParser.classify_page
+
+Compares the legacy scorer (one `re.findall(r'\\bkeyword\\b')` per keyword of
+every entity) with the compiled single-pass matcher, and checks both
+produce identical classifications.
+
+Pages: sample.txt (~11k chars) and a synthetic 15k-character page.
+
+Usage:
+    python benchmarks/bench_ontology_classify.py [--repeat 200]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from owl_parser import OntologyParser
+
+
+def legacy_classify(parser, text, title="", meta_description=""):
+    """classify_page as it was before the compiled matcher: a regex scan per keyword"""
+    combined_text = f"{title} {meta_description} {text}".lower()
+
+    def score_group(entities, threshold=0.0):
+        scores = {}
+        for entity_id, entity_label in entities.items():
+            score = parser._calculate_score(combined_text, entity_id, entity_label)
+            if score > threshold:
+                scores[entity_id] = (entity_label, score)
+        return scores
+
+    def best(scores):
+        if not scores:
+            return None
+        b = max(scores.items(), key=lambda x: x[1][1])
+        return {'id': b[0], 'label': b[1][0], 'confidence': b[1][1]}
+
+    def top3(scores):
+        ranked = sorted(scores.items(), key=lambda x: x[1][1], reverse=True)[:3]
+        return [{'id': k, 'label': v[0], 'confidence': v[1]} for k, v in ranked]
+
+    classification = {
+        'document_type': best(score_group(parser.document_types)),
+        'work_type': best(score_group(parser.work_types)),
+        'themes': top3(score_group(parser.themes, 0.3)),
+        'areas_of_reference': top3(score_group(parser.areas_of_reference, 0.3)),
+        'geo_area': best(score_group(parser.geo_areas)),
+        'salesian_family_group': best(score_group(parser.salesian_family_groups)),
+        'confidence_scores': {}
+    }
+    for key in ('document_type', 'work_type'):
+        if classification[key]:
+            classification['confidence_scores'][key] = classification[key]['confidence']
+    return classification
+
+
+def synthetic_page(parser, size=15000, seed=7):
+    """Page text mixing ontology vocabulary with filler words"""
+    rng = random.Random(seed)
+    vocab = []
+    for group in parser.get_all_categories().values():
+        for label in group.values():
+            vocab.extend(label.split())
+    filler = ["the", "our", "community", "students", "welcome", "campus", "news",
+              "events", "contact", "program", "chennai", "province", "activities"]
+    words = []
+    while sum(len(w) + 1 for w in words) < size:
+        words.append(rng.choice(vocab) if rng.random() < 0.2 else rng.choice(filler))
+    return " ".join(words)[:size]
+
+
+def bench(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    parser = OntologyParser(os.path.join(ROOT, "salesian_simple.owl"))
+    with open(os.path.join(ROOT, "sample.txt"), encoding="utf-8") as f:
+        sample = f.read()
+    pages = {
+        f"sample.txt ({len(sample)} chars)": sample,
+        "synthetic (15000 chars)": synthetic_page(parser),
+    }
+
+    print(f"{'page':>26} {'legacy_ms':>10} {'compiled_ms':>12} {'speedup':>8} {'identical':>10}")
+    for name, text in pages.items():
+        same = legacy_classify(parser, text, "Title", "Meta") == parser.classify_page(text, "Title", "Meta")
+        legacy = bench(lambda: legacy_classify(parser, text, "Title", "Meta"), args.repeat)
+        compiled = bench(lambda: parser.classify_page(text, "Title", "Meta"), args.repeat)
+        print(f"{name:>26} {legacy * 1000:>10.3f} {compiled * 1000:>12.3f} {legacy / compiled:>7.1f}x {str(same):>10}")
+
+
+if __name__ == "__main__":
+    main()
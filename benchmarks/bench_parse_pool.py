@@ -0,0 +1,88 @@
+"""
+Benchmark: parse + classify throughput with the process pool
+
+Runs the CPU-bound stage of the crawler (crawler_taxonomy.analyze_page:
+extraction, link discovery, OWL and predefined-taxonomy scoring) over saved
+pages, first in threads of this process (GIL-bound, like the threaded
+crawler without a pool) and then through ParsePool with 1, 2, 4, ... worker
+processes up to the CPU count. Reports pages/sec and checks every pool run
+classifies the pages exactly like the in-process run.
+
+Pages: the same sources as bench_extraction.py (--pages-dir, --crawl-output
+or synthetic pages).
+
+Usage:
+    python benchmarks/bench_parse_pool.py [--pages-dir DIR | --crawl-output FILE] [--threads 8]
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from crawler_taxonomy import analyze_page
+from parse_pool import ParsePool
+from bench_extraction import load_pages_dir, load_crawl_output, synthetic_pages
+
+BASE_URL = "https://www.donboscochennai.org/"
+
+
+def run_threads(pages, threads):
+    """analyze_page from `threads` fetcher-like threads in this process"""
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda html: analyze_page(BASE_URL, html), pages))
+
+
+def run_pool(pages, workers):
+    pool = ParsePool(workers)
+    try:
+        pool.warm_up()
+        t0 = time.perf_counter()
+        futures = [pool.submit(BASE_URL, html) for html in pages]
+        out = [f.result() for f in futures]
+        return out, time.perf_counter() - t0
+    finally:
+        pool.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages-dir")
+    ap.add_argument("--crawl-output")
+    ap.add_argument("--synthetic", type=int, default=200, help="number of synthetic pages")
+    ap.add_argument("--threads", type=int, default=8, help="threads for the in-process run")
+    args = ap.parse_args()
+
+    if args.pages_dir:
+        pages = load_pages_dir(args.pages_dir)
+    elif args.crawl_output:
+        pages = load_crawl_output(args.crawl_output)
+    else:
+        pages = synthetic_pages(args.synthetic)
+    cpus = os.cpu_count() or 1
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages) / 1024:.0f} KB of HTML, {cpus} CPUs\n")
+
+    run_threads(pages[:5], 1)  # load the ontology before timing
+    t0 = time.perf_counter()
+    reference = run_threads(pages, args.threads)
+    base = len(pages) / (time.perf_counter() - t0)
+    print(f"{'mode':<24}{'pages/s':>10}{'speedup':>9}   same classification")
+    print(f"{f'in-process, {args.threads} threads':<24}{base:>10.1f}{1.0:>8.1f}x")
+
+    workers = 1
+    while True:
+        out, seconds = run_pool(pages, workers)
+        rate = len(pages) / seconds
+        same = sum(o[2] == r[2] and o[1] == r[1] for o, r in zip(out, reference))
+        print(f"{f'pool, {workers} workers':<24}{rate:>10.1f}{rate / base:>8.1f}x   {same}/{len(pages)}")
+        if workers >= cpus:
+            break
+        workers = min(workers * 2, cpus)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Scaling benchmark: structure_scraped_data
+
+Times structure_scraped_data on 1k / 5k / 20k synthetic page records shaped
+like crawler output (ontology labels plus a large HTML snippet). The legacy
+index builder (a list-membership scan of whole page dicts per index entry)
+is timed too, up to --legacy-max pages, and both outputs are compared.
+
+Usage:
+    python benchmarks/bench_structure_data.py [--sizes 1000 5000 20000] [--legacy-max 1000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from data_structure_utils import structure_scraped_data
+
+CATEGORIES = ["About", "News", "Events", "Institutions", "Projects", "Contact", "Media"]
+LABELS = {
+    "document_type": ["News Article", "Event", "Report", "Letter", "Profile"],
+    "work_type": ["School", "Parish", "Youth Centre", "Technical Institute"],
+    "themes": ["Education", "Youth Ministry", "Vocation", "Mission", "Social Work", "Spirituality"],
+    "areas_of_reference": ["Formation", "Communication", "Economy", "Youth Pastoral"],
+    "geo_area": ["Chennai", "Tamil Nadu", "South Asia"],
+    "salesian_family_group": ["SDB", "FMA", "Cooperators", "Past Pupils"],
+}
+
+
+def synthetic_pages(n, snippet_kb=20, seed=3):
+    """Page records with ontology labels; every page shares one snippet string"""
+    rng = random.Random(seed)
+    snippet = "<html>" + "x" * (snippet_kb * 1024) + "</html>"
+    pages = []
+    for i in range(n):
+        label = lambda field: {"label": rng.choice(LABELS[field]), "confidence": rng.random()}
+        pages.append({
+            "url": f"https://example.org/page-{i}",
+            "title": f"Page {i}",
+            "category": rng.choice(CATEGORIES),
+            "confidence": rng.random(),
+            "category_source": rng.choice(["ontology", "predefined", "auto"]),
+            "ontology": {
+                "document_type": label("document_type") if rng.random() < 0.8 else None,
+                "work_type": label("work_type") if rng.random() < 0.6 else None,
+                "themes": [label("themes") for _ in range(rng.randint(0, 3))],
+                "areas_of_reference": [label("areas_of_reference") for _ in range(rng.randint(0, 2))],
+                "geo_area": label("geo_area") if rng.random() < 0.5 else None,
+                "salesian_family_group": label("salesian_family_group") if rng.random() < 0.4 else None,
+            },
+            "clean_text": f"text of page {i}",
+            # unique prefix so the legacy equality checks compare the snippet
+            "full_html_snippet": f"<!-- {i} -->" + snippet,
+        })
+    return pages
+
+
+FAMILIES = [
+    ("by_category", lambda page: [page.get("category", "Uncategorized")]),
+    ("by_document_type", lambda page: [page["ontology"]["document_type"]["label"]]
+     if page["ontology"].get("document_type") else []),
+    ("by_work_type", lambda page: [page["ontology"]["work_type"]["label"]]
+     if page["ontology"].get("work_type") else []),
+    ("by_theme", lambda page: [t["label"] for t in page["ontology"].get("themes") or []]),
+    ("by_area_of_reference", lambda page: [a["label"] for a in page["ontology"].get("areas_of_reference") or []]),
+    ("by_geo_area", lambda page: [page["ontology"]["geo_area"]["label"]]
+     if page["ontology"].get("geo_area") else []),
+    ("by_salesian_family_group", lambda page: [page["ontology"]["salesian_family_group"]["label"]]
+     if page["ontology"].get("salesian_family_group") else []),
+]
+
+
+def legacy_indexes(pages):
+    """Indexes as the old implementation built them: pages grouped per label, then `p in v`"""
+    out = {}
+    for family, labels_of in FAMILIES:
+        groups = {}
+        for page in pages:
+            for label in labels_of(page):
+                groups.setdefault(label, []).append(page)
+        out[family] = {k: [i for i, p in enumerate(pages) if p in v] for k, v in groups.items()}
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    ap.add_argument("--legacy-max", type=int, default=1000,
+                    help="largest size to run the quadratic legacy builder on")
+    args = ap.parse_args()
+
+    print(f"{'pages':>8}{'structure s':>14}{'legacy index s':>17}   same indexes")
+    for n in args.sizes:
+        pages = synthetic_pages(n)
+        t0 = time.perf_counter()
+        structured = structure_scraped_data(pages)
+        seconds = time.perf_counter() - t0
+        legacy = same = "-"
+        if n <= args.legacy_max:
+            t0 = time.perf_counter()
+            expected = legacy_indexes(pages)
+            legacy = f"{time.perf_counter() - t0:.2f}"
+            same = "yes" if expected == structured["indexes"] else "NO"
+        print(f"{n:>8}{seconds:>14.3f}{legacy:>17}   {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Persistent page-classification cache (SQLite)
+- Keyed by a hash of (title, meta_description, clean_text); each entry
+  remembers the OWL content hash and predefined-taxonomy version it was
+  classified under
+- Unchanged pages skip the OWL, predefined and OpenAI classifiers entirely
+- After an ontology edit only affected entries are recomputed: the old and
+  new ontologies' keyword signatures are diffed, and an entry stays valid
+  when none of the changed entities' keywords occur in its text
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+DEFAULT_CLASSIFY_CACHE_PATH = os.getenv("CRAWL_CLASSIFY_CACHE",
+                                        os.path.join("http_cache", "classifications.sqlite"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("CRAWL_CLASSIFY_CACHE_ENTRIES", 200000))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    text_key TEXT PRIMARY KEY,
+    ontology_hash TEXT,
+    taxonomy_version TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS ontologies (hash TEXT PRIMARY KEY, signature TEXT NOT NULL);
+"""
+
+
+def text_key(title, meta_description, clean_text):
+    """Stable key for the classifier inputs of a page"""
+    h = hashlib.sha256()
+    for part in (title or "", meta_description or "", clean_text or ""):
+        h.update(part.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def changed_keywords(old_signature, new_signature):
+    """
+    Keywords of entities that differ between two ontology signatures
+    (see OntologyParser.keyword_signature), or None if the edit can change
+    any page's result (a group's remaining entities were reordered)
+    """
+    changed = set()
+    for group in set(old_signature) | set(new_signature):
+        old = [json.dumps(e) for e in old_signature.get(group, [])]
+        new = [json.dumps(e) for e in new_signature.get(group, [])]
+        old_set, new_set = set(old), set(new)
+        # ties between equal scores go to the first entity, so order matters
+        if [e for e in old if e in new_set] != [e for e in new if e in old_set]:
+            return None
+        for entity in old_set ^ new_set:
+            changed.update(keyword for keyword, _ in json.loads(entity)[2])
+    return changed
+
+
+class ClassificationCache:
+    def __init__(self, path=DEFAULT_CLASSIFY_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            path: SQLite file for the cache
+            max_entries: Least recently used entries are evicted beyond this
+        """
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        self._signatures = {}
+        self._diffs = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def register_ontology(self, ontology_hash, signature):
+        """Remember the keyword signature of an ontology version (once per hash)"""
+        if ontology_hash is None or ontology_hash in self._signatures:
+            return
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO ontologies (hash, signature) VALUES (?, ?)",
+                               (ontology_hash, json.dumps(signature)))
+            self._conn.commit()
+            self._signatures[ontology_hash] = signature
+
+    def _signature(self, ontology_hash):
+        if ontology_hash not in self._signatures:
+            row = self._conn.execute("SELECT signature FROM ontologies WHERE hash = ?",
+                                     (ontology_hash,)).fetchone()
+            self._signatures[ontology_hash] = json.loads(row[0]) if row else None
+        return self._signatures[ontology_hash]
+
+    def _diff_pattern(self, old_hash, new_hash):
+        """
+        Regex matching any keyword changed between two ontology versions;
+        None if every entry is affected, False if no keyword changed
+        """
+        key = (old_hash, new_hash)
+        if key not in self._diffs:
+            old, new = self._signature(old_hash), self._signature(new_hash)
+            keywords = changed_keywords(old, new) if old is not None and new is not None else None
+            if keywords is None:
+                self._diffs[key] = None
+            elif not keywords:
+                self._diffs[key] = False
+            else:
+                alternatives = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+                self._diffs[key] = re.compile(r"\b(?:" + alternatives + r")\b")
+        return self._diffs[key]
+
+    def lookup(self, key, ontology_hash, taxonomy_version, text=""):
+        """
+        Cached classification for `key`, or None
+
+        Args:
+            key: text_key() of the page
+            ontology_hash: Content hash of the current OWL file
+            taxonomy_version: Version of the predefined taxonomy / fallbacks
+            text: Lowercased classifier input, used to check whether an
+                  ontology edit touches this page
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ontology_hash, taxonomy_version, classification FROM entries WHERE text_key = ?",
+                (key,)).fetchone()
+            if row is None or row[1] != taxonomy_version:
+                self.misses += 1
+                return None
+            stored_hash, _, classification = row
+            if stored_hash != ontology_hash:
+                pattern = self._diff_pattern(stored_hash, ontology_hash)
+                if pattern is None or (pattern and pattern.search(text)):
+                    self.misses += 1
+                    return None
+                # the edit does not touch this page: carry the entry forward
+                self._conn.execute("UPDATE entries SET ontology_hash = ? WHERE text_key = ?",
+                                   (ontology_hash, key))
+                self.revalidated += 1
+            else:
+                self.hits += 1
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE text_key = ?", (time.time(), key))
+            self._conn.commit()
+        return tuple(json.loads(classification))
+
+    def store(self, key, ontology_hash, taxonomy_version, classification):
+        """Store a (category, confidence, source, reason, ontology) tuple"""
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM entries WHERE text_key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (text_key, ontology_hash, taxonomy_version, "
+                "classification, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, ontology_hash, taxonomy_version,
+                 json.dumps(list(classification), ensure_ascii=False), time.time()))
+            if not exists:
+                self._count += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        excess = self._count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE text_key IN "
+                "(SELECT text_key FROM entries ORDER BY last_access LIMIT ?)", (excess,))
+            self._count -= excess
+
+    def stats(self):
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_classification_cache(path=DEFAULT_CLASSIFY_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+    """Shared ClassificationCache per path (one SQLite connection per process)"""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ClassificationCache(path, max_entries)
+        return cache
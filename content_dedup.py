@@ -0,0 +1,123 @@
+"""
+Content deduplication for crawled pages
+- Exact duplicates: SHA-1 of the raw body, checked before parsing
+- Near duplicates: 64-bit SimHash over word 3-gram shingles of clean_text,
+  looked up through 4 x 16-bit band tables (any pair within 3 bits shares a band)
+- Duplicates reuse the canonical page's classification instead of going
+  through the classifiers again
+"""
+
+import re
+import hashlib
+import threading
+
+WORD_RE = re.compile(r'\w+')
+SIMHASH_BITS = 64
+BANDS = 4
+BAND_BITS = SIMHASH_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def body_hash(body):
+    return hashlib.sha1(body.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+MIN_WORDS = 8  # shorter texts are too small for a meaningful SimHash
+
+
+def simhash(text, shingle_size=3):
+    """64-bit SimHash of the text's word shingles, or None for very short texts"""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < max(MIN_WORDS, shingle_size):
+        return None
+    shingles = {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+    bits = [format(int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+            for s in shingles]
+    half = len(bits) / 2
+    # column-wise majority vote; zip(*bits) keeps the per-bit counting in C
+    fingerprint = 0
+    for column in zip(*bits):
+        fingerprint = (fingerprint << 1) | (column.count("1") > half)
+    return fingerprint
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class CanonicalPage:
+    """What a duplicate needs from the first page seen with that content"""
+    __slots__ = ("url", "title", "meta_description", "classification", "links", "simhash")
+
+    def __init__(self, url, title, meta_description, classification, links, simhash):
+        self.url = url
+        self.title = title
+        self.meta_description = meta_description
+        self.classification = classification
+        self.links = links
+        self.simhash = simhash
+
+
+class ContentDeduplicator:
+    def __init__(self, max_distance=3):
+        """
+        Args:
+            max_distance: Largest SimHash Hamming distance treated as a near
+                          duplicate (at most 3 with 4 bands)
+        """
+        self.max_distance = min(max_distance, BANDS - 1)
+        self._lock = threading.Lock()
+        self._by_body = {}
+        self._bands = [dict() for _ in range(BANDS)]
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.unique_pages = 0
+
+    def find_exact(self, digest):
+        with self._lock:
+            page = self._by_body.get(digest)
+            if page:
+                self.exact_duplicates += 1
+            return page
+
+    def find_near(self, fingerprint):
+        if fingerprint is None:
+            return None
+        with self._lock:
+            for band, table in enumerate(self._bands):
+                key = (fingerprint >> (band * BAND_BITS)) & BAND_MASK
+                for page in table.get(key, ()):
+                    if hamming(page.simhash, fingerprint) <= self.max_distance:
+                        self.near_duplicates += 1
+                        return page
+            return None
+
+    def add(self, url, digest, fingerprint, title, meta_description, classification, links):
+        """Register a page processed in full as canonical for its content"""
+        page = CanonicalPage(url, title, meta_description, classification, links, fingerprint)
+        with self._lock:
+            self._by_body.setdefault(digest, page)
+            if fingerprint is not None:
+                for band, table in enumerate(self._bands):
+                    key = (fingerprint >> (band * BAND_BITS)) & BAND_MASK
+                    table.setdefault(key, []).append(page)
+            self.unique_pages += 1
+        return page
+
+    def add_body(self, url, digest, title, meta_description, classification, links):
+        """
+        Register a near duplicate's own body, so exact copies of it alias
+        this page (it is not used for near-duplicate lookups)
+        """
+        page = CanonicalPage(url, title, meta_description, classification, links, None)
+        with self._lock:
+            self._by_body.setdefault(digest, page)
+        return page
+
+    def stats(self):
+        with self._lock:
+            return {
+                "unique": self.unique_pages,
+                "exact_duplicates": self.exact_duplicates,
+                "near_duplicates": self.near_duplicates
+            }
@@ -0,0 +1,112 @@
+"""
+Persistent crawl checkpoints (SQLite)
+- Frontier (queued URLs in order, with link depth), visited URLs and
+  completed page records
+- Updated as the crawl runs and committed every `commit_every` pages, so a
+  killed crawl loses at most that many pages of work
+- A resumed crawl replays completed pages and continues with the frontier
+  without refetching anything already done
+"""
+
+import os
+import json
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS frontier (seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE NOT NULL,
+                                     depth INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS pages (seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, record TEXT NOT NULL);
+"""
+
+
+class CrawlCheckpoint:
+    def __init__(self, path, commit_every=25):
+        """
+        Args:
+            path: SQLite file to create or reopen
+            commit_every: Commit after this many crawled pages
+        """
+        self.path = path
+        self.commit_every = max(1, commit_every)
+        self._pending = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(frontier)")}
+        if "depth" not in columns:
+            # checkpoints written before link depth was tracked
+            self._conn.execute("ALTER TABLE frontier ADD COLUMN depth INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    # --- metadata ---
+    def get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                           (key, json.dumps(value)))
+
+    @property
+    def is_empty(self):
+        return self.get_meta("start_url") is None
+
+    # --- state restore ---
+    def page_count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def iter_pages(self):
+        """Completed page records in crawl order (read lazily)"""
+        for (record,) in self._conn.execute("SELECT record FROM pages ORDER BY seq"):
+            yield json.loads(record)
+
+    def iter_visited(self):
+        for (url,) in self._conn.execute("SELECT url FROM visited"):
+            yield url
+
+    def iter_frontier(self):
+        """Pending (url, depth) pairs in queue order"""
+        yield from self._conn.execute("SELECT url, depth FROM frontier ORDER BY seq")
+
+    def restore_frontier(self, frontier):
+        """Load visited URLs as seen and re-queue pending URLs in their original order"""
+        for url in self.iter_visited():
+            frontier.mark_seen(url)
+        for url, depth in self.iter_frontier():
+            frontier.add(url, depth)
+
+    # --- incremental updates ---
+    def record_queued(self, urls, depth=0):
+        self._conn.executemany("INSERT OR IGNORE INTO frontier (url, depth) VALUES (?, ?)",
+                               ((u, depth) for u in urls))
+
+    def record_page(self, url, result, new_links, link_depth=0):
+        """
+        A page finished (result None if it failed); its new links were
+        queued at depth `link_depth`
+        """
+        self._conn.execute("DELETE FROM frontier WHERE url = ?", (url,))
+        self._conn.execute("INSERT OR IGNORE INTO visited (url) VALUES (?)", (url,))
+        if result:
+            self._conn.execute("INSERT INTO pages (url, record) VALUES (?, ?)",
+                               (url, json.dumps(result, ensure_ascii=False)))
+        self.record_queued(new_links, link_depth)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self, status=None):
+        if status:
+            self.set_meta("status", status)
+        self.commit()
+        self._conn.close()
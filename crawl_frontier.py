@@ -0,0 +1,183 @@
+"""
+Crawl frontier for BFS crawling
+- FIFO queue of URLs still to fetch, each with its link depth from the start URL
+- O(1) hashed "seen" membership covering queued and visited URLs
+- Optional compact modes for very large crawls:
+    "fingerprint": 64-bit URL hashes in a flat table instead of URL strings
+    "bloom":       fixed-size Bloom filter (bounded memory, tiny false-positive rate)
+"""
+
+import math
+import hashlib
+from array import array
+from collections import deque
+
+FRONTIER_MODES = ("exact", "fingerprint", "bloom")
+
+
+def url_fingerprint(url):
+    """Stable 64-bit fingerprint of a URL"""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class FingerprintSet:
+    """
+    Set of URLs stored as 64-bit fingerprints in an open-addressing table
+    (~16 bytes per URL; collision odds ~n^2 / 2^65)
+    """
+
+    def __init__(self, initial_capacity=1024):
+        self._table = array("Q", bytes(8 * initial_capacity))
+        self._mask = initial_capacity - 1
+        self._count = 0
+
+    def _slot(self, fp):
+        table, mask = self._table, self._mask
+        i = fp & mask
+        while True:
+            cur = table[i]
+            if cur == 0 or cur == fp:
+                return i, cur
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old = self._table
+        self._table = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._table) - 1
+        for fp in old:
+            if fp:
+                i, _ = self._slot(fp)
+                self._table[i] = fp
+
+    def add(self, url):
+        """Insert `url`; returns True if it was not present before"""
+        fp = url_fingerprint(url) or 1  # 0 marks an empty slot
+        i, cur = self._slot(fp)
+        if cur:
+            return False
+        self._table[i] = fp
+        self._count += 1
+        if self._count * 10 > len(self._table) * 6:
+            self._grow()
+        return True
+
+    def __contains__(self, url):
+        return self._slot(url_fingerprint(url) or 1)[1] != 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def size_bytes(self):
+        return self._table.itemsize * len(self._table)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter; memory does not grow with the number of URLs"""
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        """
+        Args:
+            capacity: Number of URLs the filter is sized for
+            error_rate: Target false-positive rate at `capacity` items
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _hashes(self, url):
+        # double hashing: position i is h1 + i*h2, both from one 128-bit digest
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+
+    def add(self, url):
+        """Insert `url`; returns True if it was (probably) not present before"""
+        h1, h2 = self._hashes(url)
+        bits, m = self._bits, self.num_bits
+        new = False
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % m
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                new = True
+        if new:
+            self._count += 1
+        return new
+
+    def __contains__(self, url):
+        h1, h2 = self._hashes(url)
+        bits, m = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % m
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def size_bytes(self):
+        return len(self._bits)
+
+
+class CrawlFrontier:
+    def __init__(self, mode="exact", bloom_capacity=1000000, bloom_error_rate=0.001):
+        """
+        Args:
+            mode: "exact" (set of URLs), "fingerprint" (64-bit hashes) or "bloom"
+            bloom_capacity: Expected number of distinct URLs (bloom mode)
+            bloom_error_rate: False-positive rate at capacity (bloom mode);
+                              a false positive means a URL is skipped
+        """
+        if mode not in FRONTIER_MODES:
+            raise ValueError(f"Unknown frontier mode: {mode}. Expected one of {FRONTIER_MODES}")
+        self.mode = mode
+        self._queue = deque()
+        if mode == "bloom":
+            self._seen = BloomFilter(bloom_capacity, bloom_error_rate)
+        elif mode == "fingerprint":
+            self._seen = FingerprintSet()
+        else:
+            self._seen = set()
+
+    def add(self, url, depth=0):
+        """Enqueue `url` unless it was ever queued before; returns True if added"""
+        if self.mode == "exact":
+            if url in self._seen:
+                return False
+            self._seen.add(url)
+        elif not self._seen.add(url):
+            return False
+        self._queue.append((url, depth))
+        return True
+
+    def mark_seen(self, url):
+        """Record `url` as already visited without queueing it"""
+        self._seen.add(url)
+
+    def pop(self):
+        """Remove and return the next URL to crawl (FIFO)"""
+        return self._queue.popleft()[0]
+
+    def pop_entry(self):
+        """Remove and return the next (url, depth) to crawl (FIFO)"""
+        return self._queue.popleft()
+
+    def seen(self, url):
+        """True if `url` was ever queued (still queued or already visited)"""
+        return url in self._seen
+
+    @property
+    def seen_count(self):
+        return len(self._seen)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __bool__(self):
+        return bool(self._queue)
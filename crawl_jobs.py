@@ -0,0 +1,170 @@
+"""
+Background crawl jobs for the API server
+- Submitting a crawl returns a job id immediately
+- A bounded thread pool runs crawl_site for queued jobs
+- Jobs report progress (pages done, queue depth, pages/sec, ETA),
+  expose partial results and can be cancelled
+"""
+
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from crawler_taxonomy import crawl_site
+
+DEFAULT_JOB_WORKERS = int(os.getenv("CRAWL_JOB_WORKERS", 2))
+MAX_ACTIVE_JOBS = int(os.getenv("CRAWL_MAX_ACTIVE_JOBS", 20))
+MAX_FINISHED_JOBS = int(os.getenv("CRAWL_MAX_FINISHED_JOBS", 50))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class CrawlJob:
+    def __init__(self, params):
+        """
+        Args:
+            params: Keyword arguments for crawl_site (start_url, max_pages, ...)
+        """
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = QUEUED
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.pages_done = 0
+        self.pages_failed = 0
+        self.queue_depth = 0
+        self.current_url = None
+        self.results = []
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def _on_page(self, url, result, queue_depth):
+        with self._lock:
+            self.current_url = url
+            self.queue_depth = queue_depth
+            if result:
+                self.results.append(result)
+                self.pages_done += 1
+            else:
+                self.pages_failed += 1
+
+    def run(self):
+        if self.cancel_event.is_set():
+            self._finish(CANCELLED)
+            return
+        with self._lock:
+            self.status = RUNNING
+            self.started_at = time.time()
+        try:
+            crawl_site(on_page=self._on_page, cancel_event=self.cancel_event, **self.params)
+            self._finish(CANCELLED if self.cancel_event.is_set() else COMPLETED)
+        except Exception as e:
+            print(f"[WARN] Crawl job {self.id} failed: {e}")
+            self._finish(FAILED, str(e))
+
+    def _finish(self, status, error=None):
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+
+    def cancel(self):
+        self.cancel_event.set()
+        with self._lock:
+            if self.status == QUEUED:
+                self.status = CANCELLED
+                self.finished_at = time.time()
+
+    def progress(self):
+        """Status snapshot: counts, throughput and a rough ETA"""
+        with self._lock:
+            now = self.finished_at or time.time()
+            elapsed = now - self.started_at if self.started_at else 0.0
+            pages_per_sec = self.pages_done / elapsed if elapsed > 0 else 0.0
+            max_pages = self.params.get("max_pages", 0)
+            scope = self.params.get("scope")
+            eta = None
+            if self.status == RUNNING and pages_per_sec > 0:
+                # the frontier keeps growing, so bound the estimate by what is queued now
+                remaining = max(0, min(max_pages - self.pages_done, self.queue_depth))
+                eta = round(remaining / pages_per_sec, 1)
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "url": self.params.get("start_url"),
+                "max_pages": max_pages,
+                "pages_done": self.pages_done,
+                "pages_failed": self.pages_failed,
+                "queue_depth": self.queue_depth,
+                "current_url": self.current_url,
+                "elapsed_seconds": round(elapsed, 2),
+                "pages_per_sec": round(pages_per_sec, 3),
+                "eta_seconds": eta,
+                "scope": scope.stats() if hasattr(scope, "stats") else None,
+                "error": self.error
+            }
+
+    def get_results(self, offset=0, limit=None):
+        """Slice of the pages crawled so far"""
+        with self._lock:
+            end = None if limit is None else offset + limit
+            return self.results[offset:end], len(self.results)
+
+
+class CrawlJobManager:
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, max_active=MAX_ACTIVE_JOBS,
+                 max_finished=MAX_FINISHED_JOBS):
+        """
+        Args:
+            max_workers: Crawls that may run at the same time
+            max_active: Queued + running jobs accepted before submit refuses
+            max_finished: Finished jobs kept for result retrieval (oldest dropped first)
+        """
+        self.max_workers = max_workers
+        self.max_active = max_active
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, params):
+        """Queue a crawl; returns the CrawlJob or None if too many jobs are active"""
+        with self._lock:
+            self._evict_finished()
+            active = sum(1 for j in self._jobs.values() if j.status not in FINISHED_STATES)
+            if active >= self.max_active:
+                return None
+            job = CrawlJob(params)
+            self._jobs[job.id] = job
+        self._executor.submit(job.run)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.progress() for job in jobs]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job:
+            job.cancel()
+        return job
+
+    def _evict_finished(self):
+        finished = [jid for jid, j in self._jobs.items() if j.status in FINISHED_STATES]
+        for jid in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[jid]
@@ -0,0 +1,236 @@
+"""
+Crawl instrumentation
+- Per-stage latency histograms (fetch, extract, ontology / predefined /
+  OpenAI classification)
+- Counters for bytes fetched, HTTP status codes, retries and pages, and
+  gauges for queue depth and pages/sec of running crawls
+- Prometheus text exposition for the API's /metrics endpoint and a
+  per-crawl summary from snapshot differences
+"""
+
+import time
+import bisect
+import itertools
+import threading
+from contextlib import contextmanager
+
+# seconds; covers sub-millisecond scoring up to slow fetches
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+# stage names used by the crawler
+FETCH = "fetch"
+EXTRACT = "extract"
+CLASSIFY_ONTOLOGY = "classify_ontology"
+CLASSIFY_PREDEFINED = "classify_predefined"
+CLASSIFY_LLM = "classify_llm"
+STAGES = (FETCH, EXTRACT, CLASSIFY_ONTOLOGY, CLASSIFY_PREDEFINED, CLASSIFY_LLM)
+
+HELP = {
+    "crawler_stage_seconds": ("histogram", "Latency of each crawl pipeline stage"),
+    "crawler_http_requests_total": ("counter", "HTTP responses by status code (error = no response)"),
+    "crawler_http_retries_total": ("counter", "Fetch attempts retried after a transient failure"),
+    "crawler_bytes_fetched_total": ("counter", "Response body bytes downloaded"),
+    "crawler_pages_total": ("counter", "Crawled pages by outcome"),
+    "crawler_queue_depth": ("gauge", "URLs waiting in the frontier of a running crawl"),
+    "crawler_pages_per_second": ("gauge", "Throughput of a running crawl"),
+}
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def copy(self):
+        h = Histogram(self.buckets)
+        h.counts = list(self.counts)
+        h.sum = self.sum
+        h.count = self.count
+        return h
+
+    def minus(self, other):
+        """Observations made since `other` (an earlier copy)"""
+        h = self.copy()
+        if other is not None:
+            h.counts = [a - b for a, b in zip(self.counts, other.counts)]
+            h.sum -= other.sum
+            h.count -= other.count
+        return h
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q):
+        """Estimate (linear within the bucket), or None without observations"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i > 0 else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}  # stage -> Histogram
+            self.counters = {}    # (name, ((label, value), ...)) -> number
+            self.gauges = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """Observe the duration of the with-block as `stage`"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if value is None:
+                self.gauges.pop(key, None)
+            else:
+                self.gauges[key] = value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "histograms": {stage: h.copy() for stage, h in self.histograms.items()},
+                "counters": dict(self.counters),
+            }
+
+    def histograms_since(self, before):
+        """{stage: Histogram} of the observations made since the `before` snapshot"""
+        now = self.snapshot()["histograms"]
+        out = {}
+        for stage, h in now.items():
+            delta = h.minus(before["histograms"].get(stage))
+            if delta.count:
+                out[stage] = delta
+        return out
+
+    def merge_histograms(self, histograms):
+        """Add observations made elsewhere (e.g. by a parse worker process)"""
+        with self._lock:
+            for stage, h in histograms.items():
+                histogram = self.histograms.get(stage)
+                if histogram is None:
+                    histogram = self.histograms[stage] = Histogram(h.buckets)
+                histogram.merge(h)
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            histograms = {stage: h.copy() for stage, h in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        lines = []
+
+        name = "crawler_stage_seconds"
+        lines += [f"# HELP {name} {HELP[name][1]}", f"# TYPE {name} histogram"]
+        for stage in sorted(histograms):
+            h = histograms[stage]
+            cumulative = 0
+            for bound, n in zip(h.buckets + (float("inf"),), h.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+
+        for values in (counters, gauges):
+            names = sorted({key[0] for key in values})
+            for name in names:
+                kind, text = HELP.get(name, ("untyped", name))
+                lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+                for (metric, labels), value in sorted(values.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, before, elapsed, pages):
+        """
+        Lines describing what happened since the `before` snapshot:
+        per-stage count / p50 / p99 / total time, HTTP and throughput counters
+        """
+        now = self.snapshot()
+        lines = []
+        for stage in STAGES + tuple(sorted(set(now["histograms"]) - set(STAGES))):
+            if stage not in now["histograms"]:
+                continue
+            h = now["histograms"][stage].minus(before["histograms"].get(stage))
+            if not h.count:
+                continue
+            lines.append(f"{stage}: n={h.count} p50={h.quantile(0.5) * 1000:.1f}ms "
+                         f"p99={h.quantile(0.99) * 1000:.1f}ms total={h.sum:.2f}s")
+
+        def delta(name):
+            out = {}
+            for key, value in now["counters"].items():
+                if key[0] == name:
+                    d = value - before["counters"].get(key, 0)
+                    if d:
+                        out[",".join(v for _, v in key[1]) or name] = d
+            return out
+
+        statuses = delta("crawler_http_requests_total")
+        status_text = ", ".join(f"{k}={v}" for k, v in sorted(statuses.items())) or "none"
+        fetched = sum(delta("crawler_bytes_fetched_total").values())
+        retries = sum(delta("crawler_http_retries_total").values())
+        rate = pages / elapsed if elapsed > 0 else 0.0
+        lines.append(f"http: {status_text}; {fetched / 1e6:.2f} MB fetched, {retries} retries")
+        lines.append(f"throughput: {pages} pages in {elapsed:.1f}s ({rate:.2f} pages/s)")
+        return lines
+
+
+METRICS = MetricsRegistry()
+_crawl_ids = itertools.count(1)
+
+
+def new_crawl_id():
+    """Label value telling the gauges of concurrent crawls apart"""
+    return str(next(_crawl_ids))
+
+
+def get_metrics():
+    """Process-wide MetricsRegistry"""
+    return METRICS
@@ -0,0 +1,122 @@
+"""
+Incremental crawl output
+- NDJSONWriter appends one page record per line as soon as it is crawled,
+  so an interrupted run keeps every page finished so far
+- iter_ndjson reads such a file back lazily, skipping a torn last line
+- iter_json_array reads a JSON array of records lazily, chunk by chunk
+- ndjson_to_json_array converts to the JSON-array format used by the
+  dashboard and data_structure_utils without loading everything in memory
+"""
+
+import os
+import json
+
+
+class NDJSONWriter:
+    def __init__(self, path, append=False, fsync_every=50):
+        """
+        Args:
+            path: Output file path
+            append: Keep existing records instead of truncating the file
+            fsync_every: Force the data to disk every N records (0 disables);
+                         every record is flushed to the OS immediately
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.count = 0
+        self._f = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False))
+        self._f.write("\n")
+        self._f.flush()
+        self.count += 1
+        if self.fsync_every and self.count % self.fsync_every == 0:
+            os.fsync(self._f.fileno())
+
+    def close(self):
+        if not self._f.closed:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_ndjson(path):
+    """Yield records from an NDJSON file one at a time"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # a crash mid-write can leave a partial last line
+                print(f"[WARN] Skipping unreadable line {line_no} in {path}")
+
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """
+    Yield the elements of a top-level JSON array of objects one at a time,
+    reading the file in chunks instead of loading it whole
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        started = False
+
+        def fill():
+            nonlocal buf, pos
+            chunk = f.read(chunk_size)
+            buf = buf[pos:] + chunk
+            pos = 0
+            return bool(chunk)
+
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos == len(buf):
+                if not fill():
+                    raise ValueError(f"{path}: unexpected end of JSON array")
+                continue
+            char = buf[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError(f"{path} is not a JSON array")
+                started = True
+                pos += 1
+            elif char == "]":
+                return
+            elif char == ",":
+                pos += 1
+            else:
+                try:
+                    record, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # record continues in the next chunk
+                    if not fill():
+                        raise
+                    continue
+                pos = end
+                yield record
+
+
+def ndjson_to_json_array(ndjson_path, json_path):
+    """Stream an NDJSON file into a JSON array file; returns the record count"""
+    count = 0
+    with open(json_path, "w", encoding="utf-8") as out:
+        out.write("[\n")
+        for record in iter_ndjson(ndjson_path):
+            if count:
+                out.write(",\n")
+            out.write(json.dumps(record, ensure_ascii=False))
+            count += 1
+        out.write("\n]\n")
+    return count
@@ -0,0 +1,58 @@
+"""
+Per-host politeness scheduler for concurrent crawling
+- Enforces a minimum interval between request starts to the same host
+- Caps the number of requests in flight to the same host
+- Thread-safe, shared by all crawl workers
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+from urllib.parse import urlparse
+
+
+class HostScheduler:
+    def __init__(self, per_host_rps=None, max_in_flight=2):
+        """
+        Args:
+            per_host_rps: Maximum request starts per second for a single host
+                          (None or 0 disables the interval)
+            max_in_flight: Maximum concurrent requests to a single host
+        """
+        self.min_interval = 1.0 / per_host_rps if per_host_rps else 0.0
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._cond = threading.Condition()
+        self._next_start = {}
+        self._in_flight = defaultdict(int)
+
+    def acquire(self, url):
+        """Block until a request to the URL's host may start; returns the host"""
+        host = urlparse(url).netloc
+        with self._cond:
+            while self._in_flight[host] >= self.max_in_flight:
+                self._cond.wait()
+            self._in_flight[host] += 1
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.min_interval
+
+        wait = start - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        return host
+
+    def release(self, host):
+        """Mark a request to `host` as finished"""
+        with self._cond:
+            self._in_flight[host] -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, url):
+        """Context manager wrapping acquire/release around one request"""
+        host = self.acquire(url)
+        try:
+            yield host
+        finally:
+            self.release(host)
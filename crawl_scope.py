@@ -0,0 +1,175 @@
+"""
+URL canonicalization and crawl-scope rules
+- Canonical form: lowercase scheme/host, default port dropped, fragment
+  removed, tracking/unwanted query parameters stripped, remaining parameters
+  sorted, trailing slash removed (unless the scope keeps it)
+- Scope rules: same host only, http(s) only, extension blocklist,
+  include/exclude path regexes, maximum link depth
+- Every discovered link is parsed once; rejections are counted per rule
+"""
+
+import re
+import os
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# query parameters that never change page content
+DEFAULT_STRIP_PARAMS = (
+    "utm_*", "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "share", "replytocom", "sessionid", "phpsessid", "sid"
+)
+
+# files that are not HTML pages
+DEFAULT_BLOCKED_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".bmp", ".ico", ".tif", ".tiff",
+    ".mp3", ".mp4", ".m4a", ".wav", ".avi", ".mov", ".wmv", ".webm", ".ogg",
+    ".zip", ".rar", ".7z", ".gz", ".tar", ".exe", ".dmg", ".apk",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt", ".csv",
+    ".css", ".js", ".json", ".xml", ".rss", ".woff", ".woff2", ".ttf", ".eot"
+)
+
+# from_options types: lists of strings and booleans
+LIST_OPTIONS = ("strip_params", "keep_params", "include", "exclude", "blocked_extensions")
+BOOL_OPTIONS = ("strip_all_params", "lowercase_path", "keep_trailing_slash")
+
+# rejection reasons reported by CrawlScope.stats()
+REJECT_REASONS = ("scheme", "external", "extension", "excluded", "not_included", "max_depth", "invalid")
+
+
+class CrawlScope:
+    def __init__(self, base_url, strip_params=DEFAULT_STRIP_PARAMS, keep_params=None,
+                 strip_all_params=False, include=None, exclude=None,
+                 blocked_extensions=DEFAULT_BLOCKED_EXTENSIONS, max_depth=None,
+                 lowercase_path=False, keep_trailing_slash=False):
+        """
+        Args:
+            base_url: Start URL; only links on its host are in scope
+            strip_params: Query parameter names to drop ("prefix*" wildcards allowed)
+            keep_params: If given, drop every query parameter not listed here
+            strip_all_params: Drop the whole query string
+            include: Regexes; if given, a link's path+query must match one of them
+            exclude: Regexes; links whose path+query match any of them are skipped
+                     (e.g. calendar or pagination traps)
+            blocked_extensions: Path extensions never fetched (PDFs, images, ...)
+            max_depth: Maximum link distance from the start URL (None = unlimited)
+            lowercase_path: Also lowercase the path (for case-insensitive servers)
+            keep_trailing_slash: Keep trailing slashes, for servers where /x
+                                 and /x/ are different resources
+        """
+        self.strip_exact = {p.lower() for p in strip_params or () if not p.endswith("*")}
+        self.strip_prefixes = tuple(p[:-1].lower() for p in strip_params or () if p.endswith("*"))
+        self.keep_params = {p.lower() for p in keep_params} if keep_params is not None else None
+        self.strip_all_params = strip_all_params
+        self.include = [re.compile(p) for p in include or ()]
+        self.exclude = [re.compile(p) for p in exclude or ()]
+        self.blocked_extensions = {e.lower() if e.startswith(".") else "." + e.lower()
+                                   for e in blocked_extensions or ()}
+        self.max_depth = max_depth
+        self.lowercase_path = lowercase_path
+        self.keep_trailing_slash = keep_trailing_slash
+        self.base_url = self.canonicalize(base_url)
+        self.host = urlsplit(self.base_url).netloc
+        self.rejected = {reason: 0 for reason in REJECT_REASONS}
+        self.accepted = 0
+        self.params_stripped = 0
+
+    @classmethod
+    def from_options(cls, base_url, options):
+        """Build a scope from a JSON-style dict (keys match the constructor arguments)"""
+        options = dict(options or {})
+        allowed = {"strip_params", "keep_params", "strip_all_params", "include", "exclude",
+                   "blocked_extensions", "max_depth", "lowercase_path", "keep_trailing_slash"}
+        unknown = set(options) - allowed
+        if unknown:
+            raise ValueError(f"Unknown scope option(s): {', '.join(sorted(unknown))}")
+        for name in LIST_OPTIONS:
+            value = options.get(name)
+            if value is not None and (not isinstance(value, (list, tuple))
+                                      or not all(isinstance(v, str) for v in value)):
+                raise ValueError(f"{name} must be a list of strings")
+        for name in BOOL_OPTIONS:
+            if name in options and not isinstance(options[name], bool):
+                raise ValueError(f"{name} must be true or false")
+        max_depth = options.get("max_depth")
+        if max_depth is not None and (isinstance(max_depth, bool) or not isinstance(max_depth, int)
+                                      or max_depth < 0):
+            raise ValueError("max_depth must be a non-negative integer")
+        return cls(base_url, **options)
+
+    def _keep_param(self, name):
+        name = name.lower()
+        if self.keep_params is not None:
+            return name in self.keep_params
+        return name not in self.strip_exact and not name.startswith(self.strip_prefixes or ("\0",))
+
+    def _canonical_parts(self, parts):
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        if ":" in host:
+            host = f"[{host}]"  # IPv6 literal
+        port = parts.port
+        netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+        path = parts.path.lower() if self.lowercase_path else parts.path
+        query = ""
+        if parts.query and not self.strip_all_params:
+            params = parse_qsl(parts.query, keep_blank_values=True)
+            kept = [(k, v) for k, v in params if self._keep_param(k)]
+            if len(kept) != len(params):
+                self.params_stripped += 1
+            query = urlencode(sorted(kept))
+        elif parts.query:
+            self.params_stripped += 1
+        if not self.keep_trailing_slash:
+            path = path.rstrip("/")
+        return scheme, netloc, path, query
+
+    def canonicalize(self, url):
+        """Canonical form of an absolute URL"""
+        return urlunsplit(self._canonical_parts(urlsplit(url)) + ("",))
+
+    def check(self, url, depth=0):
+        """
+        Apply canonicalization and scope rules to an absolute URL
+
+        Returns:
+            (canonical_url, None) if in scope, else (None, reason)
+        """
+        try:
+            parts = urlsplit(url)
+            scheme, netloc, path, query = self._canonical_parts(parts)
+        except ValueError:
+            return self._reject("invalid")
+        if scheme not in DEFAULT_PORTS:
+            return self._reject("scheme")
+        if netloc != self.host:
+            return self._reject("external")
+        if self.blocked_extensions and os.path.splitext(path)[1].lower() in self.blocked_extensions:
+            return self._reject("extension")
+        target = path + ("?" + query if query else "")
+        if self.exclude and any(p.search(target) for p in self.exclude):
+            return self._reject("excluded")
+        if self.include and not any(p.search(target) for p in self.include):
+            return self._reject("not_included")
+        if self.max_depth is not None and depth > self.max_depth:
+            return self._reject("max_depth")
+        self.accepted += 1
+        return urlunsplit((scheme, netloc, path, query, "")), None
+
+    def _reject(self, reason):
+        self.rejected[reason] += 1
+        return None, reason
+
+    def filter_links(self, links, depth):
+        """Canonical in-scope URLs among `links` found at link distance `depth`"""
+        for link in links:
+            canonical, _ = self.check(link, depth)
+            if canonical:
+                yield canonical
+
+    def stats(self):
+        return {
+            "accepted": self.accepted,
+            "params_stripped": self.params_stripped,
+            "rejected": dict(self.rejected)
+        }
@@ -0,0 +1,266 @@
+"""
+Compact crawl result storage (SQLite)
+- Light metadata (url, title, category, confidence, ontology labels) in a
+  pages table that can be queried without touching page content
+- Heavy fields (clean_text, full_html_snippet, ul_blocks, li_items) as
+  compressed blobs (zstd when the zstandard package is installed, zlib
+  otherwise), loaded only when asked for
+- CrawlStore.write has the NDJSONWriter interface, so crawls can write to a
+  store directly; convert_to_store converts existing JSON / NDJSON output
+"""
+
+import os
+import json
+import zlib
+import sqlite3
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+BLOB_FIELDS = ("clean_text", "full_html_snippet", "ul_blocks", "li_items")
+# page record keys stored as columns
+LIGHT_FIELDS = ("url", "title", "meta_description", "category", "confidence", "category_source",
+                "category_reason", "duplicate_of")
+SINGLE_LABELS = ("document_type", "work_type", "geo_area", "salesian_family_group")
+MULTI_LABELS = ("themes", "areas_of_reference")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT, meta_description TEXT, category TEXT, confidence REAL,
+    category_source TEXT, category_reason TEXT, duplicate_of TEXT,
+    document_type TEXT, work_type TEXT, geo_area TEXT, salesian_family_group TEXT,
+    themes TEXT, areas_of_reference TEXT,
+    ontology TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_category ON pages (category);
+CREATE TABLE IF NOT EXISTS blobs (
+    page_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (page_id, field)
+);
+"""
+
+PAGE_COLUMNS = LIGHT_FIELDS + SINGLE_LABELS + MULTI_LABELS + ("ontology", "extra")
+
+
+def is_crawl_store(path):
+    """True if `path` is a SQLite file (a CrawlStore)"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def default_codec():
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return zlib.compress(data, 6)
+
+
+def decompress(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This crawl store uses zstd; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _label(entry):
+    return entry.get("label") if isinstance(entry, dict) else None
+
+
+class CrawlStore:
+    def __init__(self, path, codec=None, commit_every=50, mmap_mb=256):
+        """
+        Args:
+            path: SQLite file to create or open
+            codec: "zstd" or "zlib" for new blobs (defaults to zstd when available)
+            commit_every: Commit after this many written pages
+            mmap_mb: SQLite memory-map size for reads (0 disables)
+        """
+        self.path = path
+        self.codec = codec or default_codec()
+        if self.codec not in ("zstd", "zlib"):
+            raise ValueError(f"Unknown codec: {self.codec}")
+        if self.codec == "zstd" and zstandard is None:
+            raise ValueError("codec zstd needs the zstandard package")
+        self.commit_every = max(1, commit_every)
+        self.count = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if mmap_mb:
+            self._conn.execute(f"PRAGMA mmap_size={int(mmap_mb) * 1024 * 1024}")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    # --- writing ---
+    def write(self, record):
+        """Store a page record; a record with a stored url replaces it"""
+        ontology = record.get("ontology") or {}
+        row = [record.get(field) for field in LIGHT_FIELDS]
+        row += [_label(ontology.get(field)) for field in SINGLE_LABELS]
+        row += [json.dumps([_label(e) for e in ontology.get(field) or []], ensure_ascii=False)
+                for field in MULTI_LABELS]
+        row.append(json.dumps(ontology, ensure_ascii=False))
+        extra = {k: v for k, v in record.items()
+                 if k not in LIGHT_FIELDS and k not in BLOB_FIELDS and k != "ontology"}
+        row.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        blobs = []
+        for field in BLOB_FIELDS:
+            if field in record:
+                value = record[field]
+                data = (value if isinstance(value, str) else json.dumps(value, ensure_ascii=False))
+                blobs.append((field, compress(data.encode("utf-8"), self.codec)))
+
+        with self._lock:
+            cur = self._conn.execute("SELECT id FROM pages WHERE url = ?", (record.get("url", ""),))
+            existing = cur.fetchone()
+            if existing:
+                page_id = existing[0]
+                self._conn.execute(
+                    f"UPDATE pages SET {', '.join(c + ' = ?' for c in PAGE_COLUMNS)} WHERE id = ?",
+                    row + [page_id])
+                self._conn.execute("DELETE FROM blobs WHERE page_id = ?", (page_id,))
+            else:
+                row[0] = row[0] or ""
+                page_id = self._conn.execute(
+                    f"INSERT INTO pages ({', '.join(PAGE_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(PAGE_COLUMNS))})", row).lastrowid
+            self._conn.executemany(
+                "INSERT INTO blobs (page_id, field, codec, data) VALUES (?, ?, ?, ?)",
+                [(page_id, field, self.codec, data) for field, data in blobs])
+            self.count += 1
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+        return page_id
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- reading ---
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def _record(self, row):
+        """Page record (without blobs) from a pages row"""
+        values = dict(zip(("id",) + PAGE_COLUMNS, row))
+        record = {}
+        for field in LIGHT_FIELDS:
+            # NULL = the record did not have the field (e.g. duplicate_of)
+            if values[field] is not None:
+                record[field] = values[field]
+        record["ontology"] = json.loads(values["ontology"]) if values["ontology"] else {}
+        if values["extra"]:
+            record.update(json.loads(values["extra"]))
+        return values["id"], record
+
+    def _load_blobs(self, page_id, record, fields):
+        placeholders = ", ".join("?" * len(fields))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT field, codec, data FROM blobs WHERE page_id = ? AND field IN ({placeholders})",
+                (page_id, *fields)).fetchall()
+        for field, codec, data in rows:
+            text = decompress(data, codec).decode("utf-8")
+            record[field] = text if field in ("clean_text", "full_html_snippet") else json.loads(text)
+
+    def iter_pages(self, fields=BLOB_FIELDS, where="", params=()):
+        """
+        Yield page records in insertion order
+
+        Args:
+            fields: Blob fields to load with each record (() for metadata only)
+            where: Optional SQL condition on the pages table, e.g. "category = ?"
+            params: Parameters for `where`
+        """
+        sql = f"SELECT id, {', '.join(PAGE_COLUMNS)} FROM pages WHERE id > ?"
+        if where:
+            sql += f" AND ({where})"
+        sql += " ORDER BY id LIMIT 500"
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, (last_id, *params)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                page_id, record = self._record(row)
+                if fields:
+                    self._load_blobs(page_id, record, fields)
+                yield record
+            last_id = rows[-1][0]
+
+    def get_page(self, url, fields=BLOB_FIELDS):
+        """Full record for `url` (blobs in `fields`), or None"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT id, {', '.join(PAGE_COLUMNS)} FROM pages WHERE url = ?",
+                                     (url,)).fetchone()
+        if row is None:
+            return None
+        page_id, record = self._record(row)
+        if fields:
+            self._load_blobs(page_id, record, fields)
+        return record
+
+
+def convert_to_store(input_file, store_path, codec=None):
+    """
+    Convert crawl output (JSON array or NDJSON) into a CrawlStore, one
+    page at a time. Returns the number of pages written.
+    """
+    from data_structure_utils import iter_scraped_pages
+    with CrawlStore(store_path, codec=codec) as store:
+        for page in iter_scraped_pages(input_file):
+            store.write(page)
+        return store.count
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: python crawl_store.py <crawl_output.json|.ndjson> <store.sqlite> [zstd|zlib]")
+        sys.exit(1)
+    count = convert_to_store(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    in_mb = os.path.getsize(sys.argv[1]) / 1e6
+    out_mb = os.path.getsize(sys.argv[2]) / 1e6
+    print(f"[INFO] Stored {count} pages in {sys.argv[2]} ({in_mb:.1f} MB -> {out_mb:.1f} MB)")
@@ -4,39 +4,58 @@ crawler_taxonomy.py
 - Extract full HTML, ul blocks, li items, clean text
 - Classify using OWL ontology (Salesian Simple Taxonomy)
 - Fallback to predefined taxonomy or OpenAI if needed
-- Save final structured output to JSON
+- Save final structured output to JSON (written incrementally as NDJSON)
 """
  
 import os
 import time
 import json
 import re
+import hashlib
+import threading
 import requests
-from bs4 import BeautifulSoup
+import http_session
 from urllib.parse import urljoin, urlparse
-from collections import deque
+from collections import deque, Counter
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from crawl_scheduler import HostScheduler
+from crawl_frontier import CrawlFrontier
+from crawl_output import NDJSONWriter, ndjson_to_json_array
+from crawl_checkpoint import CrawlCheckpoint
+from crawl_store import CrawlStore
+from crawl_scope import CrawlScope
+from parse_pool import get_parse_pool
+from crawl_metrics import get_metrics
+import crawl_metrics
+import http_cache
+import content_dedup
+import classification_cache
+import llm_classifier
+import html_extract
 
-# Import OWL parser
+# Shared OWL ontology (parsed once per process, reloaded when the file changes)
 try:
-    from owl_parser import OntologyParser
-    OWL_PARSER = None
-    OWL_FILE = "salesian_simple.owl"
-    if os.path.exists(OWL_FILE):
-        try:
-            OWL_PARSER = OntologyParser(OWL_FILE)
-            print(f"[INFO] Loaded OWL ontology from {OWL_FILE}")
-        except Exception as e:
-            print(f"[WARN] Failed to load OWL ontology: {e}")
-    else:
+    import ontology_registry
+    OWL_FILE = ontology_registry.DEFAULT_OWL_FILE
+    if not os.path.exists(OWL_FILE):
         print(f"[WARN] OWL file {OWL_FILE} not found. Ontology classification disabled.")
 except ImportError:
     print("[WARN] OWL parser not available. Ontology classification disabled.")
-    OWL_PARSER = None
+    ontology_registry = None
+    OWL_FILE = "salesian_simple.owl"
+
+def get_owl_parser():
+    """Current shared OntologyParser, or None if the ontology is unavailable"""
+    if ontology_registry is None:
+        return None
+    return ontology_registry.get_ontology_parser(OWL_FILE)
  
 OPENAI_API_KEY = ""
 BASE_URL = "https://www.donboscochennai.org"
 OUTPUT_FILE = "donbosco_site_with_taxonomy.json"
-USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+OUTPUT_NDJSON_FILE = "donbosco_site_with_taxonomy.ndjson"
+USER_AGENT = http_session.USER_AGENT
  
 # --- Predefined taxonomy (example) ---
 PREDEFINED_TAXONOMY = {
@@ -53,47 +72,51 @@ PREDEFINED_TAXONOMY = {
 }
  
 # --- Helper functions ---
-def is_internal(url, base_url=None):
-    """Check if URL is internal to the base URL"""
-    if not url:
-        return False
-    if base_url is None:
-        base_url = BASE_URL
-    parsed = urlparse(urljoin(base_url, url))
-    base_parsed = urlparse(base_url)
-    return parsed.netloc == base_parsed.netloc
- 
 def normalize_url(url):
     return url.split('#')[0].rstrip('/')
  
-def safe_get(url, timeout=12, retries=2):
+def safe_get(url, timeout=12, retries=None):
     """
-    Safely fetch a URL with retry logic and better headers
+    Safely fetch a URL through the shared pooled session, retrying
+    transient failures with exponential backoff
     
     Args:
         url: URL to fetch
         timeout: Request timeout in seconds
-        retries: Number of retry attempts
+        retries: Number of retry attempts (defaults to the session retry policy)
         
     Returns:
         HTML content as string or None if failed
     """
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Cache-Control": "max-age=0"
-    }
+    r = safe_get_response(url, timeout, retries)
+    return r.text if r is not None else None
+
+def safe_get_response(url, timeout=12, retries=None, headers=None):
+    """
+    Same as safe_get but returns the requests.Response (or None), so callers
+    can send extra headers (e.g. conditional-GET validators) and inspect
+    the status and response headers. A 304 is returned as-is. Latency,
+    status codes, bytes and retries are recorded in crawl_metrics.
+    """
+    with get_metrics().timer(crawl_metrics.FETCH):
+        return _get_with_retries(url, timeout, retries, headers)
+
+def _get_with_retries(url, timeout, retries, headers):
+    metrics = get_metrics()
+    session = http_session.get_session()
+    policy = http_session.get_retry_policy()
+    if retries is None:
+        retries = policy.retries
     
     for attempt in range(retries + 1):
         try:
-            r = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+            try:
+                r = session.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+            except requests.exceptions.RequestException:
+                metrics.inc("crawler_http_requests_total", status="error")
+                raise
+            metrics.inc("crawler_http_requests_total", status=str(r.status_code))
+            metrics.inc("crawler_bytes_fetched_total", len(r.content))
             
             # Check for 403 Forbidden
             if r.status_code == 403:
@@ -101,30 +124,37 @@ def safe_get(url, timeout=12, retries=2):
                 print(f"[INFO] Try using a different URL or check if the website requires authentication")
                 return None
             
-            # Check for other client errors
+            # Retry transient errors (429/5xx), give up on the rest
             if r.status_code >= 400:
-                if attempt < retries:
+                if attempt < retries and policy.should_retry_status(r.status_code):
                     print(f"[INFO] GET {url} returned {r.status_code}, retrying... (attempt {attempt + 1}/{retries + 1})")
-                    time.sleep(1)  # Wait before retry
+                    metrics.inc("crawler_http_retries_total")
+                    http_session.sleep_backoff(attempt, r)
                     continue
                 else:
                     r.raise_for_status()
             
-            return r.text
+            return r
             
         except requests.exceptions.Timeout:
             if attempt < retries:
                 print(f"[INFO] GET {url} timed out, retrying... (attempt {attempt + 1}/{retries + 1})")
-                time.sleep(1)
+                metrics.inc("crawler_http_retries_total")
+                http_session.sleep_backoff(attempt)
                 continue
             else:
                 print(f"[WARN] GET {url} failed: Timeout after {retries + 1} attempts")
                 return None
                 
+        except requests.exceptions.HTTPError as e:
+            print(f"[WARN] GET {url} failed: {e}")
+            return None
+                
         except requests.exceptions.RequestException as e:
             if attempt < retries:
                 print(f"[INFO] GET {url} failed: {e}, retrying... (attempt {attempt + 1}/{retries + 1})")
-                time.sleep(1)
+                metrics.inc("crawler_http_retries_total")
+                http_session.sleep_backoff(attempt)
                 continue
             else:
                 print(f"[WARN] GET {url} failed: {e}")
@@ -135,111 +165,142 @@ def safe_get(url, timeout=12, retries=2):
     
     return None
  
-def extract_html_parts(html):
-    soup = BeautifulSoup(html, "html.parser")
-    data = {}
-    data["full_html"] = str(soup)
-    data["ul_blocks"] = [str(u) for u in soup.find_all("ul")]
-    data["li_items"] = [li.get_text(" ", strip=True) for li in soup.find_all("li")]
-    data["clean_text"] = soup.get_text(" ", strip=True)
-    # optionally capture title/meta
-    data["title"] = soup.title.string.strip() if soup.title and soup.title.string else ""
-    meta_desc = soup.find("meta", attrs={"name":"description"})
-    data["meta_description"] = meta_desc["content"].strip() if meta_desc and meta_desc.get("content") else ""
-    return data
+def extract_html_parts(html, soup=None, profile=None, backend=None):
+    """
+    Extract the page parts used for classification and display
+
+    Args:
+        html: Raw HTML content
+        soup: Optional already-parsed BeautifulSoup document for `html`
+        profile: ExtractionProfile or profile name ("full", "lean"); fields
+                 outside the profile are returned empty
+        backend: HTML parser backend ("bs4", "lxml", "selectolax", "auto";
+                 defaults to CRAWL_HTML_BACKEND)
+
+    Returns:
+        Dictionary with full_html, ul_blocks, li_items, clean_text, title
+        and meta_description
+    """
+    with get_metrics().timer(crawl_metrics.EXTRACT):
+        if soup is not None:
+            document = html_extract.BS4Document.from_soup(soup)
+        else:
+            document = html_extract.parse_document(html, backend)
+        return dict(html_extract.PageExtraction(document, html_extract.get_profile(profile)))
+
+def links_from_hrefs(hrefs, page_url, base_url=None):
+    """
+    Resolve raw href values into links
+
+    Args:
+        hrefs: href attribute values in document order
+        page_url: URL the document was fetched from (for relative links)
+        base_url: If given, only links on this site are kept, normalized.
+                  Crawls leave it unset and filter with their CrawlScope.
+
+    Returns:
+        List of absolute http(s) URLs without fragments, in document
+        order (deduplicated)
+    """
+    base_host = urlparse(base_url).netloc if base_url else None
+    links = []
+    seen = set()
+    for href in hrefs:
+        full = urljoin(page_url, href).split('#')[0]
+        if not full.startswith(("http://", "https://")):
+            continue
+        if base_host is not None:
+            if urlparse(full).netloc != base_host:
+                continue
+            full = full.rstrip('/')
+        if full not in seen:
+            seen.add(full)
+            links.append(full)
+    return links
  
 # Simple rule-based classifier (predefined taxonomy)
+WORD_RE = re.compile(r'\w+')
+
+class TaxonomyScorer:
+    """
+    Precompiled keyword scorer for a {category: [keywords]} taxonomy.
+    Single-word keywords are counted from one tokenization of the text
+    (equivalent to counting \\bkeyword\\b); phrases and other keywords get
+    one precompiled regex each.
+    """
+    def __init__(self, taxonomy):
+        self.categories = [(cat, [k.lower() for k in keywords]) for cat, keywords in taxonomy.items()]
+        self._phrase_patterns = {}
+        for _, keywords in self.categories:
+            for k in keywords:
+                if not WORD_RE.fullmatch(k) and k not in self._phrase_patterns:
+                    self._phrase_patterns[k] = re.compile(r'\b' + re.escape(k) + r'\b')
+
+    def _counts(self, text_low):
+        counts = Counter(WORD_RE.findall(text_low))
+        for k, pattern in self._phrase_patterns.items():
+            counts[k] = len(pattern.findall(text_low))
+        return counts
+
+    def score(self, text):
+        """Return (best_category, confidence) or (None, 0.0) if nothing matched"""
+        counts = self._counts(text.lower())
+        scores = {}
+        for cat, keywords in self.categories:
+            score = sum(counts[k] for k in keywords)
+            if score > 0:
+                scores[cat] = score
+        if not scores:
+            return None, 0.0
+        # pick best and compute a crude confidence (normalized)
+        best_cat = max(scores, key=scores.get)
+        total = sum(scores.values())
+        confidence = scores[best_cat] / total if total else 0.0
+        # If best score is weak (e.g., only 1 match and confidence low), treat as uncertain
+        return best_cat, confidence
+
+PREDEFINED_SCORER = TaxonomyScorer(PREDEFINED_TAXONOMY)
+
 def match_predefined_taxonomy(text):
-    text_low = text.lower()
-    scores = {}
-    for cat, keywords in PREDEFINED_TAXONOMY.items():
-        score = 0
-        for k in keywords:
-            # presence and count
-            matches = len(re.findall(r'\b' + re.escape(k.lower()) + r'\b', text_low))
-            score += matches
-        if score > 0:
-            scores[cat] = score
-    if not scores:
-        return None, 0.0
-    # pick best and compute a crude confidence (normalized)
-    best_cat = max(scores, key=scores.get)
-    total = sum(scores.values())
-    confidence = scores[best_cat] / total if total else 0.0
-    # If best score is weak (e.g., only 1 match and confidence low), treat as uncertain
-    return best_cat, confidence
+    with get_metrics().timer(crawl_metrics.CLASSIFY_PREDEFINED):
+        return PREDEFINED_SCORER.score(text)
  
-# Auto taxonomy via OpenAI (chat completion)
+# Auto taxonomy via OpenAI (chat completion), batched by llm_classifier
+_default_llm = None
+_default_llm_lock = threading.Lock()
+
+def make_llm_classifier(budget=None):
+    """
+    LLMClassifier for the configured OpenAI endpoint (OPENAI_BASE_URL),
+    disabled when OPENAI_API_KEY is empty
+
+    Args:
+        budget: Optional LLMBudget, or a {"max_requests", "max_tokens"} dict
+    """
+    return llm_classifier.LLMClassifier(
+        OPENAI_API_KEY,
+        categories=list(PREDEFINED_TAXONOMY.keys()),
+        budget=llm_classifier.LLMBudget.from_options(budget) if budget is not None else None,
+        cache=llm_classifier.get_response_cache() if OPENAI_API_KEY.strip() else None
+    )
+
+def get_llm_classifier():
+    """Shared unbudgeted classifier for single-page scrapes (rebuilt if the key changes)"""
+    global _default_llm
+    with _default_llm_lock:
+        if _default_llm is None or _default_llm.api_key != OPENAI_API_KEY.strip():
+            _default_llm = make_llm_classifier()
+        return _default_llm
+
 def call_openai_classify(text, predefined=None):
     """
-    Classify text using OpenAI API
-    Supports both old (v0.x) and new (v1.x+) OpenAI API formats
+    Classify text using the OpenAI chat-completions API
+
+    Returns:
+        (category, confidence, reason), or (None, 0.0, "") if the API is
+        not configured, over budget or failed
     """
-    if not OPENAI_API_KEY or OPENAI_API_KEY.strip() == "":
-        return None, 0.0, ""
-    
-    try:
-        import openai
-    except ImportError:
-        return None, 0.0, ""
-    
-    prompt = f"""
-You are an assistant that classifies website pages into categories.
-Predefined categories (if given): {list(PREDEFINED_TAXONOMY.keys())}
-If there is a clear category, return JSON: {{"category":"...", "confidence":0-100, "reason":"short explanation"}}
-If multiple apply, return a comma-separated category string in "category".
-Page text (first 4000 chars):
-{text[:4000]}
-"""
-    try:
-        # Try new OpenAI API format (v1.x+)
-        try:
-            from openai import OpenAI
-            
-            # Initialize client with just the API key
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role":"user","content":prompt}],
-                max_tokens=300,
-                temperature=0.0
-            )
-            reply = resp.choices[0].message.content.strip()
-                    
-        except Exception as e:
-            error_msg = str(e)
-            # If new API fails, try old API format (v0.x) as fallback
-            try:
-                import openai
-                openai.api_key = OPENAI_API_KEY
-                resp = openai.ChatCompletion.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role":"user","content":prompt}],
-                    max_tokens=300,
-                    temperature=0.0
-                )
-                reply = resp["choices"][0]["message"]["content"].strip()
-            except Exception as e2:
-                # Silently fail - will fall back to predefined taxonomy
-                return None, 0.0, ""
-        
-        # Try to extract JSON-like from reply; fallback: parse heuristically
-        # We expect something like: {"category":"News","confidence":85,"reason":"..."}
-        try:
-            jstart = reply.index("{")
-            j = json.loads(reply[jstart:])
-            return j.get("category"), float(j.get("confidence", 0))/100.0, j.get("reason","")
-        except Exception:
-            # naive parse: first line category: ...
-            cat_match = re.search(r'category["\']?\s*[:\-]\s*["\']?([A-Za-z0-9,\s/]+)["\']?', reply, re.I)
-            conf_match = re.search(r'confidence.*?(\d{1,3})', reply, re.I)
-            cat = cat_match.group(1).strip() if cat_match else reply.splitlines()[0][:100]
-            conf = float(conf_match.group(1))/100.0 if conf_match else 0.6
-            return cat, conf, reply
-    except Exception as e:
-        # Silently fail - will fall back to predefined taxonomy or OWL classification
-        return None, 0.0, ""
+    return get_llm_classifier().classify(text)
  
 # Check robots.txt politely
 def allowed_by_robots(base_url=None):
@@ -255,34 +316,32 @@ def allowed_by_robots(base_url=None):
         return False
     return True
  
-def scrape_single_page(url):
+def classify_local(extracted):
     """
-    Scrape a single page and return taxonomy data with OWL ontology classification
-    
-    Args:
-        url: URL to scrape
-        
+    The in-process part of classify_extracted: OWL ontology, then the
+    predefined taxonomy. CPU-bound and free of shared state, so parse
+    workers run it next to extraction.
+
     Returns:
-        Dictionary with taxonomy data or None if scraping failed
+        Tuple of (category, confidence, source, reason, ontology_classification)
     """
-    html = safe_get(url)
-    if not html:
-        return None
-    
-    extracted = extract_html_parts(html)
     
     # Primary: Try OWL ontology classification
     ontology_classification = None
     used = "ontology"
     reason = ""
+    cat = None
+    conf = 0.0
     
-    if OWL_PARSER:
+    owl_parser = get_owl_parser()
+    if owl_parser:
         try:
-            ontology_classification = OWL_PARSER.classify_page(
-                extracted["clean_text"],
-                extracted.get("title", ""),
-                extracted.get("meta_description", "")
-            )
+            with get_metrics().timer(crawl_metrics.CLASSIFY_ONTOLOGY):
+                ontology_classification = owl_parser.classify_page(
+                    extracted["clean_text"],
+                    extracted.get("title", ""),
+                    extracted.get("meta_description", "")
+                )
             
             # Determine primary category from ontology
             if ontology_classification.get('document_type'):
@@ -315,10 +374,31 @@ def scrape_single_page(url):
             if not ontology_classification:
                 ontology_classification = {}
     
+    return cat, conf, used, reason, ontology_classification
+
+def classify_extracted(extracted, llm=None, local=None):
+    """
+    Classify extracted page parts (OWL ontology, then predefined taxonomy,
+    then OpenAI as last resort)
+
+    Args:
+        extracted: Dictionary returned by extract_html_parts
+        llm: Optional LLMClassifier for the OpenAI step (defaults to the
+             shared classifier); concurrent callers share its batches
+        local: Optional classify_local result already computed for this
+               page (e.g. by a parse worker process)
+
+    Returns:
+        Tuple of (category, confidence, source, reason, ontology_classification)
+    """
+    if local is None:
+        local = classify_local(extracted)
+    cat, conf, used, reason, ontology_classification = local
+    
     # Last resort: Try OpenAI classification
     if not cat or conf < 0.5:
         try:
-            ai_cat, ai_conf, ai_reason = call_openai_classify(extracted["clean_text"])
+            ai_cat, ai_conf, ai_reason = (llm or get_llm_classifier()).classify(extracted["clean_text"])
             if ai_cat and (not cat or ai_conf > conf):
                 cat = ai_cat
                 conf = ai_conf
@@ -329,8 +409,49 @@ def scrape_single_page(url):
         except Exception as e:
             print(f"[WARN] OpenAI classification failed: {e}")
     
-    # Build result matching the JSON structure with ontology data
-    result = {
+    return cat, conf, used, reason, ontology_classification
+
+def get_taxonomy_version():
+    """
+    Version of everything besides the ontology that classification depends
+    on: the predefined taxonomy and whether the OpenAI fallback is enabled
+    """
+    payload = json.dumps([PREDEFINED_TAXONOMY, bool(OPENAI_API_KEY.strip())], sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+def classify_with_cache(extracted, cache=None, llm=None, local=None):
+    """
+    classify_extracted through an optional ClassificationCache. Pages whose
+    title, meta description and text are unchanged skip classification;
+    after an ontology edit only pages containing a changed keyword are
+    classified again. Results the LLM step had to skip (budget, API errors)
+    are not stored. `local` is passed on to classify_extracted.
+    """
+    if cache is None:
+        return classify_extracted(extracted, llm, local)
+    title = extracted.get("title", "")
+    meta = extracted.get("meta_description", "")
+    key = classification_cache.text_key(title, meta, extracted["clean_text"])
+    ontology_hash = get_ontology_hash()
+    taxonomy_version = get_taxonomy_version()
+    owl_parser = get_owl_parser()
+    if owl_parser:
+        cache.register_ontology(ontology_hash, owl_parser.keyword_signature())
+    # same text the ontology classifier scores
+    combined_text = f"{title} {meta} {extracted['clean_text']}".lower()
+    classification = cache.lookup(key, ontology_hash, taxonomy_version, combined_text)
+    if classification is None:
+        llm = llm or get_llm_classifier()
+        skipped = llm.skipped
+        classification = classify_extracted(extracted, llm, local)
+        if llm.skipped == skipped:
+            cache.store(key, ontology_hash, taxonomy_version, classification)
+    return classification
+
+def build_page_result(url, extracted, classification):
+    """Build the page record returned by the crawler"""
+    cat, conf, used, reason, ontology_classification = classification
+    return {
         "url": url,
         "title": extracted.get("title", ""),
         "meta_description": extracted.get("meta_description", ""),
@@ -344,11 +465,242 @@ def scrape_single_page(url):
         "clean_text": extracted["clean_text"][:15000],  # truncate very large pages
         "full_html_snippet": extracted["full_html"][:200000]  # keep but limited
     }
+
+def get_ontology_hash():
+    """Content hash of the loaded OWL file (None if unavailable)"""
+    if ontology_registry is None:
+        return None
+    return ontology_registry.get_registry(OWL_FILE).get_content_hash()
+
+def extract_page(url, html, base_url=None, profile=None):
+    """
+    Parse `html` once and return (extracted, links); extracted is a lazy
+    PageExtraction with the text fields already computed
+    """
+    with get_metrics().timer(crawl_metrics.EXTRACT):
+        document = html_extract.parse_document(html)
+        # fields are computed on first use; the text fields are always needed
+        extracted = html_extract.PageExtraction(document, profile or html_extract.FULL_PROFILE)
+        extracted["clean_text"], extracted["title"], extracted["meta_description"]
+        return extracted, links_from_hrefs(document.hrefs(), url, base_url)
+
+def analyze_page(url, html, base_url=None, profile=None):
+    """
+    CPU-bound stage of a page: extract_page plus classify_local.
+    Parse workers run this in their own process.
+
+    Returns:
+        (extracted dict, links, local classification, parse_seconds,
+         classify_seconds)
+    """
+    t0 = time.perf_counter()
+    extracted, links = extract_page(url, html, base_url, profile)
+    extracted = dict(extracted)
+    t1 = time.perf_counter()
+    local = classify_local(extracted)
+    return extracted, links, local, t1 - t0, time.perf_counter() - t1
+
+def _analyze_html(url, html, base_url, dedup=None, classify_cache=None, llm=None, profile=None,
+                  parse_pool=None):
+    """
+    Parse once, then extract, discover links and classify.
+    With a ContentDeduplicator, an exact duplicate body skips parsing and
+    classification entirely, and a near duplicate (SimHash of clean_text)
+    skips classification; both record the canonical URL in duplicate_of.
+    With a ParsePool, parsing and the ontology/predefined scoring run in a
+    worker process; duplicate detection, the classification cache and the
+    OpenAI step stay in this process.
+
+    Returns:
+        (result, links, parse_seconds, classify_seconds)
+    """
+    t0 = time.perf_counter()
+    digest = None
+    if dedup is not None:
+        digest = content_dedup.body_hash(html)
+        canonical = dedup.find_exact(digest)
+        if canonical:
+            return _duplicate_result(url, canonical), canonical.links, 0.0, 0.0
+
+    local = None
+    if parse_pool is not None:
+        extracted, links, local, parse_s, local_s = parse_pool.analyze(url, html, base_url, profile)
+    else:
+        extracted, links = extract_page(url, html, base_url, profile)
+    t1 = time.perf_counter()
+
+    canonical = None
+    if dedup is not None:
+        fingerprint = content_dedup.simhash(extracted["clean_text"])
+        canonical = dedup.find_near(fingerprint)
+
+    if canonical:
+        classification = canonical.classification
+        dedup.add_body(url, digest, extracted.get("title", ""),
+                       extracted.get("meta_description", ""), classification, links)
+    else:
+        classification = classify_with_cache(extracted, classify_cache, llm, local)
+        if dedup is not None:
+            dedup.add(url, digest, fingerprint, extracted.get("title", ""),
+                      extracted.get("meta_description", ""), classification, links)
+    t2 = time.perf_counter()
+
+    result = build_page_result(url, extracted, classification)
+    if canonical:
+        result["duplicate_of"] = canonical.url
+        result["duplicate_type"] = "near"
+    if local is not None:
+        # report the worker's own parse/score time, not the wait for a free worker
+        return result, links, parse_s, local_s + (t2 - t1)
+    return result, links, t1 - t0, t2 - t1
+
+def _register_cached(dedup, url, html, result, links):
+    """
+    Register a page served from the HTTP cache with the deduplicator, so
+    later pages duplicating it are detected as if it had been fetched
+    """
+    classification = (result.get("category"), result.get("confidence", 0.0),
+                      result.get("category_source"), result.get("category_reason", ""),
+                      result.get("ontology") or {})
+    digest = content_dedup.body_hash(html)
+    title, meta = result.get("title", ""), result.get("meta_description", "")
+    if result.get("duplicate_of"):
+        # a duplicate itself: only exact copies of its body may alias it
+        dedup.add_body(url, digest, title, meta, classification, links)
+    else:
+        dedup.add(url, digest, content_dedup.simhash(result.get("clean_text", "")), title, meta,
+                  classification, links)
+
+def _duplicate_result(url, canonical):
+    """
+    Slim record for an exact duplicate: classification and title come from
+    the canonical page; the heavy content fields stay on the canonical record
+    """
+    result = build_page_result(url, {
+        "title": canonical.title,
+        "meta_description": canonical.meta_description,
+        "ul_blocks": [],
+        "li_items": [],
+        "clean_text": "",
+        "full_html": ""
+    }, canonical.classification)
+    result["duplicate_of"] = canonical.url
+    result["duplicate_type"] = "exact"
+    return result
+
+def process_page(url, base_url=None, scheduler=None, cache=None, dedup=None,
+                 classify_cache=None, llm=None, profile=None, parse_pool=None):
+    """
+    Fetch and parse a page once, then feed the same document to extraction,
+    classification and link discovery
+
+    Args:
+        url: URL to scrape
+        base_url: If given, only links on this site are returned; by
+                  default all links are returned for the crawl scope to filter
+        scheduler: Optional HostScheduler; only the network fetch is held
+                   inside its per-host slot
+        cache: Optional HTTPCache. Fresh entries skip the request, stale
+               ones are revalidated with If-None-Match / If-Modified-Since,
+               and a 304 reuses the stored record without re-extraction or
+               re-classification (unless the ontology changed since)
+        dedup: Optional ContentDeduplicator shared by the crawl; duplicate
+               bodies reuse the canonical page's classification and their
+               result records it in duplicate_of / duplicate_type
+        classify_cache: Optional ClassificationCache; pages whose text is
+                        unchanged reuse their stored classification
+        llm: Optional LLMClassifier for the OpenAI fallback (per-crawl
+             batching and budget)
+        profile: ExtractionProfile or name ("full", "lean"); defaults to
+                 CRAWL_EXTRACTION_PROFILE. The HTML parser backend comes
+                 from CRAWL_HTML_BACKEND.
+        parse_pool: Optional ParsePool; parsing and ontology scoring then
+                    run in a worker process while this thread waits
+
+    Returns:
+        Tuple of (result, links). result is None if the fetch failed;
+        links is the list of absolute URLs found on the page.
+        result["timings"] holds fetch/parse/classify durations in ms and
+        result["cache_status"] is "hit", "revalidated" or "miss" when a
+        cache is used.
+    """
+    profile = html_extract.get_profile(profile)
+    entry = cache.lookup(url) if cache is not None else None
+    ontology_hash = get_ontology_hash() if cache is not None else None
+    if ontology_hash is not None and profile is not html_extract.FULL_PROFILE:
+        # records made with another profile are rebuilt from the cached body
+        ontology_hash = f"{ontology_hash}|{profile.name}"
+    cache_status = http_cache.MISS
+    parse_s = classify_s = 0.0
+
+    t0 = time.perf_counter()
+    if entry and entry.is_fresh() and entry.result and entry.ontology_hash == ontology_hash:
+        response = None
+        cache_status = http_cache.HIT
+    else:
+        headers = entry.conditional_headers() if entry else None
+        with scheduler.slot(url) if scheduler else nullcontext():
+            response = safe_get_response(url, headers=headers or None)
+        if response is None:
+            return None, []
+        if response.status_code == 304:
+            if not entry:
+                return None, []
+            cache_status = http_cache.REVALIDATED
+    t1 = time.perf_counter()
+
+    if cache_status == http_cache.MISS:
+        html = response.text
+        if not html:
+            return None, []
+        result, links, parse_s, classify_s = _analyze_html(url, html, base_url, dedup,
+                                                           classify_cache, llm, profile,
+                                                           parse_pool)
+        if cache is not None:
+            cache.store(url, response.headers, html, result, links, ontology_hash)
+    elif entry.result and entry.ontology_hash == ontology_hash:
+        result, links = entry.result, entry.links
+        if response is not None:
+            cache.refresh(url, response.headers)
+        if dedup is not None:
+            _register_cached(dedup, url, entry.body, result, links)
+    else:
+        # body unchanged but the ontology was edited: reclassify from the cached body
+        result, links, parse_s, classify_s = _analyze_html(url, entry.body, base_url, dedup,
+                                                           classify_cache=classify_cache, llm=llm,
+                                                           profile=profile, parse_pool=parse_pool)
+        cache.refresh(url, response.headers, result, links, ontology_hash)
+
+    result = dict(result)
+    result["timings"] = {
+        "fetch_ms": round((t1 - t0) * 1000, 2),
+        "parse_ms": round(parse_s * 1000, 2),
+        "classify_ms": round(classify_s * 1000, 2)
+    }
+    if cache is not None:
+        result["cache_status"] = cache_status
+    return result, links
+
+def scrape_single_page(url, profile=None):
+    """
+    Scrape a single page and return taxonomy data with OWL ontology classification
     
+    Args:
+        url: URL to scrape
+        profile: Extraction profile ("full" or "lean", see process_page)
+        
+    Returns:
+        Dictionary with taxonomy data or None if scraping failed
+    """
+    result, _ = process_page(url, profile=profile)
     return result
 
 
-def crawl_site(start_url=None, max_pages=1000, delay=1.0):
+def crawl_site(start_url=None, max_pages=1000, delay=1.0, concurrency=1,
+               per_host_rps=None, max_in_flight=None, frontier_mode="exact",
+               on_page=None, cancel_event=None, checkpoint=None, resume=None,
+               cache=None, dedup=True, scope=None, classify_cache=None, llm_budget=None,
+               extraction_profile=None, parse_workers=None):
     """
     Crawl a website starting from a given URL
     
@@ -356,50 +708,333 @@ def crawl_site(start_url=None, max_pages=1000, delay=1.0):
         start_url: Starting URL for crawling (defaults to BASE_URL)
         max_pages: Maximum number of pages to crawl
         delay: Delay between requests in seconds
+        concurrency: Number of worker threads; 1 keeps the sequential crawler
+        per_host_rps: Concurrent mode only - max request starts per second per
+                      host (defaults to 1/delay, unlimited when delay is 0)
+        max_in_flight: Concurrent mode only - max simultaneous requests per
+                       host (defaults to concurrency)
+        frontier_mode: "exact", "fingerprint" (64-bit URL hashes) or "bloom"
+                       (fixed-size filter) for the seen-URL set
+        on_page: Optional callback on_page(url, result, queue_depth) called
+                 after every crawled page (result is None if it failed),
+                 including pages replayed from a resumed checkpoint
+        cancel_event: Optional threading.Event; the crawl stops early and
+                      returns what it has once the event is set
+        checkpoint: Optional SQLite path; frontier, visited URLs and finished
+                    pages are saved there while crawling
+        resume: Optional checkpoint path to continue from (and keep saving
+                to). Pages finished before are returned without refetching;
+                max_pages counts them too.
+        cache: Optional conditional-GET cache for recrawls - an HTTPCache,
+               a cache file path, or True for the default cache file.
+               Each result then carries cache_status (hit/revalidated/miss).
+        dedup: Detect duplicate content (exact body hash + SimHash of
+               clean_text); duplicates reuse the first page's classification
+               and record it in duplicate_of
+        scope: URL canonicalization and scope rules - a CrawlScope or a
+               dict of CrawlScope options (strip_params, keep_params,
+               strip_all_params, include, exclude, blocked_extensions,
+               max_depth, lowercase_path, keep_trailing_slash). Defaults
+               strip tracking parameters and trailing slashes and skip
+               non-HTML file extensions.
+        classify_cache: Optional persistent classification cache - a
+                        ClassificationCache, a file path, or True for the
+                        default file. Pages with unchanged text skip
+                        classification; after an ontology edit only pages
+                        containing a changed keyword are reclassified.
+        llm_budget: Cap on OpenAI usage for this crawl - an LLMBudget or a
+                    {"max_requests", "max_tokens"} dict (defaults from
+                    LLM_MAX_REQUESTS_PER_CRAWL / LLM_MAX_TOKENS_PER_CRAWL).
+                    Low-confidence pages are sent in batches of
+                    LLM_BATCH_SIZE over LLM_CONCURRENCY parallel requests.
+        extraction_profile: "full" (default, CRAWL_EXTRACTION_PROFILE) or
+                            "lean" - lean skips ul_blocks and the
+                            full_html_snippet re-serialization. The parser
+                            backend is chosen by CRAWL_HTML_BACKEND.
+        parse_workers: Worker processes for parsing and ontology scoring
+                       (defaults to CRAWL_PARSE_WORKERS; 0 parses in the
+                       crawling threads). Pays off with concurrency > 1,
+                       where fetcher threads would otherwise contend for
+                       the GIL. The pool is shared by concurrent crawls.
         
     Returns:
         List of taxonomy results
     """
+    return list(iter_crawl_site(start_url, max_pages, delay, concurrency, per_host_rps,
+                                max_in_flight, frontier_mode, on_page, cancel_event,
+                                checkpoint, resume, cache, dedup, scope, classify_cache,
+                                llm_budget, extraction_profile, parse_workers))
+
+def iter_crawl_site(start_url=None, max_pages=1000, delay=1.0, concurrency=1,
+                    per_host_rps=None, max_in_flight=None, frontier_mode="exact",
+                    on_page=None, cancel_event=None, checkpoint=None, resume=None,
+                    cache=None, dedup=True, scope=None, classify_cache=None, llm_budget=None,
+                    extraction_profile=None, parse_workers=None):
+    """
+    Generator version of crawl_site: yields each page result as soon as it
+    has been scraped and classified, so callers can stream or persist pages
+    without holding the whole crawl in memory. Takes the same arguments as
+    crawl_site. Closing the generator stops the crawl.
+    """
+    http_before = http_session.get_connection_stats()
+    store = None
+    if resume:
+        if not os.path.exists(resume):
+            raise ValueError(f"Checkpoint {resume} does not exist")
+        store = CrawlCheckpoint(resume)
+        saved_url = store.get_meta("start_url")
+        if saved_url is None:
+            store.close()
+            raise ValueError(f"Checkpoint {resume} is empty")
+        if start_url is not None and normalize_url(start_url) != normalize_url(saved_url):
+            store.close()
+            raise ValueError(f"Checkpoint {resume} belongs to {saved_url}, not {start_url}")
+        start_url = saved_url
+        frontier_mode = store.get_meta("frontier_mode", frontier_mode)
+    elif checkpoint:
+        store = CrawlCheckpoint(checkpoint)
+        if not store.is_empty:
+            store.close()
+            raise ValueError(f"Checkpoint {checkpoint} already holds a crawl; pass resume= to continue it")
+
     if start_url is None:
         start_url = BASE_URL
     
     if not allowed_by_robots(start_url):
         print("[ERROR] Crawling disallowed by robots.txt. Aborting.")
-        return []
-    visited = set()
-    q = deque([normalize_url(start_url)])
-    results = []
-
-    while q and len(results) < max_pages:
-        url = q.popleft()
-        if url in visited:
-            continue
-        visited.add(url)
+        if store:
+            store.close()
+        return
+
+    if not isinstance(scope, CrawlScope):
+        scope = CrawlScope.from_options(start_url, scope)
+
+    frontier = CrawlFrontier(frontier_mode)
+    already_done = 0
+    if store and not store.is_empty:
+        store.restore_frontier(frontier)
+        already_done = store.page_count()
+        print(f"[INFO] Resuming from {store.path}: {already_done} pages done, {len(frontier)} queued")
+    else:
+        frontier.add(scope.base_url)
+        if store:
+            store.set_meta("start_url", start_url)
+            store.set_meta("frontier_mode", frontier_mode)
+            store.record_queued([scope.base_url])
+            store.commit()
+
+    if cache is True:
+        cache = http_cache.get_cache()
+    elif isinstance(cache, str):
+        cache = http_cache.get_cache(cache)
+    cache_counts = {http_cache.HIT: 0, http_cache.REVALIDATED: 0, http_cache.MISS: 0}
+    if classify_cache is True:
+        classify_cache = classification_cache.get_classification_cache()
+    elif isinstance(classify_cache, str):
+        classify_cache = classification_cache.get_classification_cache(classify_cache)
+    classify_before = classify_cache.stats() if classify_cache is not None else None
+    llm = make_llm_classifier(llm_budget or {}) if OPENAI_API_KEY.strip() else None
+    dedup = content_dedup.ContentDeduplicator() if dedup else None
+    extraction_profile = html_extract.get_profile(extraction_profile)
+    workers = get_parse_pool(parse_workers)
+
+    remaining = max_pages - already_done
+    if concurrency and concurrency > 1:
+        if per_host_rps is None and delay:
+            per_host_rps = 1.0 / delay
+        scheduler = HostScheduler(per_host_rps, max_in_flight or concurrency)
+        http_session.ensure_pool_size(scheduler.max_in_flight)
+        pages = _crawl_concurrent(scope, frontier, remaining, concurrency, scheduler,
+                                  cancel_event, cache, dedup, classify_cache, llm,
+                                  extraction_profile, workers)
+    else:
+        pages = _crawl_sequential(scope, frontier, remaining, delay, cancel_event, cache, dedup,
+                                  classify_cache, llm, extraction_profile, workers)
+
+    metrics = get_metrics()
+    metrics_before = metrics.snapshot()
+    crawl_id = crawl_metrics.new_crawl_id()
+    crawled = 0
+    started = time.perf_counter()
+    status = "interrupted"
+    try:
+        if store and already_done:
+            # replay finished pages so callers still get the whole crawl
+            for i, result in enumerate(store.iter_pages()):
+                if i >= max_pages:
+                    break
+                if on_page:
+                    on_page(result.get("url"), result, len(frontier))
+                yield result
+        for url, depth, result, new_links, queue_depth in pages:
+            crawled += 1 if result else 0
+            metrics.inc("crawler_pages_total", result="ok" if result else "failed")
+            metrics.set_gauge("crawler_queue_depth", queue_depth, crawl=crawl_id)
+            metrics.set_gauge("crawler_pages_per_second",
+                              round(crawled / max(time.perf_counter() - started, 1e-6), 3),
+                              crawl=crawl_id)
+            if store:
+                store.record_page(url, result, new_links, depth + 1)
+            if on_page:
+                on_page(url, result, queue_depth)
+            if result:
+                if "cache_status" in result:
+                    cache_counts[result["cache_status"]] += 1
+                yield result
+        status = "cancelled" if cancel_event is not None and cancel_event.is_set() else "completed"
+    finally:
+        pages.close()
+        if llm is not None:
+            llm.close()
+        if store:
+            store.close(status)
+        # the counters are process-wide; report this crawl's share
+        stats = {k: v - http_before[k] for k, v in http_session.get_connection_stats().items()}
+        reused = max(stats['requests'] - stats['connections_opened'], 0)
+        print(f"[INFO] HTTP requests: {stats['requests']}, connections opened: "
+              f"{stats['connections_opened']}, reused: {reused}, "
+              f"retries: {stats['retries']}")
+        if cache is not None:
+            print(f"[INFO] HTTP cache: {cache_counts[http_cache.HIT]} hits, "
+                  f"{cache_counts[http_cache.REVALIDATED]} revalidated, "
+                  f"{cache_counts[http_cache.MISS]} misses")
+        if dedup is not None:
+            d = dedup.stats()
+            print(f"[INFO] Duplicate content: {d['exact_duplicates']} exact, "
+                  f"{d['near_duplicates']} near, {d['unique']} unique pages classified")
+        if classify_cache is not None:
+            c = {k: v - classify_before[k] for k, v in classify_cache.stats().items()}
+            print(f"[INFO] Classification cache: {c['hits']} hits, {c['revalidated']} kept "
+                  f"after ontology change, {c['misses']} classified")
+        if llm is not None:
+            l = llm.stats()
+            print(f"[INFO] LLM classification: {l['requests']} requests, {l['cached']} cached, "
+                  f"{l['skipped']} skipped, {l['budget']['tokens']} tokens used")
+        s = scope.stats()
+        rejected = ", ".join(f"{k}={v}" for k, v in s["rejected"].items() if v) or "none"
+        print(f"[INFO] Crawl scope: {s['accepted']} links in scope, "
+              f"{s['params_stripped']} with parameters stripped, rejected: {rejected}")
+        metrics.set_gauge("crawler_queue_depth", None, crawl=crawl_id)
+        metrics.set_gauge("crawler_pages_per_second", None, crawl=crawl_id)
+        for line in metrics.summary(metrics_before, time.perf_counter() - started, crawled):
+            print(f"[INFO] Metrics {line}")
+
+def _crawl_sequential(scope, frontier, max_pages, delay, cancel_event=None, cache=None,
+                      dedup=None, classify_cache=None, llm=None, profile=None,
+                      parse_pool=None):
+    """
+    Sequential BFS crawl with a fixed delay after every page.
+    Yields (url, depth, result, new_links, queue_depth) per crawled page;
+    result is None on failure and new_links are the in-scope links this page
+    added to the frontier.
+    """
+    done = 0
+
+    while frontier and done < max_pages:
+        if cancel_event is not None and cancel_event.is_set():
+            print("[INFO] Crawl cancelled")
+            break
+        url, depth = frontier.pop_entry()
         print("[CRAWL] ", url)
         
-        result = scrape_single_page(url)
+        result, links = process_page(url, cache=cache, dedup=dedup, classify_cache=classify_cache,
+                                     llm=llm, profile=profile, parse_pool=parse_pool)
         if result:
-            results.append(result)
-
-        # find links and enqueue for multi-page crawling
-        html = safe_get(url)
-        if html:
-            soup = BeautifulSoup(html, "html.parser")
-            for a in soup.find_all("a", href=True):
-                raw = a["href"]
-                full = urljoin(url, raw)
-                if not is_internal(full, start_url):
-                    continue
-                full_norm = normalize_url(full)
-                if full_norm not in visited and full_norm not in q:
-                    q.append(full_norm)
+            done += 1
+
+        # enqueue discovered links for multi-page crawling
+        new_links = [link for link in scope.filter_links(links, depth + 1)
+                     if frontier.add(link, depth + 1)]
+
+        yield url, depth, result, new_links, len(frontier)
+
+        if done >= max_pages:
+            break
+        if cancel_event is not None:
+            cancel_event.wait(delay)
+        else:
+            time.sleep(delay)
+
+def _crawl_concurrent(scope, frontier, max_pages, concurrency, scheduler,
+                      cancel_event=None, cache=None, dedup=None, classify_cache=None, llm=None,
+                      profile=None, parse_pool=None):
+    """
+    Concurrent BFS crawl. Pages are fetched by a thread pool, but their
+    results and links are merged strictly in discovery order, so the crawl
+    visits the same pages in the same order as the sequential crawler.
+    Yields (url, depth, result, new_links, queue_depth) per crawled page;
+    result is None on failure and new_links are the in-scope links this page
+    added to the frontier.
+    """
+    window = concurrency * 2
+    in_flight = deque()
+    done = 0
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        while done < max_pages:
+            if cancel_event is not None and cancel_event.is_set():
+                print("[INFO] Crawl cancelled")
+                break
 
-        time.sleep(delay)
+            # keep the pool busy without fetching far past max_pages
+            while (frontier and len(in_flight) < window
+                   and done + len(in_flight) < max_pages):
+                url, depth = frontier.pop_entry()
+                print("[CRAWL] ", url)
+                future = pool.submit(process_page, url, None, scheduler, cache, dedup,
+                                     classify_cache, llm, profile, parse_pool)
+                in_flight.append((url, depth, future))
 
-    return results
+            if not in_flight:
+                break
+
+            url, depth, future = in_flight.popleft()
+            try:
+                result, links = future.result()
+            except Exception as e:
+                print(f"[WARN] Crawl of {url} failed: {e}")
+                result, links = None, []
+
+            if result:
+                done += 1
+            new_links = [link for link in scope.filter_links(links, depth + 1)
+                         if frontier.add(link, depth + 1)]
+
+            yield url, depth, result, new_links, len(frontier)
+    finally:
+        # also runs when the consumer closes the generator early
+        pool.shutdown(wait=True, cancel_futures=True)
  
+def crawl_to_file(output_path, **crawl_kwargs):
+    """
+    Crawl with iter_crawl_site and append every page to an NDJSON file as
+    soon as it completes. Peak memory does not grow with crawl size, and an
+    interrupted run keeps all pages written so far. An output path ending
+    in .sqlite writes a CrawlStore (metadata table + compressed blobs)
+    instead.
+
+    Returns:
+        Number of pages written
+    """
+    if output_path.endswith(".sqlite"):
+        writer = CrawlStore(output_path)
+    else:
+        writer = NDJSONWriter(output_path)
+    with writer:
+        try:
+            for result in iter_crawl_site(**crawl_kwargs):
+                writer.write(result)
+        except KeyboardInterrupt:
+            print(f"[WARN] Interrupted; {writer.count} pages kept in {output_path}")
+            raise
+    return writer.count
+
 if __name__ == "__main__":
-    out = crawl_site(BASE_URL, max_pages=2000, delay=0.8)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2, ensure_ascii=False)
-    print(f"[DONE] Saved {len(out)} pages to {OUTPUT_FILE}")
\ No newline at end of file
+    # weekly recrawls revalidate unchanged pages instead of downloading them again,
+    # and reuse stored classifications for pages whose text did not change
+    count = crawl_to_file(OUTPUT_NDJSON_FILE, start_url=BASE_URL, max_pages=2000, delay=0.8,
+                          cache=True, classify_cache=True)
+    print(f"[INFO] Wrote {count} pages to {OUTPUT_NDJSON_FILE}")
+    ndjson_to_json_array(OUTPUT_NDJSON_FILE, OUTPUT_FILE)
+    print(f"[DONE] Saved {count} pages to {OUTPUT_FILE}")
@@ -5,8 +5,192 @@ Provides functions to structure and export scraped data in a well-organized form
 
 import json
 from datetime import datetime
-from typing import List, Dict, Any
-from collections import defaultdict
+from typing import List, Dict, Any, Iterator
+
+from crawl_output import iter_ndjson, iter_json_array
+from crawl_store import CrawlStore, BLOB_FIELDS, is_crawl_store
+
+# statistics families -> (index name, ontology field, multi-valued)
+ONTOLOGY_FACETS = [
+    ('document_types', 'by_document_type', 'document_type', False),
+    ('work_types', 'by_work_type', 'work_type', False),
+    ('themes', 'by_theme', 'themes', True),
+    ('areas_of_reference', 'by_area_of_reference', 'areas_of_reference', True),
+    ('geo_areas', 'by_geo_area', 'geo_area', False),
+    ('salesian_family_groups', 'by_salesian_family_group', 'salesian_family_group', False),
+]
+
+
+def page_labels(page: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Labels a page contributes to each statistics family (categories, themes, ...)"""
+    labels = {'categories': [page.get('category', 'Uncategorized')]}
+    ontology = page.get('ontology') or {}
+    for family, _, field, multi in ONTOLOGY_FACETS:
+        value = ontology.get(field)
+        if not value:
+            labels[family] = []
+        elif multi:
+            labels[family] = [entry['label'] for entry in value]
+        else:
+            labels[family] = [value['label']]
+    return labels
+
+
+def confidence_bucket(confidence: float) -> str:
+    if confidence >= 0.7:
+        return 'high'
+    if confidence >= 0.5:
+        return 'medium'
+    return 'low'
+
+
+class FacetStatistics:
+    """
+    Facet counts (category, ontology labels, source) and confidence buckets
+    maintained incrementally. Pages are keyed (by url by default), so adding
+    a page again - e.g. after it was reclassified - replaces its previous
+    contribution instead of counting it twice. count() adds a page without
+    keeping anything per page, for one-pass aggregation of large exports.
+    """
+    
+    FAMILIES = ['categories'] + [family for family, _, _, _ in ONTOLOGY_FACETS]
+    
+    def __init__(self):
+        self.counts = {family: {} for family in self.FAMILIES}
+        self.sources = {}
+        self.confidence_distribution = {'high': 0, 'medium': 0, 'low': 0}
+        self.confidence_total = 0.0
+        self.ontology_classified = 0
+        self.version = 0  # bumped on every change
+        self._contributions = {}
+        self._unkeyed = 0  # pages added with count(), which cannot be replaced
+    
+    def __len__(self):
+        return len(self._contributions) + self._unkeyed
+    
+    @staticmethod
+    def _bump(counts, key, delta):
+        value = counts.get(key, 0) + delta
+        if value:
+            counts[key] = value
+        else:
+            del counts[key]
+    
+    def _apply(self, contribution, delta):
+        labels, source, confidence, classified = contribution
+        for family, values in labels.items():
+            for label in values:
+                self._bump(self.counts[family], label, delta)
+        self._bump(self.sources, source, delta)
+        self.confidence_distribution[confidence_bucket(confidence)] += delta
+        self.confidence_total += delta * confidence
+        self.ontology_classified += delta * classified
+    
+    @staticmethod
+    def _contribution(page, labels):
+        return (labels or page_labels(page), page.get('category_source', 'unknown'),
+                page.get('confidence', 0) or 0, 1 if page.get('ontology') else 0)
+    
+    def count(self, page: Dict[str, Any], labels: Dict[str, List[str]] = None) -> None:
+        """Count a page once; nothing is stored for it, so it can never be replaced or removed"""
+        self._apply(self._contribution(page, labels), 1)
+        self._unkeyed += 1
+        self.version += 1
+    
+    def add(self, page: Dict[str, Any], key: Any = None, labels: Dict[str, List[str]] = None) -> None:
+        """
+        Count a page, replacing the earlier version with the same key
+        (default: its url). `labels` may pass page_labels(page) if the caller
+        already has it.
+        """
+        key = page.get('url') if key is None else key
+        contribution = self._contribution(page, labels)
+        previous = self._contributions.get(key)
+        if previous is not None:
+            self._apply(previous, -1)
+        self._contributions[key] = contribution
+        self._apply(contribution, 1)
+        self.version += 1
+    
+    def remove(self, key: Any) -> bool:
+        """Drop a page's contribution; returns False if the key is unknown"""
+        previous = self._contributions.pop(key, None)
+        if previous is None:
+            return False
+        self._apply(previous, -1)
+        self.version += 1
+        return True
+    
+    def statistics(self) -> Dict[str, Any]:
+        """Counts in the "statistics" format of structure_scraped_data"""
+        stats = {'total_pages': len(self)}
+        stats.update((family, dict(self.counts[family])) for family in self.FAMILIES)
+        stats['confidence_distribution'] = dict(self.confidence_distribution)
+        stats['sources'] = dict(self.sources)
+        return stats
+    
+    def summary(self) -> Dict[str, Any]:
+        """statistics() plus the dashboard's average confidence and ontology coverage"""
+        stats = self.statistics()
+        total = stats['total_pages']
+        stats['average_confidence'] = self.confidence_total / total if total else 0.0
+        stats['ontology_classified'] = self.ontology_classified
+        return stats
+
+
+class StructureAccumulator:
+    """
+    Statistics, organization counts and indexes of a page list, built one
+    page at a time. Only counts and index positions are kept, never the
+    pages themselves.
+    """
+    
+    def __init__(self):
+        self.total_pages = 0
+        self.stats = FacetStatistics()
+        # Organize pages: positions per label, recorded while iterating
+        # (a page listing a label twice is indexed once)
+        self.indexes_by_family = {family: {} for family in FacetStatistics.FAMILIES}
+    
+    def add(self, page: Dict[str, Any]) -> None:
+        """Count one page; its index position is the number of pages added before it"""
+        i = self.total_pages
+        self.total_pages += 1
+        labels = page_labels(page)
+        # every list entry counts, even repeated urls
+        self.stats.count(page, labels=labels)
+        for family, values in labels.items():
+            index = self.indexes_by_family[family]
+            for label in values:
+                positions = index.setdefault(label, [])
+                if not positions or positions[-1] != i:
+                    positions.append(i)
+    
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            'export_date': datetime.now().isoformat(),
+            'version': '1.0',
+            'total_pages': self.total_pages,
+            'data_format': 'structured_web_scraping_poc'
+        }
+    
+    def statistics(self) -> Dict[str, Any]:
+        return self.stats.statistics()
+    
+    def organization(self) -> Dict[str, Any]:
+        # counts per label occurrence, as in statistics
+        counts = self.stats.counts
+        organization = {'by_category': dict(counts['categories'])}
+        for family, name, _, _ in ONTOLOGY_FACETS:
+            organization[name] = dict(counts[family])
+        return organization
+    
+    def indexes(self) -> Dict[str, Any]:
+        indexes = {'by_category': self.indexes_by_family['categories']}
+        for family, name, _, _ in ONTOLOGY_FACETS:
+            indexes[name] = self.indexes_by_family[family]
+        return indexes
+
 
 def structure_scraped_data(scraped_pages: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
@@ -18,133 +202,17 @@ def structure_scraped_data(scraped_pages: List[Dict[str, Any]]) -> Dict[str, Any
     Returns:
         Structured data dictionary with metadata, statistics, and organized pages
     """
-    
-    # Initialize statistics
-    stats = {
-        'total_pages': len(scraped_pages),
-        'categories': defaultdict(int),
-        'document_types': defaultdict(int),
-        'work_types': defaultdict(int),
-        'themes': defaultdict(int),
-        'areas_of_reference': defaultdict(int),
-        'geo_areas': defaultdict(int),
-        'salesian_family_groups': defaultdict(int),
-        'confidence_distribution': {
-            'high': 0,  # >= 0.7
-            'medium': 0,  # 0.5-0.69
-            'low': 0  # < 0.5
-        },
-        'sources': defaultdict(int)
-    }
-    
-    # Organize pages by category
-    pages_by_category = defaultdict(list)
-    pages_by_document_type = defaultdict(list)
-    pages_by_work_type = defaultdict(list)
-    pages_by_theme = defaultdict(list)
-    pages_by_area = defaultdict(list)
-    pages_by_geo = defaultdict(list)
-    pages_by_family_group = defaultdict(list)
-    
-    # Process each page
+    acc = StructureAccumulator()
     for page in scraped_pages:
-        # Basic category stats
-        category = page.get('category', 'Uncategorized')
-        stats['categories'][category] += 1
-        pages_by_category[category].append(page)
-        
-        # Source stats
-        source = page.get('category_source', 'unknown')
-        stats['sources'][source] += 1
-        
-        # Confidence distribution
-        confidence = page.get('confidence', 0)
-        if confidence >= 0.7:
-            stats['confidence_distribution']['high'] += 1
-        elif confidence >= 0.5:
-            stats['confidence_distribution']['medium'] += 1
-        else:
-            stats['confidence_distribution']['low'] += 1
-        
-        # Ontology-based organization
-        ontology = page.get('ontology', {})
-        
-        if ontology.get('document_type'):
-            dt = ontology['document_type']['label']
-            stats['document_types'][dt] += 1
-            pages_by_document_type[dt].append(page)
-        
-        if ontology.get('work_type'):
-            wt = ontology['work_type']['label']
-            stats['work_types'][wt] += 1
-            pages_by_work_type[wt].append(page)
-        
-        if ontology.get('themes'):
-            for theme in ontology['themes']:
-                theme_label = theme['label']
-                stats['themes'][theme_label] += 1
-                pages_by_theme[theme_label].append(page)
-        
-        if ontology.get('areas_of_reference'):
-            for area in ontology['areas_of_reference']:
-                area_label = area['label']
-                stats['areas_of_reference'][area_label] += 1
-                pages_by_area[area_label].append(page)
-        
-        if ontology.get('geo_area'):
-            geo = ontology['geo_area']['label']
-            stats['geo_areas'][geo] += 1
-            pages_by_geo[geo].append(page)
-        
-        if ontology.get('salesian_family_group'):
-            fg = ontology['salesian_family_group']['label']
-            stats['salesian_family_groups'][fg] += 1
-            pages_by_family_group[fg].append(page)
-    
-    # Convert defaultdicts to regular dicts for JSON serialization
-    def convert_defaultdict(d):
-        if isinstance(d, defaultdict):
-            return dict(d)
-        return d
-    
-    stats = {k: convert_defaultdict(v) if isinstance(v, defaultdict) else v 
-             for k, v in stats.items()}
+        acc.add(page)
     
     # Build structured output
     structured_data = {
-        'metadata': {
-            'export_date': datetime.now().isoformat(),
-            'version': '1.0',
-            'total_pages': len(scraped_pages),
-            'data_format': 'structured_web_scraping_poc'
-        },
-        'statistics': stats,
-        'organization': {
-            'by_category': {k: len(v) for k, v in pages_by_category.items()},
-            'by_document_type': {k: len(v) for k, v in pages_by_document_type.items()},
-            'by_work_type': {k: len(v) for k, v in pages_by_work_type.items()},
-            'by_theme': {k: len(v) for k, v in pages_by_theme.items()},
-            'by_area_of_reference': {k: len(v) for k, v in pages_by_area.items()},
-            'by_geo_area': {k: len(v) for k, v in pages_by_geo.items()},
-            'by_salesian_family_group': {k: len(v) for k, v in pages_by_family_group.items()}
-        },
+        'metadata': acc.metadata(),
+        'statistics': acc.statistics(),
+        'organization': acc.organization(),
         'pages': scraped_pages,
-        'indexes': {
-            'by_category': {k: [i for i, p in enumerate(scraped_pages) if p in v] 
-                          for k, v in pages_by_category.items()},
-            'by_document_type': {k: [i for i, p in enumerate(scraped_pages) if p in v] 
-                                for k, v in pages_by_document_type.items()},
-            'by_work_type': {k: [i for i, p in enumerate(scraped_pages) if p in v] 
-                           for k, v in pages_by_work_type.items()},
-            'by_theme': {k: [i for i, p in enumerate(scraped_pages) if p in v] 
-                        for k, v in pages_by_theme.items()},
-            'by_area_of_reference': {k: [i for i, p in enumerate(scraped_pages) if p in v] 
-                                    for k, v in pages_by_area.items()},
-            'by_geo_area': {k: [i for i, p in enumerate(scraped_pages) if p in v] 
-                          for k, v in pages_by_geo.items()},
-            'by_salesian_family_group': {k: [i for i, p in enumerate(scraped_pages) if p in v] 
-                                       for k, v in pages_by_family_group.items()}
-        }
+        'indexes': acc.indexes()
     }
     
     return structured_data
@@ -174,37 +242,119 @@ def export_structured_data(scraped_pages: List[Dict[str, Any]],
     return structured
 
 
-def load_structured_data(input_file: str) -> Dict[str, Any]:
+def load_structured_data(input_file: str, include_blobs: bool = False) -> Dict[str, Any]:
     """
-    Load structured data from a JSON file
+    Load structured data from a JSON file, or build it from a CrawlStore
     
     Args:
-        input_file: Input file path
+        input_file: Input file path (structured JSON or crawl store)
+        include_blobs: For a crawl store, also load clean_text, HTML and
+                       ul/li blocks into the pages (default: metadata only;
+                       use CrawlStore.get_page for single pages)
         
     Returns:
         Structured data dictionary
     """
+    if is_crawl_store(input_file):
+        store = CrawlStore(input_file)
+        try:
+            pages = list(store.iter_pages(BLOB_FIELDS if include_blobs else ()))
+        finally:
+            store.close()
+        return structure_scraped_data(pages)
     with open(input_file, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
+def iter_scraped_pages(input_file: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read page records one at a time from a crawl store, a JSON array file
+    or an NDJSON file (detected from the file's first bytes)
+    """
+    if is_crawl_store(input_file):
+        return _iter_store_pages(input_file)
+    with open(input_file, 'r', encoding='utf-8') as f:
+        head = f.read(4096).lstrip()
+    if head.startswith('['):
+        return iter_json_array(input_file)
+    return iter_ndjson(input_file)
+
+
+def _iter_store_pages(path: str) -> Iterator[Dict[str, Any]]:
+    store = CrawlStore(path)
+    try:
+        yield from store.iter_pages()
+    finally:
+        store.close()
+
+
+def stream_structured_export(input_file: str,
+                             output_file: str = 'structured_scraped_data.json') -> Dict[str, Any]:
+    """
+    Structured export without holding the pages in memory: pages are read
+    incrementally (JSON array or NDJSON), written out as they stream, and the
+    metadata, statistics, organization and indexes sections are appended at
+    the end. The result loads like export_structured_data output, except
+    that "pages" is the first key.
+    
+    Args:
+        input_file: JSON array or NDJSON file of scraped pages
+        output_file: Output file path
+        
+    Returns:
+        The structured data without its pages
+    """
+    acc = StructureAccumulator()
+    with open(output_file, 'w', encoding='utf-8') as out:
+        out.write('{\n  "pages": [')
+        for page in iter_scraped_pages(input_file):
+            out.write(',\n    ' if acc.total_pages else '\n    ')
+            out.write(json.dumps(page, ensure_ascii=False))
+            acc.add(page)
+        out.write('\n  ]')
+        summary = {
+            'metadata': acc.metadata(),
+            'statistics': acc.statistics(),
+            'organization': acc.organization(),
+            'indexes': acc.indexes()
+        }
+        for key, value in summary.items():
+            section = json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            out.write(f',\n  {json.dumps(key)}: {section}')
+        out.write('\n}\n')
+    
+    print(f"[INFO] Streamed structured data to {output_file}")
+    print(f"[INFO] Total pages: {acc.total_pages}")
+    print(f"[INFO] Categories: {len(summary['statistics']['categories'])}")
+    print(f"[INFO] Document types: {len(summary['statistics']['document_types'])}")
+    print(f"[INFO] Work types: {len(summary['statistics']['work_types'])}")
+    print(f"[INFO] Themes: {len(summary['statistics']['themes'])}")
+    
+    return summary
+
+
 if __name__ == '__main__':
     # Example usage
     import sys
     
-    if len(sys.argv) < 2:
-        print("Usage: python data_structure_utils.py <input_json_file> [output_file]")
+    args = [a for a in sys.argv[1:] if a != '--stream']
+    if not args:
+        print("Usage: python data_structure_utils.py [--stream] <input_json_or_ndjson_file> [output_file]")
+        print("  --stream: constant-memory export (implied for .ndjson input)")
         sys.exit(1)
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else 'structured_scraped_data.json'
-    
-    print(f"[INFO] Loading data from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        scraped_pages = json.load(f)
+    input_file = args[0]
+    output_file = args[1] if len(args) > 1 else 'structured_scraped_data.json'
     
-    print(f"[INFO] Structuring {len(scraped_pages)} pages...")
-    structured = export_structured_data(scraped_pages, output_file)
+    if '--stream' in sys.argv or input_file.endswith('.ndjson'):
+        print(f"[INFO] Streaming pages from {input_file}...")
+        stream_structured_export(input_file, output_file)
+    else:
+        print(f"[INFO] Loading data from {input_file}...")
+        with open(input_file, 'r', encoding='utf-8') as f:
+            scraped_pages = json.load(f)
+        
+        print(f"[INFO] Structuring {len(scraped_pages)} pages...")
+        structured = export_structured_data(scraped_pages, output_file)
     
     print("\n[INFO] Export complete!")
-
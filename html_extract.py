@@ -0,0 +1,269 @@
+"""
+Pluggable HTML parsing and lean page extraction
+- Backends: "bs4" (BeautifulSoup + html.parser, the reference output),
+  "lxml" and "selectolax" (lexbor) when installed; "auto" picks the
+  fastest one available
+- ExtractionProfile selects which fields are computed; disabled fields come
+  back empty, so e.g. the full-document re-serialization is skipped when
+  full_html_snippet is not wanted
+- PageExtraction computes each field on first access
+"""
+
+import os
+from collections.abc import Mapping
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    LXML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+FIELDS = ("title", "meta_description", "clean_text", "ul_blocks", "li_items", "full_html")
+EMPTY = {"title": "", "meta_description": "", "clean_text": "", "ul_blocks": [], "li_items": [],
+         "full_html": ""}
+
+# text inside these elements is not page content
+NON_TEXT_TAGS = ("script", "style", "template")
+
+
+class ExtractionProfile:
+    def __init__(self, fields=FIELDS, full_html_chars=200000, name=None):
+        """
+        Args:
+            fields: Fields to compute (subset of FIELDS); the others are empty
+            full_html_chars: Keep at most this many characters of full_html
+            name: Short name used in logs and cache keys
+        """
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown extraction field(s): {', '.join(sorted(unknown))}")
+        self.fields = frozenset(fields)
+        self.full_html_chars = full_html_chars
+        self.name = name or "+".join(f for f in FIELDS if f in self.fields)
+
+    def __repr__(self):
+        return f"ExtractionProfile({self.name})"
+
+
+FULL_PROFILE = ExtractionProfile(name="full")
+# what classification and the page list need; no HTML re-serialization
+LEAN_PROFILE = ExtractionProfile(("title", "meta_description", "clean_text", "li_items"), name="lean")
+PROFILES = {"full": FULL_PROFILE, "lean": LEAN_PROFILE}
+
+
+def get_profile(profile=None):
+    """Resolve None (CRAWL_EXTRACTION_PROFILE), a profile name, a field list or a profile"""
+    if profile is None:
+        profile = os.getenv("CRAWL_EXTRACTION_PROFILE", "full")
+    if isinstance(profile, ExtractionProfile):
+        return profile
+    if isinstance(profile, str):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown extraction profile: {profile}. Expected one of {tuple(PROFILES)}")
+        return PROFILES[profile]
+    return ExtractionProfile(profile)
+
+
+def _join_text(strings):
+    """get_text(" ", strip=True) semantics: strip every text node, drop empty ones"""
+    return " ".join(s for s in (t.strip() for t in strings) if s)
+
+
+class BS4Document:
+    """BeautifulSoup with the pure-Python html.parser (reference backend)"""
+
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, "html.parser")
+
+    @classmethod
+    def from_soup(cls, soup):
+        """Wrap a document the caller already parsed"""
+        document = cls.__new__(cls)
+        document.soup = soup
+        return document
+
+    def title(self):
+        soup = self.soup
+        return soup.title.string.strip() if soup.title and soup.title.string else ""
+
+    def meta_description(self):
+        meta = self.soup.find("meta", attrs={"name": "description"})
+        return meta["content"].strip() if meta and meta.get("content") else ""
+
+    def clean_text(self):
+        return self.soup.get_text(" ", strip=True)
+
+    def ul_blocks(self):
+        return [str(u) for u in self.soup.find_all("ul")]
+
+    def li_items(self):
+        return [li.get_text(" ", strip=True) for li in self.soup.find_all("li")]
+
+    def full_html(self):
+        return str(self.soup)
+
+    def hrefs(self):
+        return [a["href"] for a in self.soup.find_all("a", href=True)]
+
+
+class LxmlDocument:
+    """libxml2 HTML parser via lxml"""
+
+    TEXT_XPATH = "text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+
+    def __init__(self, html):
+        # bytes + explicit encoding also accepts pages with an XML encoding declaration
+        self.root = lxml.html.document_fromstring(html.encode("utf-8", "surrogatepass"), parser=LXML_PARSER)
+
+    def title(self):
+        title = self.root.find(".//title")
+        return title.text.strip() if title is not None and title.text and not len(title) else ""
+
+    def meta_description(self):
+        for meta in self.root.iter("meta"):
+            if meta.get("name") == "description":
+                content = meta.get("content")
+                return content.strip() if content else ""
+        return ""
+
+    def clean_text(self):
+        return _join_text(self.root.xpath("//" + self.TEXT_XPATH))
+
+    def ul_blocks(self):
+        return [lxml.html.tostring(u, encoding="unicode", with_tail=False) for u in self.root.iter("ul")]
+
+    def li_items(self):
+        return [_join_text(li.xpath(".//" + self.TEXT_XPATH)) for li in self.root.iter("li")]
+
+    def full_html(self):
+        return lxml.html.tostring(self.root, encoding="unicode")
+
+    def hrefs(self):
+        return [a.get("href") for a in self.root.iter("a") if a.get("href") is not None]
+
+
+class SelectolaxDocument:
+    """lexbor HTML5 parser via selectolax"""
+
+    def __init__(self, html):
+        self.tree = LexborHTMLParser(html)
+        self._stripped = False
+        self._before_strip = {}
+
+    def _strip_non_text(self, keep_fields=()):
+        # text extraction needs script/style removed; serialize anything that
+        # must keep them first
+        if not self._stripped:
+            for field in keep_fields:
+                self._before_strip[field] = getattr(self, "_" + field)()
+            self.tree.strip_tags(list(NON_TEXT_TAGS))
+            self._stripped = True
+
+    def title(self):
+        title = self.tree.css_first("title")
+        return title.text().strip() if title is not None else ""
+
+    def meta_description(self):
+        for meta in self.tree.css("meta[name]"):
+            if meta.attributes.get("name") == "description":
+                content = meta.attributes.get("content")
+                return content.strip() if content else ""
+        return ""
+
+    def clean_text(self):
+        return _join_text(self.tree.root.text(separator="\0", strip=True).split("\0"))
+
+    def li_items(self):
+        return [_join_text(li.text(separator="\0", strip=True).split("\0")) for li in self.tree.css("li")]
+
+    def _ul_blocks(self):
+        return [u.html for u in self.tree.css("ul")]
+
+    def _full_html(self):
+        return self.tree.html
+
+    def ul_blocks(self):
+        return self._before_strip["ul_blocks"] if "ul_blocks" in self._before_strip else self._ul_blocks()
+
+    def full_html(self):
+        return self._before_strip["full_html"] if "full_html" in self._before_strip else self._full_html()
+
+    def hrefs(self):
+        return [a.attributes.get("href") or "" for a in self.tree.css("a[href]")]
+
+
+BACKENDS = {"bs4": BS4Document}
+if lxml is not None:
+    BACKENDS["lxml"] = LxmlDocument
+if LexborHTMLParser is not None:
+    BACKENDS["selectolax"] = SelectolaxDocument
+
+
+def get_backend(name=None):
+    """Resolve a backend name (None = CRAWL_HTML_BACKEND, default "auto")"""
+    if name is None:
+        name = os.getenv("CRAWL_HTML_BACKEND", "auto")
+    if name == "auto":
+        for candidate in ("selectolax", "lxml", "bs4"):
+            if candidate in BACKENDS:
+                return candidate
+    if name not in BACKENDS:
+        raise ValueError(f"HTML backend {name} is not available. Installed: {tuple(BACKENDS)}")
+    return name
+
+
+def parse_document(html, backend=None):
+    """Parsed document for `html`; falls back to bs4 if the backend rejects the page"""
+    backend = get_backend(backend)
+    try:
+        return BACKENDS[backend](html)
+    except Exception as e:
+        if backend == "bs4":
+            raise
+        print(f"[WARN] {backend} could not parse page ({e}); using bs4")
+        return BS4Document(html)
+
+
+class PageExtraction(Mapping):
+    """
+    Read-only mapping with the fields of extract_html_parts; each field is
+    computed on first access, and fields outside the profile are empty
+    """
+
+    def __init__(self, document, profile=FULL_PROFILE):
+        self.document = document
+        self.profile = profile
+        self._values = {}
+
+    def __getitem__(self, field):
+        if field not in EMPTY:
+            raise KeyError(field)
+        if field not in self._values:
+            if field not in self.profile.fields:
+                self._values[field] = EMPTY[field]
+            else:
+                self._values[field] = self._compute(field)
+        return self._values[field]
+
+    def _compute(self, field):
+        document = self.document
+        if isinstance(document, SelectolaxDocument) and field in ("clean_text", "li_items"):
+            document._strip_non_text([f for f in ("ul_blocks", "full_html")
+                                      if f in self.profile.fields and f not in self._values])
+        value = getattr(document, field)()
+        if field == "full_html" and self.profile.full_html_chars is not None:
+            value = value[:self.profile.full_html_chars]
+        return value
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
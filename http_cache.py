@@ -0,0 +1,190 @@
+"""
+On-disk conditional-GET cache for recrawls (SQLite)
+- Keyed by normalized URL; stores ETag / Last-Modified validators, the
+  compressed body and the processed page record with its links
+- Fresh entries (Cache-Control max-age) are reused without a request;
+  stale ones are revalidated with If-None-Match / If-Modified-Since
+- Size-bounded with least-recently-used eviction
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+DEFAULT_CACHE_PATH = os.getenv("CRAWL_HTTP_CACHE", os.path.join("http_cache", "cache.sqlite"))
+DEFAULT_MAX_BYTES = int(os.getenv("CRAWL_HTTP_CACHE_MB", 512)) * 1024 * 1024
+
+HIT = "hit"                  # fresh entry reused, no request sent
+REVALIDATED = "revalidated"  # conditional request answered 304
+MISS = "miss"                # full download
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    result TEXT,
+    links TEXT,
+    ontology_hash TEXT,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+"""
+
+MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)", re.I)
+
+
+class CacheEntry:
+    def __init__(self, url, etag, last_modified, expires_at, body, result, links, ontology_hash):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+        self._body = body
+        self.result = json.loads(result) if result else None
+        self.links = json.loads(links) if links else []
+        self.ontology_hash = ontology_hash
+
+    @property
+    def body(self):
+        return zlib.decompress(self._body).decode("utf-8")
+
+    def is_fresh(self, now=None):
+        return self.expires_at is not None and (now or time.time()) < self.expires_at
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def expiry_from_headers(headers, now=None):
+    """Absolute expiry time from Cache-Control max-age, or None if not cacheable as fresh"""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return None
+    m = MAX_AGE_RE.search(cache_control)
+    if not m:
+        return None
+    return (now or time.time()) + int(m.group(1))
+
+
+class HTTPCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path: SQLite file for the cache
+            max_bytes: Upper bound for stored (compressed) bodies; least
+                       recently used entries are evicted beyond it
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def lookup(self, url):
+        """CacheEntry for `url` or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, etag, last_modified, expires_at, body, result, links, ontology_hash "
+                "FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return CacheEntry(*row)
+
+    def store(self, url, response_headers, body, result, links, ontology_hash=None):
+        """Store a downloaded page if the server sent validators or a max-age"""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        expires_at = expiry_from_headers(response_headers)
+        if not (etag or last_modified or expires_at):
+            return False
+        if "no-store" in response_headers.get("Cache-Control", ""):
+            return False
+
+        blob = zlib.compress(body.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (url, etag, last_modified, expires_at, body, size, "
+                "result, links, ontology_hash, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, expires_at, blob, len(blob),
+                 json.dumps(result, ensure_ascii=False) if result else None,
+                 json.dumps(links), ontology_hash, now, now))
+            self._total += len(blob) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def refresh(self, url, response_headers, result=None, links=None, ontology_hash=None):
+        """After a 304: extend freshness, and optionally replace the processed record"""
+        expires_at = expiry_from_headers(response_headers)
+        etag = response_headers.get("ETag")
+        with self._lock:
+            if result is not None:
+                self._conn.execute(
+                    "UPDATE entries SET result = ?, links = ?, ontology_hash = ? WHERE url = ?",
+                    (json.dumps(result, ensure_ascii=False), json.dumps(links or []), ontology_hash, url))
+            self._conn.execute(
+                "UPDATE entries SET expires_at = ?, etag = COALESCE(?, etag), last_access = ? WHERE url = ?",
+                (expires_at, etag, time.time(), url))
+            self._conn.commit()
+
+    def _evict(self):
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, size FROM entries ORDER BY last_access LIMIT 50").fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._total -= size
+                if self._total <= self.max_bytes:
+                    break
+
+    @property
+    def total_bytes(self):
+        return self._total
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+    """Shared HTTPCache per path (one SQLite connection per process)"""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = HTTPCache(path, max_bytes)
+        return cache
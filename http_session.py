@@ -0,0 +1,208 @@
+"""
+Shared HTTP session layer for the crawler
+- One thread-safe requests.Session with keep-alive connection pooling
+- Configurable pool size per host
+- Retry/backoff policy (exponential, honours Retry-After)
+- Counters for connections opened versus reused
+"""
+
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Cache-Control": "max-age=0"
+}
+
+DEFAULT_POOL_CONNECTIONS = 10  # number of per-host pools kept
+DEFAULT_POOL_MAXSIZE = 10      # keep-alive connections kept per host
+
+
+class RetryPolicy:
+    def __init__(self, retries=2, backoff_factor=0.5, max_backoff=10.0,
+                 retry_statuses=(429, 500, 502, 503, 504)):
+        """
+        Args:
+            retries: Number of retry attempts after the first request
+            backoff_factor: Base delay; attempt n waits backoff_factor * 2**n
+            max_backoff: Upper bound for a single wait in seconds
+            retry_statuses: HTTP status codes worth retrying
+        """
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def should_retry_status(self, status_code):
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt, response=None):
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        delay = self.backoff_factor * (2 ** attempt)
+        # small jitter so concurrent workers do not retry in lockstep
+        delay += random.uniform(0, self.backoff_factor / 2)
+        return min(delay, self.max_backoff)
+
+
+class ConnectionStats:
+    """Thread-safe counters for requests and opened connections"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0
+            self.retries = 0
+
+    def incr(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": max(self.requests - self.connections_opened, 0),
+                "retries": self.retries
+            }
+
+
+STATS = ConnectionStats()
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        STATS.incr("connections_opened")
+        super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        STATS.incr("connections_opened")
+        super().connect()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools count every new TCP/TLS connection"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool
+        }
+
+    def send(self, request, **kwargs):
+        STATS.incr("requests")
+        return super().send(request, **kwargs)
+
+
+_lock = threading.Lock()
+_session = None
+_pool_maxsize = DEFAULT_POOL_MAXSIZE
+_pool_connections = DEFAULT_POOL_CONNECTIONS
+_retry_policy = RetryPolicy()
+
+
+def _mount_adapter(session):
+    adapter = PooledHTTPAdapter(pool_connections=_pool_connections,
+                                pool_maxsize=_pool_maxsize, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def _build_session():
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    _mount_adapter(session)
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session (created on first use)"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def configure_session(pool_maxsize=None, pool_connections=None, retry_policy=None):
+    """
+    Reconfigure the shared session. New pool sizes mount a fresh adapter on
+    the live session without closing it: requests already in flight finish
+    on the old adapter's connections, later requests use the new pools.
+    """
+    global _pool_maxsize, _pool_connections, _retry_policy
+    with _lock:
+        if retry_policy is not None:
+            _retry_policy = retry_policy
+        if pool_maxsize is not None or pool_connections is not None:
+            _pool_maxsize = pool_maxsize or _pool_maxsize
+            _pool_connections = pool_connections or _pool_connections
+            if _session is not None:
+                _mount_adapter(_session)
+
+
+def ensure_pool_size(pool_maxsize):
+    """
+    Grow the per-host pool so `pool_maxsize` workers can keep connections
+    alive; never shrinks it, and safe while other crawls use the session
+    """
+    global _pool_maxsize
+    with _lock:
+        if pool_maxsize > _pool_maxsize:
+            _pool_maxsize = pool_maxsize
+            if _session is not None:
+                _mount_adapter(_session)
+
+
+def get_retry_policy():
+    return _retry_policy
+
+
+def get_connection_stats():
+    """Snapshot of request / connection counters since the last reset"""
+    return STATS.snapshot()
+
+
+def reset_connection_stats():
+    STATS.reset()
+
+
+def sleep_backoff(attempt, response=None):
+    """Record a retry and sleep according to the current retry policy"""
+    STATS.incr("retries")
+    time.sleep(_retry_policy.backoff(attempt, response))
@@ -0,0 +1,349 @@
+"""
+LLM (OpenAI chat-completions) classification stage
+- Pages are micro-batched: several low-confidence pages share one prompt,
+  and batches run on a bounded pool of concurrent requests
+- Per-page results are cached on disk by prompt hash, so unchanged pages
+  are never sent twice
+- A per-crawl budget caps requests and tokens; pages over budget are left
+  to the other classifiers
+- Talks to the REST endpoint through the shared http_session, so
+  OPENAI_BASE_URL can point at a local stub server
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+import http_session
+import crawl_metrics
+from crawl_metrics import get_metrics
+
+DEFAULT_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+DEFAULT_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", 5))
+DEFAULT_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 2))
+DEFAULT_MAX_REQUESTS = int(os.getenv("LLM_MAX_REQUESTS_PER_CRAWL", 200))
+DEFAULT_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS_PER_CRAWL", 400000))
+DEFAULT_CACHE_PATH = os.getenv("CRAWL_LLM_CACHE", os.path.join("http_cache", "llm_responses.sqlite"))
+
+TEXT_CHARS = 4000          # page text sent per page
+REPLY_TOKENS_PER_PAGE = 80
+NO_RESULT = (None, 0.0, "")
+
+PROMPT_HEADER = """You are an assistant that classifies website pages into categories.
+Predefined categories (if given): {categories}
+For every numbered page return one result. Reply with JSON only:
+{{"results": [{{"page": 1, "category": "...", "confidence": 0-100, "reason": "short explanation"}}]}}
+If multiple categories apply, return a comma-separated category string in "category".
+"""
+
+PAGE_TEMPLATE = "\nPage {n} (first {chars} chars):\n{text}\n"
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+class LLMBudget:
+    def __init__(self, max_requests=DEFAULT_MAX_REQUESTS, max_tokens=DEFAULT_MAX_TOKENS):
+        """
+        Args:
+            max_requests: Maximum API requests (None = unlimited)
+            max_tokens: Maximum prompt + completion tokens (None = unlimited);
+                        requests are admitted on an estimate and charged
+                        with the reported usage
+        """
+        self.max_requests = max_requests
+        self.max_tokens = max_tokens
+        self.requests = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_options(cls, options):
+        """Build a budget from None, an LLMBudget or a {"max_requests", "max_tokens"} dict"""
+        if isinstance(options, cls):
+            return options
+        return cls(**(options or {}))
+
+    def reserve(self, estimated_tokens):
+        """Admit one request of about `estimated_tokens`; False if over budget"""
+        with self._lock:
+            if self.max_requests is not None and self.requests >= self.max_requests:
+                return False
+            if self.max_tokens is not None and self.tokens + estimated_tokens > self.max_tokens:
+                return False
+            self.requests += 1
+            self.tokens += estimated_tokens
+            return True
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Replace a request's estimate with the usage the API reported"""
+        if actual_tokens is None:
+            return
+        with self._lock:
+            self.tokens += actual_tokens - estimated_tokens
+
+    def snapshot(self):
+        with self._lock:
+            return {"requests": self.requests, "tokens": self.tokens,
+                    "max_requests": self.max_requests, "max_tokens": self.max_tokens}
+
+
+class LLMResponseCache:
+    """Parsed per-page LLM results keyed by prompt hash (SQLite)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (prompt_hash TEXT PRIMARY KEY, result TEXT NOT NULL, "
+            "created_at REAL NOT NULL)")
+        self._conn.commit()
+
+    def get(self, prompt_hash):
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM responses WHERE prompt_hash = ?",
+                                     (prompt_hash,)).fetchone()
+        return tuple(json.loads(row[0])) if row else None
+
+    def put_many(self, items):
+        """Store (prompt_hash, result) pairs"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO responses (prompt_hash, result, created_at) VALUES (?, ?, ?)",
+                ((h, json.dumps(list(r), ensure_ascii=False), now) for h, r in items))
+            self._conn.commit()
+
+
+_response_caches = {}
+_response_caches_lock = threading.Lock()
+
+
+def get_response_cache(path=DEFAULT_CACHE_PATH):
+    """Shared LLMResponseCache per path"""
+    with _response_caches_lock:
+        cache = _response_caches.get(path)
+        if cache is None:
+            cache = _response_caches[path] = LLMResponseCache(path)
+        return cache
+
+
+def parse_reply(reply, count):
+    """
+    Results for a batch of `count` pages from the model's reply; pages the
+    reply does not cover get NO_RESULT
+    """
+    results = [NO_RESULT] * count
+    try:
+        data = json.loads(reply[reply.index("{"):reply.rindex("}") + 1])
+    except ValueError:
+        if count == 1:
+            # free-form answer for a single page: pick out category / confidence
+            cat_match = re.search(r'category["\']?\s*[:\-]\s*["\']?([A-Za-z0-9,\s/]+)["\']?', reply, re.I)
+            conf_match = re.search(r'confidence.*?(\d{1,3})', reply, re.I)
+            cat = cat_match.group(1).strip() if cat_match else reply.splitlines()[0][:100] if reply else None
+            conf = float(conf_match.group(1)) / 100.0 if conf_match else 0.6
+            results[0] = (cat, conf, reply) if cat else NO_RESULT
+        return results
+
+    items = data.get("results") if isinstance(data, dict) and "results" in data else [data]
+    for i, item in enumerate(items if isinstance(items, list) else []):
+        if not isinstance(item, dict) or not item.get("category"):
+            continue
+        try:
+            index = int(item.get("page", i + 1)) - 1
+            confidence = float(item.get("confidence", 0)) / 100.0
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count:
+            results[index] = (str(item["category"]), confidence, str(item.get("reason", "")))
+    return results
+
+
+class LLMClassifier:
+    def __init__(self, api_key, categories=(), base_url=DEFAULT_BASE_URL, model=DEFAULT_MODEL,
+                 batch_size=DEFAULT_BATCH_SIZE, max_wait=0.05, max_concurrency=DEFAULT_CONCURRENCY,
+                 budget=None, cache=None, timeout=30):
+        """
+        Args:
+            api_key: OpenAI API key; the classifier is disabled without one
+            categories: Predefined category names offered to the model
+            base_url: Chat-completions API root (e.g. a local stub server)
+            model: Model name
+            batch_size: Pages per prompt
+            max_wait: Seconds a partial batch waits for more pages
+            max_concurrency: Simultaneous API requests
+            budget: Optional LLMBudget (None = unlimited)
+            cache: Optional LLMResponseCache
+            timeout: Request timeout in seconds
+        """
+        self.api_key = (api_key or "").strip()
+        self.categories = list(categories)
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self.budget = budget
+        self.cache = cache
+        self.timeout = timeout
+        self._header = PROMPT_HEADER.format(categories=self.categories)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency)) if self.api_key else None
+        self.requests = 0
+        self.cached = 0
+        self.skipped = 0  # pages not classified because of the budget or API errors
+
+    @property
+    def enabled(self):
+        return bool(self.api_key)
+
+    def _page_block(self, n, text):
+        return PAGE_TEMPLATE.format(n=n, chars=TEXT_CHARS, text=text[:TEXT_CHARS])
+
+    def prompt_hash(self, text):
+        """Cache key of one page's prompt (model, instructions and page text)"""
+        payload = "\0".join((self.model, self._header, self._page_block(1, text)))
+        return hashlib.sha256(payload.encode("utf-8", "surrogatepass")).hexdigest()
+
+    # --- public API ---
+    def submit(self, text):
+        """Queue a page; returns a Future of (category, confidence, reason)"""
+        future = Future()
+        if not self.enabled:
+            future.set_result(NO_RESULT)
+            return future
+        if self.cache is not None:
+            cached = self.cache.get(self.prompt_hash(text))
+            if cached is not None:
+                with self._lock:
+                    self.cached += 1
+                future.set_result(cached)
+                return future
+        batch = None
+        with self._lock:
+            self._pending.append((text, future))
+            if len(self._pending) >= self.batch_size:
+                batch = self._take_batch()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._pool.submit(self._run_batch, batch)
+        return future
+
+    def classify(self, text):
+        """Classify one page (waits for its batch)"""
+        return self.submit(text).result()
+
+    def classify_many(self, texts):
+        """Classify a list of pages in batches; results in input order"""
+        futures = [self.submit(text) for text in texts]
+        self.flush()
+        return [f.result() for f in futures]
+
+    def flush(self):
+        """Send the current partial batch now"""
+        with self._lock:
+            batch = self._take_batch()
+        if batch:
+            self._pool.submit(self._run_batch, batch)
+
+    def close(self):
+        if self._pool is not None:
+            self.flush()
+            self._pool.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            stats = {"requests": self.requests, "cached": self.cached, "skipped": self.skipped}
+        if self.budget is not None:
+            stats["budget"] = self.budget.snapshot()
+        return stats
+
+    # --- batching ---
+    def _take_batch(self):
+        # caller holds self._lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _run_batch(self, batch):
+        try:
+            results = self._request([text for text, _ in batch])
+        except Exception as e:
+            print(f"[WARN] LLM classification failed: {e}")
+            results = None
+        if results is None:
+            with self._lock:
+                self.skipped += len(batch)
+            results = [NO_RESULT] * len(batch)
+        elif self.cache is not None:
+            self.cache.put_many((self.prompt_hash(text), r)
+                                for (text, _), r in zip(batch, results) if r[0])
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _request(self, texts):
+        """One chat-completions call for a batch; None if over budget or failed"""
+        prompt = self._header + "".join(self._page_block(n, t) for n, t in enumerate(texts, 1))
+        max_reply = REPLY_TOKENS_PER_PAGE * len(texts) + 100
+        estimate = estimate_tokens(prompt) + max_reply
+        if self.budget is not None and not self.budget.reserve(estimate):
+            return None
+        with self._lock:
+            self.requests += 1
+        with get_metrics().timer(crawl_metrics.CLASSIFY_LLM):
+            return self._send(prompt, max_reply, estimate, len(texts))
+
+    def _send(self, prompt, max_reply, estimate, pages):
+        """POST the prompt (retrying transient failures) and parse the reply"""
+        session = http_session.get_session()
+        policy = http_session.get_retry_policy()
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_reply,
+            "temperature": 0.0
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        for attempt in range(policy.retries + 1):
+            try:
+                r = session.post(f"{self.base_url}/chat/completions", json=payload,
+                                 headers=headers, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                if attempt < policy.retries:
+                    http_session.sleep_backoff(attempt)
+                    continue
+                print(f"[WARN] LLM request failed: {e}")
+                return None
+            if r.status_code >= 400:
+                if attempt < policy.retries and policy.should_retry_status(r.status_code):
+                    http_session.sleep_backoff(attempt, r)
+                    continue
+                print(f"[WARN] LLM request failed: HTTP {r.status_code}")
+                return None
+            data = r.json()
+            if self.budget is not None:
+                self.budget.settle(estimate, (data.get("usage") or {}).get("total_tokens"))
+            reply = data["choices"][0]["message"]["content"].strip()
+            return parse_reply(reply, pages)
+        return None
@@ -0,0 +1,111 @@
+"""
+Process-wide ontology registry
+- Parses the OWL file once and shares the OntologyParser between modules
+- Reloads automatically when the file's mtime changes
+- Precomputes the /api/owl/categories JSON body and its ETag
+- Parser, content hash and categories body of one version are swapped in
+  together, so readers never mix two versions
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import namedtuple
+
+from owl_parser import OntologyParser
+
+LoadedOntology = namedtuple("LoadedOntology", "parser content_hash categories_body etag")
+
+DEFAULT_OWL_FILE = "salesian_simple.owl"
+
+
+class OntologyRegistry:
+    def __init__(self, owl_file=DEFAULT_OWL_FILE):
+        self.owl_file = owl_file
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._loaded = None  # LoadedOntology of the current version
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.owl_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self, mtime):
+        with open(self.owl_file, "rb") as f:
+            content = f.read()
+        parser = OntologyParser(self.owl_file)
+        categories = parser.get_all_categories()
+        body = json.dumps({
+            "success": True,
+            "categories": categories,
+            "statistics": {
+                "document_types_count": len(categories.get('document_types', {})),
+                "work_types_count": len(categories.get('work_types', {})),
+                "themes_count": len(categories.get('themes', {})),
+                "areas_of_reference_count": len(categories.get('areas_of_reference', {})),
+                "geo_areas_count": len(categories.get('geo_areas', {})),
+                "salesian_family_groups_count": len(categories.get('salesian_family_groups', {}))
+            }
+        }, ensure_ascii=False).encode("utf-8")
+
+        self._loaded = LoadedOntology(parser, hashlib.sha256(content).hexdigest(), body,
+                                      hashlib.sha1(body).hexdigest())
+        self._mtime = mtime
+        print(f"[INFO] Loaded OWL ontology from {self.owl_file}")
+
+    def _refresh(self):
+        """Reload if the file changed; returns the current LoadedOntology or None"""
+        mtime = self._current_mtime()
+        if mtime == self._mtime:
+            return self._loaded
+        with self._lock:
+            if mtime == self._mtime:
+                return self._loaded
+            if mtime is None:
+                # warn once; _mtime stays None until the file is back
+                if self._loaded is not None:
+                    print(f"[WARN] OWL file {self.owl_file} disappeared; keeping the last loaded ontology")
+                self._mtime = None
+                return self._loaded
+            try:
+                self._load(mtime)
+            except Exception as e:
+                # keep serving the previous version; do not retry until the file changes again
+                self._mtime = mtime
+                print(f"[WARN] Failed to load OWL ontology: {e}")
+            return self._loaded
+
+    def get_parser(self):
+        """Current OntologyParser, or None if the OWL file is missing or invalid"""
+        loaded = self._refresh()
+        return loaded.parser if loaded else None
+
+    def get_content_hash(self):
+        """SHA-256 of the loaded OWL file, or None if nothing is loaded"""
+        loaded = self._refresh()
+        return loaded.content_hash if loaded else None
+
+    def get_categories_response(self):
+        """Precomputed (json_body_bytes, etag) for the categories endpoint, or (None, None)"""
+        loaded = self._refresh()
+        return (loaded.categories_body, loaded.etag) if loaded else (None, None)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(owl_file=DEFAULT_OWL_FILE):
+    """Shared registry for `owl_file` (one per path per process)"""
+    registry = _registries.get(owl_file)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(owl_file, OntologyRegistry(owl_file))
+    return registry
+
+
+def get_ontology_parser(owl_file=DEFAULT_OWL_FILE):
+    return get_registry(owl_file).get_parser()
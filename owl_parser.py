@@ -3,7 +3,11 @@ OWL Parser for Salesian Simple Taxonomy
 Parses the OWL file and extracts ontology structure for categorization
 """
 
+import re
 import xml.etree.ElementTree as ET
+from collections import Counter
+
+WORD_RE = re.compile(r'\w+')
 
 class OntologyParser:
     def __init__(self, owl_file_path):
@@ -15,8 +19,10 @@ class OntologyParser:
         self.geo_areas = {}
         self.salesian_family_groups = {}
         self.keyword_mappings = {}
+        self._keyword_signature = None
         self._parse_owl()
         self._build_keyword_mappings()
+        self._compile_matcher()
     
     def _parse_owl(self):
         """Parse the OWL file and extract all entities"""
@@ -150,6 +156,69 @@ class OntologyParser:
             'area_of_reference': area_keywords
         }
     
+    def _entity_keywords(self, entity_id, entity_label):
+        """Weighted keywords scored for an entity, in scoring order"""
+        keywords = []
+        # Entity ID keywords (without prefix) count half
+        for keyword in entity_id.replace('_', ' ').lower().split():
+            if len(keyword) > 3:  # Skip short words
+                keywords.append((keyword, 0.5))
+        # Label keywords count fully
+        for keyword in entity_label.lower().split():
+            if len(keyword) > 3:
+                keywords.append((keyword, 1.0))
+        return keywords
+    
+    def _compile_matcher(self):
+        """
+        Compile every entity's keywords once so a page is tokenized a single
+        time and all entity scores come from one token count table.
+        Keywords made only of word characters are looked up in the token
+        counts (equivalent to counting \\bkeyword\\b); any other keyword gets
+        its own precompiled regex.
+        """
+        self._compiled_entities = {}
+        self._regex_keywords = {}
+        groups = {
+            'document_types': self.document_types,
+            'work_types': self.work_types,
+            'themes': self.themes,
+            'areas_of_reference': self.areas_of_reference,
+            'geo_areas': self.geo_areas,
+            'salesian_family_groups': self.salesian_family_groups
+        }
+        for group, entities in groups.items():
+            compiled = []
+            for entity_id, entity_label in entities.items():
+                keywords = self._entity_keywords(entity_id, entity_label)
+                for keyword, _ in keywords:
+                    if not WORD_RE.fullmatch(keyword) and keyword not in self._regex_keywords:
+                        self._regex_keywords[keyword] = re.compile(r'\b' + re.escape(keyword) + r'\b')
+                compiled.append((entity_id, entity_label, keywords))
+            self._compiled_entities[group] = compiled
+    
+    def _keyword_counts(self, text):
+        """Count every keyword occurrence in already-lowercased text in one pass"""
+        counts = Counter(WORD_RE.findall(text))
+        for keyword, pattern in self._regex_keywords.items():
+            counts[keyword] = len(pattern.findall(text))
+        return counts
+    
+    def _score_group(self, counts, group, threshold=0.0):
+        """Score all entities of a group; returns {id: (label, score)} above threshold"""
+        scores = {}
+        for entity_id, entity_label, keywords in self._compiled_entities[group]:
+            score = 0.0
+            for keyword, weight in keywords:
+                matches = counts[keyword]
+                if matches:
+                    score += matches * weight
+            if score > 0:
+                score = min(score / 10.0, 1.0)  # Cap at 1.0
+            if score > threshold:
+                scores[entity_id] = (entity_label, score)
+        return scores
+    
     def classify_page(self, text, title="", meta_description=""):
         """
         Classify a page according to the ontology
@@ -157,6 +226,7 @@ class OntologyParser:
         Returns a dictionary with ontology-based classifications
         """
         combined_text = f"{title} {meta_description} {text}".lower()
+        counts = self._keyword_counts(combined_text)
         
         classification = {
             'document_type': None,
@@ -169,11 +239,7 @@ class OntologyParser:
         }
         
         # Score document types
-        doc_type_scores = {}
-        for doc_type_id, doc_type_label in self.document_types.items():
-            score = self._calculate_score(combined_text, doc_type_id, doc_type_label)
-            if score > 0:
-                doc_type_scores[doc_type_id] = (doc_type_label, score)
+        doc_type_scores = self._score_group(counts, 'document_types')
         
         if doc_type_scores:
             best_doc_type = max(doc_type_scores.items(), key=lambda x: x[1][1])
@@ -185,11 +251,7 @@ class OntologyParser:
             classification['confidence_scores']['document_type'] = best_doc_type[1][1]
         
         # Score work types
-        work_type_scores = {}
-        for work_type_id, work_type_label in self.work_types.items():
-            score = self._calculate_score(combined_text, work_type_id, work_type_label)
-            if score > 0:
-                work_type_scores[work_type_id] = (work_type_label, score)
+        work_type_scores = self._score_group(counts, 'work_types')
         
         if work_type_scores:
             best_work_type = max(work_type_scores.items(), key=lambda x: x[1][1])
@@ -201,11 +263,7 @@ class OntologyParser:
             classification['confidence_scores']['work_type'] = best_work_type[1][1]
         
         # Score themes (can have multiple)
-        theme_scores = {}
-        for theme_id, theme_label in self.themes.items():
-            score = self._calculate_score(combined_text, theme_id, theme_label)
-            if score > 0.3:  # Lower threshold for themes
-                theme_scores[theme_id] = (theme_label, score)
+        theme_scores = self._score_group(counts, 'themes', threshold=0.3)  # Lower threshold for themes
         
         # Get top 3 themes
         sorted_themes = sorted(theme_scores.items(), key=lambda x: x[1][1], reverse=True)[:3]
@@ -215,11 +273,7 @@ class OntologyParser:
         ]
         
         # Score areas of reference (can have multiple)
-        area_scores = {}
-        for area_id, area_label in self.areas_of_reference.items():
-            score = self._calculate_score(combined_text, area_id, area_label)
-            if score > 0.3:
-                area_scores[area_id] = (area_label, score)
+        area_scores = self._score_group(counts, 'areas_of_reference', threshold=0.3)
         
         sorted_areas = sorted(area_scores.items(), key=lambda x: x[1][1], reverse=True)[:3]
         classification['areas_of_reference'] = [
@@ -228,11 +282,7 @@ class OntologyParser:
         ]
         
         # Score geo areas
-        geo_scores = {}
-        for geo_id, geo_label in self.geo_areas.items():
-            score = self._calculate_score(combined_text, geo_id, geo_label)
-            if score > 0:
-                geo_scores[geo_id] = (geo_label, score)
+        geo_scores = self._score_group(counts, 'geo_areas')
         
         if geo_scores:
             best_geo = max(geo_scores.items(), key=lambda x: x[1][1])
@@ -243,11 +293,7 @@ class OntologyParser:
             }
         
         # Score Salesian Family Groups
-        family_scores = {}
-        for family_id, family_label in self.salesian_family_groups.items():
-            score = self._calculate_score(combined_text, family_id, family_label)
-            if score > 0:
-                family_scores[family_id] = (family_label, score)
+        family_scores = self._score_group(counts, 'salesian_family_groups')
         
         if family_scores:
             best_family = max(family_scores.items(), key=lambda x: x[1][1])
@@ -260,24 +306,12 @@ class OntologyParser:
         return classification
     
     def _calculate_score(self, text, entity_id, entity_label):
-        """Calculate relevance score for an entity"""
-        import re
-        
+        """Calculate relevance score for a single entity (one regex scan per keyword)"""
         score = 0.0
         
-        # Check for entity ID keywords (without prefix)
-        id_keywords = entity_id.replace('_', ' ').lower().split()
-        for keyword in id_keywords:
-            if len(keyword) > 3:  # Skip short words
-                matches = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
-                score += matches * 0.5
-        
-        # Check for label keywords
-        label_keywords = entity_label.lower().split()
-        for keyword in label_keywords:
-            if len(keyword) > 3:
-                matches = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
-                score += matches * 1.0
+        for keyword, weight in self._entity_keywords(entity_id, entity_label):
+            matches = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
+            score += matches * weight
         
         # Normalize score (simple normalization)
         if score > 0:
@@ -285,6 +319,20 @@ class OntologyParser:
         
         return score
     
+    def keyword_signature(self):
+        """
+        Everything classify_page depends on, per group and in scoring order:
+        [entity_id, label, [[keyword, weight], ...]] for every entity.
+        Comparing two signatures tells which keywords an ontology edit touched.
+        """
+        if self._keyword_signature is None:
+            self._keyword_signature = {
+                group: [[entity_id, entity_label, [list(k) for k in keywords]]
+                        for entity_id, entity_label, keywords in compiled]
+                for group, compiled in self._compiled_entities.items()
+            }
+        return self._keyword_signature
+    
     def get_all_categories(self):
         """Get all categories organized by type"""
         return {
@@ -295,4 +343,3 @@ class OntologyParser:
             'geo_areas': self.geo_areas,
             'salesian_family_groups': self.salesian_family_groups
         }
-
@@ -0,0 +1,371 @@
+"""
+Server-side page search for crawl results
+- Inverted index over title, url, meta description and clean text; every
+  query word must match (as a prefix of an indexed word)
+- Facet filters on category, document type, work type, theme and geo area
+- Sorting by confidence (or url) with opaque cursor pagination that stays
+  stable while pages are added
+- Queries return slim records; the full record (HTML snippet, ul/li blocks,
+  text) is kept zlib-compressed and fetched per page
+- FacetStatistics is kept up to date as pages are added or replaced, for
+  /api/stats
+"""
+
+import os
+import re
+import time
+import json
+import zlib
+import base64
+import bisect
+import itertools
+import threading
+
+from data_structure_utils import FacetStatistics, iter_scraped_pages
+from crawl_store import CrawlStore, is_crawl_store
+
+WORD_RE = re.compile(r"\w+")
+
+FACETS = ("category", "document_type", "work_type", "theme", "geo_area")
+SORTS = ("confidence_desc", "confidence_asc", "url")
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# PageIndex generations only go up, also across server restarts
+_generations = itertools.count(int(time.time() * 1000))
+
+
+def tokenize(text):
+    return WORD_RE.findall(text.lower()) if text else []
+
+
+def _label(entry):
+    return entry.get("label") if isinstance(entry, dict) else None
+
+
+def facet_values(page):
+    """{facet: set of values} for one page record"""
+    ontology = page.get("ontology") or {}
+    values = {
+        "category": {page.get("category") or "Uncategorized"},
+        "document_type": {_label(ontology.get("document_type"))},
+        "work_type": {_label(ontology.get("work_type"))},
+        "theme": {_label(t) for t in ontology.get("themes") or []},
+        "geo_area": {_label(ontology.get("geo_area"))},
+    }
+    return {facet: v - {None} for facet, v in values.items()}
+
+
+def slim_record(page):
+    """Page record without the HTML snippet, ul/li blocks and text"""
+    ontology = page.get("ontology") or {}
+    record = {
+        "url": page.get("url", ""),
+        "title": page.get("title", ""),
+        "meta_description": page.get("meta_description", ""),
+        "category": page.get("category") or "Uncategorized",
+        "confidence": page.get("confidence", 0) or 0,
+        "category_source": page.get("category_source", ""),
+        "ontology": {
+            "document_type": _label(ontology.get("document_type")),
+            "work_type": _label(ontology.get("work_type")),
+            "themes": [_label(t) for t in ontology.get("themes") or []],
+            "areas_of_reference": [_label(a) for a in ontology.get("areas_of_reference") or []],
+            "geo_area": _label(ontology.get("geo_area")),
+            "salesian_family_group": _label(ontology.get("salesian_family_group")),
+        },
+    }
+    if page.get("duplicate_of"):
+        record["duplicate_of"] = page["duplicate_of"]
+    return record
+
+
+def encode_cursor(sort, key):
+    raw = json.dumps([sort, list(key)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """Sort key encoded in `cursor`; raises ValueError if it is invalid or for another sort"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor belongs to a different sort order")
+    return tuple(key)
+
+
+class PageIndex:
+    def __init__(self, store=None):
+        """
+        Args:
+            store: Optional CrawlStore holding the full records; pages are
+                   then read from it on demand instead of kept compressed
+                   in memory
+        """
+        self.store = store
+        # tells rebuilt indexes apart in ETags (their statistics versions restart at 0)
+        self.generation = next(_generations)
+        self._lock = threading.RLock()
+        self._slim = []          # doc id -> slim record
+        self._bodies = []        # doc id -> compressed full record
+        self._tokens = []        # doc id -> indexed words
+        self._facets = []        # doc id -> {facet: values}
+        self._by_url = {}
+        self._postings = {}      # word -> set of doc ids
+        self._facet_postings = {facet: {} for facet in FACETS}
+        self._vocabulary = None  # sorted words, rebuilt after new words
+        self._orders = {}        # sort -> sorted [(key, doc id)]
+        self._stats = FacetStatistics()
+
+    def __len__(self):
+        return len(self._by_url)
+
+    def add(self, page):
+        """
+        Index a page record; a page with an already indexed url replaces
+        the earlier version and keeps its id. Returns the doc id.
+        """
+        tokens = set()
+        for field in ("title", "url", "meta_description", "clean_text"):
+            tokens.update(tokenize(page.get(field, "")))
+        facets = facet_values(page)
+        body = None
+        if self.store is None:
+            body = zlib.compress(json.dumps(page, ensure_ascii=False).encode("utf-8"))
+        url = page.get("url", "")
+
+        with self._lock:
+            doc_id = self._by_url.get(url)
+            if doc_id is None:
+                doc_id = len(self._slim)
+                self._by_url[url] = doc_id
+                self._slim.append(None)
+                self._bodies.append(None)
+                self._tokens.append(set())
+                self._facets.append({})
+            else:
+                self._unindex(doc_id)
+            self._slim[doc_id] = slim_record(page)
+            self._bodies[doc_id] = body
+            self._tokens[doc_id] = tokens
+            self._facets[doc_id] = facets
+            for word in tokens:
+                postings = self._postings.get(word)
+                if postings is None:
+                    postings = self._postings[word] = set()
+                    self._vocabulary = None
+                postings.add(doc_id)
+            for facet, values in facets.items():
+                for value in values:
+                    self._facet_postings[facet].setdefault(value, set()).add(doc_id)
+            self._orders.clear()
+            self._stats.add(page)
+            return doc_id
+
+    def _unindex(self, doc_id):
+        for word in self._tokens[doc_id]:
+            postings = self._postings[word]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[word]
+                self._vocabulary = None
+        for facet, values in self._facets[doc_id].items():
+            for value in values:
+                postings = self._facet_postings[facet][value]
+                postings.discard(doc_id)
+                if not postings:
+                    del self._facet_postings[facet][value]
+
+    def _sort_key(self, sort, doc_id):
+        record = self._slim[doc_id]
+        if sort == "confidence_desc":
+            return (-record["confidence"], doc_id)
+        if sort == "confidence_asc":
+            return (record["confidence"], doc_id)
+        return (record["url"], doc_id)
+
+    def _order(self, sort):
+        order = self._orders.get(sort)
+        if order is None:
+            order = self._orders[sort] = sorted(
+                (self._sort_key(sort, doc_id), doc_id) for doc_id in self._by_url.values())
+        return order
+
+    def _match_word(self, prefix):
+        """Doc ids containing a word that starts with `prefix`"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        matched = set()
+        i = bisect.bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            matched |= self._postings[vocabulary[i]]
+            i += 1
+        return matched
+
+    def _candidates(self, q, filters):
+        """Matching doc ids, or None for "every page" """
+        candidates = None
+        for word in sorted(set(tokenize(q)), key=len, reverse=True):
+            matched = self._match_word(word)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return set()
+        for facet, values in filters.items():
+            postings = self._facet_postings[facet]
+            matched = set()
+            for value in values:
+                matched |= postings.get(value, set())
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return set()
+        return candidates
+
+    def query(self, q="", filters=None, sort="confidence_desc", limit=DEFAULT_LIMIT, cursor=None):
+        """
+        Args:
+            q: Search words; each must prefix-match a word of the title,
+               url, meta description or clean text
+            filters: {facet: [values]} - any value within a facet, all facets
+            sort: "confidence_desc", "confidence_asc" or "url"
+            limit: Page size (1 to MAX_LIMIT)
+            cursor: next_cursor of the previous response
+
+        Returns:
+            {"pages": [slim records with "id"], "total": matches,
+             "next_cursor": str or None}
+
+        Raises:
+            ValueError: Unknown facet or sort, bad limit or cursor
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v}
+        unknown = set(filters) - set(FACETS)
+        if unknown:
+            raise ValueError(f"Unknown facet(s): {', '.join(sorted(unknown))}")
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {', '.join(SORTS)}")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        after = decode_cursor(cursor, sort) if cursor else None
+
+        with self._lock:
+            candidates = self._candidates(q, filters)
+            order = self._order(sort)
+            start = bisect.bisect_right(order, (after, float("inf"))) if after else 0
+            pages = []
+            last_key = None
+            for key, doc_id in order[start:]:
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                if len(pages) == limit:
+                    break
+                pages.append(dict(self._slim[doc_id], id=doc_id))
+                last_key = key
+            else:
+                last_key = None
+            total = len(self._by_url) if candidates is None else len(candidates)
+        return {
+            "pages": pages,
+            "total": total,
+            "next_cursor": encode_cursor(sort, last_key) if last_key is not None else None
+        }
+
+    def get_page(self, doc_id):
+        """Full page record (with HTML) for a doc id, or None"""
+        with self._lock:
+            if not 0 <= doc_id < len(self._slim):
+                return None
+            url = self._slim[doc_id]["url"]
+            body = self._bodies[doc_id]
+        if self.store is not None:
+            return self.store.get_page(url)
+        return json.loads(zlib.decompress(body))
+
+    def get_id(self, url):
+        with self._lock:
+            return self._by_url.get(url)
+
+    def statistics(self):
+        """
+        (FacetStatistics.summary(), version); the version changes whenever
+        a page is added or replaced
+        """
+        with self._lock:
+            return self._stats.summary(), self._stats.version
+
+    def facet_counts(self):
+        """{facet: {value: pages}}"""
+        with self._lock:
+            return {facet: {value: len(ids) for value, ids in postings.items()}
+                    for facet, postings in self._facet_postings.items()}
+
+
+class FilePageIndex:
+    """
+    PageIndex over a crawl output file (JSON array, NDJSON or CrawlStore),
+    rebuilt when the file's mtime changes. For a CrawlStore only the text
+    is read for indexing; HTML stays in the store until a page is requested.
+    One store connection is reused across rebuilds and only reopened (the
+    old one closed) when the file is replaced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._index = None
+        self._store = None
+        self._store_inode = None
+
+    def get_index(self):
+        """Current PageIndex, or None if the file does not exist"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return self._index
+        mtime = stat.st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    if is_crawl_store(self.path):
+                        index = PageIndex(self._open_store(stat.st_ino))
+                        pages = index.store.iter_pages(fields=("clean_text",))
+                    else:
+                        self._open_store(None)
+                        index = PageIndex()
+                        pages = iter_scraped_pages(self.path)
+                    for page in pages:
+                        index.add(page)
+                    self._index = index
+                    self._mtime = mtime
+                    print(f"[INFO] Indexed {len(index)} pages from {self.path}")
+        return self._index
+
+    def _open_store(self, inode):
+        """
+        The path's CrawlStore, reopened if the file was replaced; inode None
+        only closes the current store (the path now holds JSON)
+        """
+        if self._store is not None and self._store_inode != inode:
+            self._store.close()
+            self._store = None
+        if self._store is None and inode is not None:
+            self._store = CrawlStore(self.path)
+            self._store_inode = inode
+        return self._store
+
+
+_file_indexes = {}
+_file_indexes_lock = threading.Lock()
+
+
+def get_file_index(path):
+    """Shared FilePageIndex for `path`"""
+    with _file_indexes_lock:
+        file_index = _file_indexes.get(path)
+        if file_index is None:
+            file_index = _file_indexes[path] = FilePageIndex(path)
+        return file_index
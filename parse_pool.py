@@ -0,0 +1,110 @@
+"""
+Process pool for the CPU-bound stage of a crawl
+- Fetcher threads keep the network I/O; HTML parsing, extraction and the
+  OWL / predefined-taxonomy scoring run in worker processes, so they are not
+  serialized on the GIL
+- Each worker loads the ontology and the compiled scorers once at startup
+- Duplicate detection, the classification cache and the OpenAI fallback stay
+  in the crawling process (they hold per-crawl state)
+"""
+
+import os
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from crawl_metrics import get_metrics
+
+# 0 = parse in the fetching threads (no worker processes)
+DEFAULT_PARSE_WORKERS = int(os.getenv("CRAWL_PARSE_WORKERS", 0))
+
+
+def _init_worker():
+    """Load the shared ontology once per worker process"""
+    import crawler_taxonomy
+    crawler_taxonomy.get_owl_parser()
+
+
+def _analyze(url, html, base_url, profile):
+    import crawler_taxonomy
+    return crawler_taxonomy.analyze_page(url, html, base_url, profile)
+
+
+def _analyze_observed(url, html, base_url, profile):
+    """_analyze plus the stage histograms it recorded in this worker"""
+    import crawl_metrics
+    metrics = crawl_metrics.get_metrics()
+    before = metrics.snapshot()
+    return _analyze(url, html, base_url, profile), metrics.histograms_since(before)
+
+
+class ParsePool:
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers: Worker processes (defaults to the number of CPUs)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        # forkserver/spawn: forking a process that runs fetcher threads is unsafe
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                             initializer=_init_worker)
+
+    def submit(self, url, html, base_url=None, profile=None):
+        """Future for crawler_taxonomy.analyze_page(url, html, base_url, profile)"""
+        return self._executor.submit(_analyze, url, html, base_url, profile)
+
+    def analyze(self, url, html, base_url=None, profile=None):
+        """
+        Run analyze_page in a worker and wait for it. The stage timings the
+        worker recorded are added to this process's crawl_metrics.
+
+        Returns:
+            (extracted dict, links, local classification, parse_seconds,
+             classify_seconds)
+        """
+        result, histograms = self._executor.submit(_analyze_observed, url, html, base_url,
+                                                   profile).result()
+        get_metrics().merge_histograms(histograms)
+        return result
+
+    def warm_up(self):
+        """Start every worker now instead of on the first pages"""
+        for future in [self._executor.submit(_init_worker) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_parse_pool(workers=None):
+    """
+    Shared ParsePool per worker count, or None when parsing stays in-process
+
+    Args:
+        workers: Worker processes; None uses CRAWL_PARSE_WORKERS, 0 disables
+                 the pool
+    """
+    if workers is None:
+        workers = DEFAULT_PARSE_WORKERS
+    if not workers or workers < 1:
+        return None
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ParsePool(workers)
+        return pool
+
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
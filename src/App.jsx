@@ -29,7 +29,37 @@ function App() {
     setData([])
 
     try {
-      const response = await fetch(`${API_BASE_URL}/api/crawl`, {
+      if (singlePage) {
+        const response = await fetch(`${API_BASE_URL}/api/crawl`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({
+            url: url.trim(),
+            max_pages: maxPages,
+            delay: delay,
+            single_page: true,
+          }),
+        })
+
+        const result = await response.json()
+
+        if (!response.ok) {
+          throw new Error(result.error || 'Failed to crawl website')
+        }
+
+        if (result.success && result.data) {
+          setData(result.data)
+          setError(null)
+        } else {
+          throw new Error('No data returned from server')
+        }
+        return
+      }
+
+      // Multi-page crawls stream NDJSON so pages render as they arrive
+      const response = await fetch(`${API_BASE_URL}/api/crawl/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -38,26 +68,48 @@ function App() {
           url: url.trim(),
           max_pages: maxPages,
           delay: delay,
-          single_page: singlePage,
+          format: 'ndjson',
         }),
       })
 
-      const result = await response.json()
-
       if (!response.ok) {
+        const result = await response.json().catch(() => ({}))
         throw new Error(result.error || 'Failed to crawl website')
       }
 
-      if (result.success && result.data) {
-        setData(result.data)
-        setError(null)
-      } else {
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      let received = 0
+
+      const handleLine = (line) => {
+        if (!line.trim()) return
+        const record = JSON.parse(line)
+        if (record.event === 'error') {
+          throw new Error(record.error || 'Crawl failed')
+        }
+        if (record.event === 'done') return
+        received += 1
+        setData(prev => [...prev, record])
+      }
+
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split('\n')
+        buffer = lines.pop()
+        lines.forEach(handleLine)
+      }
+      handleLine(buffer)
+
+      if (received === 0) {
         throw new Error('No data returned from server')
       }
+      setError(null)
     } catch (err) {
       console.error('Crawl error:', err)
       setError(err.message || 'Failed to crawl website. Make sure the API server is running.')
-      setData([])
     } finally {
       setCrawling(false)
     }
@@ -217,7 +269,11 @@ function App() {
                 <Loader2 className="animate-spin text-blue-600" size={20} />
                 <div>
                   <p className="text-blue-800 font-medium">Crawling website...</p>
-                  <p className="text-blue-600 text-sm">This may take a few minutes depending on the number of pages.</p>
+                  <p className="text-blue-600 text-sm">
+                    {data.length > 0
+                      ? `${data.length} page${data.length === 1 ? '' : 's'} received so far...`
+                      : 'This may take a few minutes depending on the number of pages.'}
+                  </p>
                 </div>
               </div>
             </div>